@@ -0,0 +1,222 @@
+from fastapi import APIRouter, Depends, File, Query, Request, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+
+from config import settings
+from database import get_async_db
+from models.guests import Guest
+from routes import guests as sync_guests
+from schemas.guests import GuestCreate
+from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils.serializers import guest_serializer, json_response
+
+router = APIRouter(prefix="/guests", tags=["Guests"])
+
+@router.post("", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new guest",
+    responses={
+        201: {"description": "Guest created successfully"},
+        400: {"description": "Validation error"},
+        409: {"description": "Guest already exists"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def create_guest(
+    guest: GuestCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate email: 'error' reports it, "
+                                                   "'return' also returns the existing guest (for safe client retries)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new guest with the following information:
+    - **name**: Full name of the guest
+    - **email**: Valid email address
+    """
+    try:
+        # one round trip: a duplicate email inserts nothing and returns no row
+        created = (await db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Guest, "email", guest.dict(), guest_serializer.columns
+        ))).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            await db.rollback()
+            if if_exists == "return":
+                existing = (await db.execute(
+                    select(*guest_serializer.columns).where(Guest.email == guest.email)
+                )).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Guest with this email already exists",
+                        data=guest_serializer(existing)
+                    )
+            return BaseResponse(
+                status_code=2,
+                message="Guest with this email already exists"
+            )
+        await db.commit()
+        
+        return BaseResponse(
+            status_code=1,
+            message="Guest created successfully",
+            data=guest_serializer(created)
+        )
+    except Exception as ex:
+        await db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("", 
+    response_model=BaseResponse,
+    summary="Get all guests",
+    responses={
+        200: {
+            "description": "List of guests",
+            "content": {"application/x-ndjson": {}}
+        },
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_all_guests(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    export_format: Optional[str] = Query(None, alias="format", description="Set to 'ndjson' to stream every guest, one JSON object per line"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get guests from the database, one page at a time.
+    With `?format=ndjson` (or `Accept: application/x-ndjson`) all guests are streamed instead.
+    With `?ids=1,2,3` just those guests are fetched, in chunked IN queries.
+    """
+    try:
+        serializer = guest_serializer.project(fields, keep=(Guest.created_at, Guest.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            statements = CommonFunctions.ids_statements(select(*serializer.columns), Guest.id, id_list)
+            guests, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in (await db.execute(statement)).all()], id_list
+            )
+            return json_response(
+                message="Guests retrieved successfully",
+                data={
+                    "items": serializer.many(guests),
+                    "missing": missing
+                }
+            )
+
+        if CommonFunctions.wants_ndjson(request, export_format):
+            statement = select(*serializer.columns).order_by(Guest.created_at, Guest.id)
+            return StreamingResponse(
+                CommonFunctions.stream_ndjson_async(statement, serializer),
+                media_type="application/x-ndjson"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        statement, limit = CommonFunctions.keyset_query(select(*serializer.columns), Guest, after, limit)
+        guests, next_cursor = CommonFunctions.split_page((await db.execute(statement)).all(), limit)
+        guest_list = serializer.many(guests)
+        
+        return json_response(
+            message="Guests retrieved successfully",
+            data={
+                "items": guest_list,
+                "next_cursor": next_cursor
+            }
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("/{guest_id}", 
+    response_model=BaseResponse,
+    summary="Get guest details by ID",
+    responses={
+        200: {"description": "Guest details"},
+        404: {"description": "Guest not found"},
+        500: {"description": "Internal server error"}
+    }
+)
+@conditional_get(lambda guest_id, **_: watermark(Guest, Guest.id == guest_id))
+async def get_guest_by_id(
+    guest_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a specific guest by their ID
+    """
+    try:
+        serializer = guest_serializer.project(fields)
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_serializer.names)}"
+            )
+
+        guest = (await db.execute(select(*serializer.columns).where(Guest.id == guest_id))).first()
+        if not guest:
+            return BaseResponse(
+                status_code=2,
+                message="Guest not found"
+            )
+        
+        return json_response(
+            message="Guest retrieved successfully",
+            data=serializer(guest)
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import guests from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def import_guests(
+    file: UploadFile = File(..., description="CSV with a header row (name, email) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+):
+    """
+    Stream-import guests in chunks. Rows whose email already exists are skipped.
+    """
+    # Parsing and validation are CPU-bound, so the import runs in the threadpool
+    return await run_in_threadpool(
+        CommonFunctions.call_with_session, sync_guests.import_guests, file=file, import_format=import_format
+    )
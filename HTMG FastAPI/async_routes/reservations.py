@@ -0,0 +1,289 @@
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Optional
+
+from config import settings
+from database import get_async_db
+from models.reservations import Reservation
+from models.guests import Guest
+from models.rooms import Room
+from routes import reservations as sync_reservations
+from schemas.reservations import ReservationCreate, ReservationBulkCreate
+from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils.availability_index import availability_index
+from utils.inventory_calendar import inventory_cache
+from utils.serializers import guest_reservation_serializer, json_response, reservation_serializer
+
+router = APIRouter(prefix="/reservations", tags=["Reservations"])
+
+@router.post("", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new reservation (Book a room)",
+    responses={
+        201: {"description": "Reservation created successfully"},
+        400: {"description": "Validation error"},
+        404: {"description": "Guest or Room not found"},
+        409: {"description": "Room not available"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def create_reservation(reservation: ReservationCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create a new reservation with the following information:
+    - **guest_id**: ID of the guest making the reservation
+    - **room_id**: ID of the room to be reserved
+    - **check_in**: Check-in date (YYYY-MM-DD)
+    - **check_out**: Check-out date (YYYY-MM-DD)
+    """
+    try:
+        # One statement locks the room and reads the room and the guest
+        room = await CommonFunctions.lock_room_for_booking_async(db, reservation.guest_id, reservation.room_id)
+
+        # Check if guest exists; without a room row the guest is looked up on its own
+        guest_name = room.guest_name if room else await db.scalar(select(Guest.name).where(Guest.id == reservation.guest_id))
+        if guest_name is None:
+            return BaseResponse(
+                status_code=2,
+                message="Guest not found"
+            )
+
+        # Check if room exists
+        if room is None:
+            return BaseResponse(
+                status_code=2,
+                message="Room not found"
+            )
+
+        # Validate dates
+        if reservation.check_in >= reservation.check_out:
+            return BaseResponse(
+                status_code=2,
+                message="Check-out must be after check-in"
+            )
+        
+        if reservation.check_in < date.today():
+            return BaseResponse(
+                status_code=2,
+                message="Check-in cannot be in the past"
+            )
+
+        # Check room availability: status here, overlaps in the insert itself
+        reservation_id = None
+        if room.status == 'available' and not availability_index.overlaps(
+                reservation.room_id, reservation.check_in, reservation.check_out):
+            reservation_id = await db.scalar(CommonFunctions.insert_if_available_statement(
+                reservation.guest_id, reservation.room_id, reservation.check_in, reservation.check_out
+            ))
+        if reservation_id is None:
+            return BaseResponse(
+                status_code=2,
+                message="Room not available for selected dates"
+            )
+
+        await db.commit()
+        availability_index.add(reservation.room_id, reservation.check_in, reservation.check_out, reservation_id)
+        inventory_cache.add_reservation(reservation.room_id, reservation.check_in, reservation.check_out)
+        
+        return BaseResponse(
+            status_code=1,
+            message="Reservation created successfully",
+            data={
+                "id": reservation_id,
+                "guest_name": guest_name,
+                "room_number": room.room_number,
+                "check_in": reservation.check_in.isoformat(),
+                "check_out": reservation.check_out.isoformat(),
+                "status": "confirmed"
+            }
+        )
+    except IntegrityError as ex:
+        await db.rollback()
+        if CommonFunctions.is_overlap_violation(ex):
+            # the database-side constraint caught an overlap written without the room lock
+            return BaseResponse(
+                status_code=2,
+                message="Room not available for selected dates"
+            )
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+    except Exception as ex:
+        await db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+    finally:
+        # end the transaction and release the room lock now: the session is only closed after the response is sent
+        await db.rollback()
+
+@router.post("/bulk", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create many reservations at once (all or nothing)",
+    responses={
+        201: {"description": "Reservations created successfully"},
+        400: {"description": "Validation error"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def create_reservations_bulk(payload: ReservationBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create a batch of reservations in a single transaction.
+    If any item fails, nothing is created and the per-item results say why.
+    """
+    # The batch logic is database-bound, so it runs on the async connection via run_sync
+    return await db.run_sync(lambda session: sync_reservations.create_reservations_bulk(payload, session))
+
+@router.get("", 
+    response_model=BaseResponse,
+    summary="Get all reservations",
+    responses={
+        200: {
+            "description": "List of reservations",
+            "content": {"application/x-ndjson": {}}
+        },
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_all_reservations(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    export_format: Optional[str] = Query(None, alias="format", description="Set to 'ndjson' to stream every reservation, one JSON object per line"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,check_in,status; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get reservations from the database, one page at a time.
+    With `?format=ndjson` (or `Accept: application/x-ndjson`) all reservations are streamed instead.
+    With `?ids=1,2,3` just those reservations are fetched, in chunked IN queries.
+    """
+    try:
+        serializer = reservation_serializer.project(fields, keep=(Reservation.created_at, Reservation.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(reservation_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            joined = CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+            statements = CommonFunctions.ids_statements(joined, Reservation.id, id_list)
+            reservations, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in (await db.execute(statement)).all()], id_list
+            )
+            return json_response(
+                message="Reservations retrieved successfully",
+                data={
+                    "items": serializer.many(reservations),
+                    "missing": missing
+                }
+            )
+
+        if CommonFunctions.wants_ndjson(request, export_format):
+            statement = (
+                CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+                .order_by(Reservation.created_at, Reservation.id)
+            )
+            return StreamingResponse(
+                CommonFunctions.stream_ndjson_async(statement, serializer),
+                media_type="application/x-ndjson"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        statement = CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+        statement, limit = CommonFunctions.keyset_query(statement, Reservation, after, limit)
+        reservations, next_cursor = CommonFunctions.split_page((await db.execute(statement)).all(), limit)
+        
+        reservation_list = serializer.many(reservations)
+        
+        return json_response(
+            message="Reservations retrieved successfully",
+            data={
+                "items": reservation_list,
+                "next_cursor": next_cursor
+            }
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("/guest/{guest_id}", 
+    response_model=BaseResponse,
+    summary="View guest reservations by guest ID",
+    responses={
+        200: {"description": "Guest reservations"},
+        500: {"description": "Internal server error"}
+    }
+)
+@conditional_get(lambda guest_id, **_: watermark(Reservation, Reservation.guest_id == guest_id))
+async def get_guest_reservations(
+    guest_id: int,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,check_in,status; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get reservations for a specific guest, one page at a time
+    """
+    try:
+        serializer = guest_reservation_serializer.project(fields, keep=(Reservation.created_at, Reservation.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_reservation_serializer.names)}"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        statement = (
+            CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+            .where(Reservation.guest_id == guest_id)
+        )
+        statement, limit = CommonFunctions.keyset_query(statement, Reservation, after, limit)
+        reservations, next_cursor = CommonFunctions.split_page((await db.execute(statement)).all(), limit)
+        
+        reservation_list = serializer.many(reservations)
+        
+        return json_response(
+            message="Guest reservations retrieved successfully",
+            data={
+                "items": reservation_list,
+                "next_cursor": next_cursor
+            }
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
@@ -0,0 +1,254 @@
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
+from typing import Literal, Optional
+
+from config import settings
+from database import get_async_db
+from models.rooms import Room
+from routes import rooms as sync_rooms
+from schemas.rooms import RoomCreate
+from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils.response_cache import response_cache
+from utils.inventory_calendar import inventory_cache
+from utils.serializers import json_response, room_serializer
+
+router = APIRouter(prefix="/rooms", tags=["Rooms"])
+
+@router.post("", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new room",
+    responses={
+        201: {"description": "Room created successfully"},
+        400: {"description": "Validation error"},
+        409: {"description": "Room already exists"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def create_room(
+    room: RoomCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate room number: 'error' reports it, "
+                                                   "'return' also returns the existing room (for safe client retries)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new room with the following information:
+    - **room_number**: Unique room number
+    - **room_type**: Type of room (single, double, suite)
+    """
+    try:
+        # one round trip: a duplicate room_number inserts nothing and returns no row
+        created = (await db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Room, "room_number", room.dict(), room_serializer.columns
+        ))).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            await db.rollback()
+            if if_exists == "return":
+                existing = (await db.execute(
+                    select(*room_serializer.columns).where(Room.room_number == room.room_number)
+                )).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Room number already exists",
+                        data=room_serializer(existing)
+                    )
+            return BaseResponse(
+                status_code=2,
+                message="Room number already exists"
+            )
+        await db.commit()
+        inventory_cache.invalidate()
+        response_cache.invalidate("rooms")
+        
+        return BaseResponse(
+            status_code=1,
+            message="Room created successfully",
+            data=room_serializer(created)
+        )
+    except Exception as ex:
+        await db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+def cached_rooms_page(status_filter=None, ids=None, cursor=None, limit=None, fields=None, **_):
+    """The cached room page for these parameters, looked up by conditional_get before any SQL"""
+    return response_cache.get("rooms", (status_filter, cursor, limit, fields)) if ids is None else None
+
+@router.get("", 
+    response_model=BaseResponse,
+    summary="Get all rooms with optional status filter",
+    responses={
+        200: {"description": "List of rooms"},
+        500: {"description": "Internal server error"}
+    }
+)
+@conditional_get(lambda **_: watermark(Room), cached=cached_rooms_page)
+async def get_all_rooms(
+    status_filter: Optional[str] = Query(None, description="Filter by room status (available, occupied, maintenance)"),
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,room_number; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db),
+    etag: str = ""
+):
+    """
+    Get rooms from the database with optional status filtering, one page at a time.
+    Successful pages are cached with their ETag until a room write in this process invalidates
+    them or they expire; a hit (200 or 304) runs no SQL. Writes made by other workers show up
+    once the entry expires (response_cache_seconds).
+    With `?ids=1,2,3` just those rooms are fetched, in chunked IN queries (not cached).
+    """
+    cache_key = (status_filter, cursor, limit, fields)
+    generation = response_cache.generation("rooms")
+
+    try:
+        serializer = room_serializer.project(fields, keep=(Room.created_at, Room.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(room_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            statements = CommonFunctions.ids_statements(select(*serializer.columns), Room.id, id_list)
+            rooms, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in (await db.execute(statement)).all()], id_list
+            )
+            return json_response(
+                message="Rooms retrieved successfully",
+                data={
+                    "items": serializer.many(rooms),
+                    "missing": missing
+                }
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        statement = select(*serializer.columns)
+        if status_filter:
+            statement = statement.where(Room.status == status_filter)
+        statement, limit = CommonFunctions.keyset_query(statement, Room, after, limit)
+        rooms, next_cursor = CommonFunctions.split_page((await db.execute(statement)).all(), limit)
+        
+        room_list = serializer.many(rooms)
+        
+        return response_cache.store("rooms", cache_key, generation, json_response(
+            message="Rooms retrieved successfully",
+            data={
+                "items": room_list,
+                "next_cursor": next_cursor
+            }
+        ), etag)
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("/available", 
+    response_model=BaseResponse,
+    summary="Find rooms free for a date range",
+    responses={
+        200: {"description": "List of free rooms"},
+        400: {"description": "Validation error"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_available_rooms(
+    check_in: date = Query(..., description="Check-in Date (YYYY-MM-DD)"),
+    check_out: date = Query(..., description="Check-out Date (YYYY-MM-DD)"),
+    room_type: Optional[Literal["single", "double", "suite"]] = Query(None, description="Filter by room type (single, double, suite)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,room_number; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get every available room with no active reservation overlapping the given dates
+    """
+    try:
+        serializer = room_serializer.project(fields)
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(room_serializer.names)}"
+            )
+
+        if check_in >= check_out:
+            return BaseResponse(
+                status_code=2,
+                message="Check-out must be after check-in"
+            )
+
+        statement = CommonFunctions.available_rooms_statement(check_in, check_out, room_type, serializer.columns)
+        rooms = (await db.execute(statement)).all()
+
+        room_list = serializer.many(rooms)
+
+        return json_response(
+            message="Available rooms retrieved successfully",
+            data=room_list
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("/inventory", 
+    response_model=BaseResponse,
+    summary="Free rooms per room type for each night",
+    responses={
+        200: {"description": "Inventory calendar"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_room_inventory(
+    start: Optional[date] = Query(None, description="First night (YYYY-MM-DD), defaults to today"),
+    days: int = Query(30, ge=1, le=settings.inventory_max_days, description="Number of nights")
+):
+    """
+    Get how many rooms of each type are free on each night of the window
+    """
+    # Building the occupancy matrix is CPU-bound, so it runs in the threadpool
+    return await run_in_threadpool(
+        CommonFunctions.call_with_session, sync_rooms.get_room_inventory, start=start, days=days
+    )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import rooms from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def import_rooms(
+    file: UploadFile = File(..., description="CSV with a header row (room_number, room_type) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+):
+    """
+    Stream-import rooms in chunks. Rows whose room number already exists are skipped.
+    """
+    return await run_in_threadpool(
+        CommonFunctions.call_with_session, sync_rooms.import_rooms, file=file, import_format=import_format
+    )
@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Optional
+
+from database import get_async_db
+from models.staff import Staff
+from routes import staff as sync_staff
+from schemas.staff import StaffCreate
+from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils.response_cache import response_cache
+from utils.serializers import json_response, staff_serializer
+
+router = APIRouter(prefix="/staff", tags=["Staff"])
+
+@router.post("", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new staff member",
+    responses={
+        201: {"description": "Staff member created successfully"},
+        400: {"description": "Validation error"},
+        409: {"description": "Staff member already exists"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def create_staff(
+    staff: StaffCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate email: 'error' reports it, "
+                                                   "'return' also returns the existing staff member (for safe client retries)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new staff member with the following information:
+    - **name**: Full name of the staff member
+    - **email**: Valid email address
+    - **department**: Department (housekeeping, front_desk, maintenance)
+    - **position**: Job position
+    """
+    try:
+        # one round trip: a duplicate email inserts nothing and returns no row
+        created = (await db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Staff, "email", staff.dict(), staff_serializer.columns
+        ))).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            await db.rollback()
+            if if_exists == "return":
+                existing = (await db.execute(
+                    select(*staff_serializer.columns).where(Staff.email == staff.email)
+                )).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Staff member with this email already exists",
+                        data=staff_serializer(existing)
+                    )
+            return BaseResponse(
+                status_code=2,
+                message="Staff member with this email already exists"
+            )
+        await db.commit()
+        response_cache.invalidate("staff")
+        
+        return BaseResponse(
+            status_code=1,
+            message="Staff member created successfully",
+            data=staff_serializer(created)
+        )
+    except Exception as ex:
+        await db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("", 
+    response_model=BaseResponse,
+    summary="Get all staff members with optional department filter",
+    responses={
+        200: {"description": "List of staff members"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def get_all_staff(
+    department: Optional[str] = Query(None, description="Filter by department (housekeeping, front_desk, maintenance)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get staff members from the database with optional department filtering, one page at a time.
+    Successful pages are served from the response cache until a staff write invalidates it.
+    """
+    cache_key = (department, cursor, limit, fields)
+    cached = response_cache.get("staff", cache_key)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation("staff")
+
+    try:
+        serializer = staff_serializer.project(fields, keep=(Staff.created_at, Staff.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(staff_serializer.names)}"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        statement = select(*serializer.columns)
+        if department:
+            statement = statement.where(Staff.department == department)
+        statement, limit = CommonFunctions.keyset_query(statement, Staff, after, limit)
+        staff_members, next_cursor = CommonFunctions.split_page((await db.execute(statement)).all(), limit)
+        
+        staff_list = serializer.many(staff_members)
+        
+        return response_cache.store("staff", cache_key, generation, json_response(
+            message="Staff retrieved successfully",
+            data={
+                "items": staff_list,
+                "next_cursor": next_cursor
+            }
+        ))
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import staff members from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+async def import_staff(
+    file: UploadFile = File(..., description="CSV with a header row (name, email, department, position) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+):
+    """
+    Stream-import staff members in chunks. Rows whose email already exists are skipped.
+    """
+    return await run_in_threadpool(
+        CommonFunctions.call_with_session, sync_staff.import_staff, file=file, import_format=import_format
+    )
@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for hot paths. Run from the app directory, e.g.
+
+    python -m benchmarks.availability_index --rooms 1000 --reservations 100000
+
+They default to a throwaway SQLite database; set DATABASE_URL to point at Postgres.
+"""
@@ -0,0 +1,49 @@
+"""
+Requests per second and latency of the sync and async database modes under concurrency.
+
+    python -m benchmarks.async_vs_sync --concurrency 200 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+from benchmarks.common import reset_schema, seed
+from benchmarks.load import free_port, run_load, start_server
+from config import settings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--guests", type=int, default=1000)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(rooms=500, reservations=20_000, guests=args.guests)
+
+    rng = random.Random(3)
+    paths = [f"/api/guests/{rng.randint(1, args.guests)}" for _ in range(500)]
+    paths += ["/api/guests?limit=20", "/api/reservations?limit=20", "/api/rooms?limit=20"] * 50
+    rng.shuffle(paths)
+
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"concurrency={args.concurrency} duration={args.duration}s")
+    for mode in ("false", "true"):
+        port = free_port()
+        server = start_server(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            {"DATABASE_URL": settings.database_url, "ASYNC_DATABASE": mode}, app_dir, port
+        )
+        try:
+            result = asyncio.run(run_load("127.0.0.1", port, paths, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+        label = "async" if mode == "true" else "sync"
+        print(f"{label:5}: {result.rps:8.0f} req/s  p50 {result.percentile(50):7.1f} ms  "
+              f"p99 {result.percentile(99):7.1f} ms  errors {result.errors}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare the SQL availability check with the in-process availability index.
+
+    python -m benchmarks.availability_index --rooms 1000 --reservations 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import reset_schema, seed, timed
+from database import SessionLocal
+from utils.common_functions import CommonFunctions
+from utils.availability_index import AvailabilityIndex
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--reservations", type=int, default=100_000)
+    parser.add_argument("--probes", type=int, default=5000)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(args.rooms, args.reservations)
+
+    rng = random.Random(7)
+    horizon = args.reservations // args.rooms * 7
+    probes = []
+    for _ in range(args.probes):
+        check_in = date.today() + timedelta(days=rng.randint(0, horizon))
+        probes.append((rng.randint(1, args.rooms), check_in, check_in + timedelta(days=rng.randint(1, 5))))
+    cycle = iter(probes * 2)
+
+    db = SessionLocal()
+    try:
+        sql_us = timed(lambda: CommonFunctions.check_room_availability(db, *next(cycle)), args.probes)
+
+        index = AvailabilityIndex()
+        started = time.perf_counter()
+        index.build(db)
+        build_ms = (time.perf_counter() - started) * 1e3
+
+        cycle = iter(probes)
+        index_us = timed(lambda: index.overlaps(*next(cycle)), args.probes)
+        rejected = sum(index.overlaps(*probe) for probe in probes)
+    finally:
+        db.close()
+
+    print(f"rooms={args.rooms} reservations={args.reservations} probes={args.probes}")
+    print(f"SQL check_room_availability : {sql_us:10.1f} us/check")
+    print(f"index overlaps              : {index_us:10.1f} us/check  (build {build_ms:.0f} ms)")
+    print(f"index rejected {rejected}/{args.probes} probes without a query ({sql_us / index_us:.0f}x faster)")
+
+if __name__ == "__main__":
+    main()
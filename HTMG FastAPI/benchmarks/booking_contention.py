@@ -0,0 +1,111 @@
+"""
+Concurrent bookings of a few hot rooms: double bookings and bookings per second under contention.
+
+Every target of benchmarks.cross_framework is served over localhost against a
+freshly seeded database and flooded with POST /api/reservations for --hot-rooms
+rooms over a --days night window, so most requests race another request for
+the same room and nights. Afterwards the reservations table is checked for
+overlapping active stays of one room, which must be zero.
+
+    python -m benchmarks.booking_contention --concurrency 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+from benchmarks.common import engine, reset_schema, seed
+from benchmarks.cross_framework import TARGETS, absolute_database_url
+from benchmarks.load import RequestSpec, free_port, run_load, start_server
+from models import Reservation
+
+ACTIVE_STATUSES = ("confirmed", "checked_in")
+
+# past the seeded stays, so only the benchmark's own bookings collide
+WINDOW_START = 1000
+
+def contended_bookings(hot_rooms: int, days: int, guests: int, seed_value: int = 7) -> Iterator[RequestSpec]:
+    rng = random.Random(seed_value)
+    while True:
+        check_in = date.today() + timedelta(days=WINDOW_START + rng.randint(0, days - 1))
+        body = {"guest_id": rng.randint(1, guests), "room_id": rng.randint(1, hot_rooms),
+                "check_in": check_in.isoformat(), "check_out": (check_in + timedelta(days=rng.randint(1, 3))).isoformat()}
+        yield RequestSpec("POST", "/api/reservations", json.dumps(body).encode(), "POST /api/reservations")
+
+def count_bookings() -> int:
+    with engine.connect() as conn:
+        return conn.scalar(select(func.count()).select_from(Reservation))
+
+def count_double_bookings() -> int:
+    """Pairs of active stays of the same room that share a night"""
+    other = aliased(Reservation)
+    with engine.connect() as conn:
+        return conn.scalar(
+            select(func.count()).select_from(Reservation).join(other, (other.room_id == Reservation.room_id)
+                                                                    & (other.id > Reservation.id))
+            .where(Reservation.status.in_(ACTIVE_STATUSES), other.status.in_(ACTIVE_STATUSES),
+                   Reservation.check_in < other.check_out, other.check_in < Reservation.check_out)
+        )
+
+def run_target(target: str, args, database_url: str) -> dict:
+    command, cwd, env, health_path = TARGETS[target]
+    reset_schema()
+    seed(rooms=args.hot_rooms, reservations=args.hot_rooms, guests=1000)
+    seeded = count_bookings()
+
+    port = free_port()
+    log_path = os.path.join(tempfile.gettempdir(), f"htmg-bench-contention-{target}.log")
+    with open(log_path, "w") as log:
+        server = start_server([sys.executable, *(part.format(port=port) for part in command)],
+                              {**env, "DATABASE_URL": database_url}, cwd, port, health_path=health_path, log=log)
+        try:
+            requests = contended_bookings(args.hot_rooms, args.days, 1000)
+            result = asyncio.run(run_load("127.0.0.1", port, requests, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    created = count_bookings() - seeded
+    return {
+        "target": target,
+        "attempts_per_s": round(result.rps, 1),
+        "bookings": created,
+        "bookings_per_s": round(created / result.elapsed, 1),
+        "rejected": result.rejected,
+        "errors": result.errors,
+        "p99_ms": round(result.percentile(99), 1),
+        "double_bookings": count_double_bookings()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--hot-rooms", type=int, default=5)
+    parser.add_argument("--days", type=int, default=60, help="nights of the window the bookings compete for")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    database_url = absolute_database_url(engine.url.render_as_string(hide_password=False))
+    print(f"{engine.dialect.name} hot rooms={args.hot_rooms} window={args.days} nights "
+          f"concurrency={args.concurrency} duration={args.duration}s")
+    print(f"{'target':14} {'attempts/s':>10} {'bookings':>9} {'bookings/s':>11} {'rejected':>9} {'errors':>7} "
+          f"{'p99 ms':>8} {'double':>7}")
+    failed = False
+    for target in args.targets:
+        row = run_target(target, args, database_url)
+        failed |= row["double_bookings"] > 0
+        print(f"{target:14} {row['attempts_per_s']:10.0f} {row['bookings']:9} {row['bookings_per_s']:11.1f} "
+              f"{row['rejected']:9} {row['errors']:7} {row['p99_ms']:8.1f} {row['double_bookings']:7}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
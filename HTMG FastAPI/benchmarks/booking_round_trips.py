@@ -0,0 +1,77 @@
+"""
+Booking latency and database round trips per POST /api/reservations under a simulated network RTT.
+
+Calls the sync create_reservation route function directly, with every SQL
+statement and every COMMIT / ROLLBACK delayed by --rtt-ms to stand in for a
+database across the network. Books free dates first (the success path), then
+the same dates again (the conflict path).
+
+    python -m benchmarks.booking_round_trips --rtt-ms 2 --bookings 300
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from benchmarks.common import engine, reset_schema, seed
+from database import SessionLocal
+from routes.reservations import create_reservation
+from schemas.reservations import ReservationCreate
+
+class RoundTrips:
+    """Delays and counts every statement, commit and rollback sent to the database"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+        time.sleep(self.rtt)
+
+def book_all(requests, round_trips: RoundTrips):
+    """Mean latency in ms, round trips per booking, and the messages returned"""
+    messages = {}
+    round_trips.count = 0
+    started = time.perf_counter()
+    for request in requests:
+        db = SessionLocal()
+        try:
+            response = create_reservation(request, db)
+        finally:
+            db.close()
+        messages[response.message] = messages.get(response.message, 0) + 1
+    elapsed = time.perf_counter() - started
+    return elapsed / len(requests) * 1e3, round_trips.count / len(requests), messages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rtt-ms", type=float, default=2)
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--rooms", type=int, default=100)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(rooms=args.rooms, reservations=args.rooms * 10, guests=1000)
+    round_trips = RoundTrips(args.rtt_ms / 1e3)
+    event.listen(engine, "before_cursor_execute", round_trips)
+    event.listen(engine, "commit", round_trips)
+    event.listen(engine, "rollback", round_trips)
+
+    # past the seeded stays, one night per booking, spread over the rooms
+    start = date.today() + timedelta(days=1000)
+    requests = [
+        ReservationCreate(guest_id=i % 1000 + 1, room_id=i % args.rooms + 1,
+                          check_in=start + timedelta(days=i // args.rooms),
+                          check_out=start + timedelta(days=i // args.rooms + 1))
+        for i in range(args.bookings)
+    ]
+
+    print(f"{engine.dialect.name} simulated RTT {args.rtt_ms} ms, {args.bookings} bookings")
+    for label, batch in (("created", requests), ("conflict", requests)):
+        latency, trips, messages = book_all(batch, round_trips)
+        print(f"{label:9}: {latency:6.2f} ms per booking, {trips:4.1f} round trips  {messages}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare sequential create_reservation calls with one bulk request of the same size.
+
+    python -m benchmarks.bulk_reservations --items 500
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import reset_schema, seed
+from database import SessionLocal
+from routes.reservations import create_reservation, create_reservations_bulk
+from schemas.reservations import ReservationCreate, ReservationBulkCreate
+
+def make_items(count: int, rooms: int, offset_days: int):
+    check_in = date.today() + timedelta(days=offset_days)
+    return [
+        ReservationCreate(guest_id=i % 100 + 1, room_id=i % rooms + 1,
+                          check_in=check_in + timedelta(days=i // rooms * 2),
+                          check_out=check_in + timedelta(days=i // rooms * 2 + 1))
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--rooms", type=int, default=1000)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(args.rooms, 0, guests=100)
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for item in make_items(args.items, args.rooms, 1000):
+            response = create_reservation(item, db)
+            assert response.status_code == 1, response.message
+        sequential = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = create_reservations_bulk(ReservationBulkCreate(reservations=make_items(args.items, args.rooms, 2000)), db)
+        assert response.status_code == 1, response.message
+        bulk = time.perf_counter() - started
+    finally:
+        db.close()
+
+    print(f"items={args.items}")
+    print(f"sequential : {sequential * 1e3:8.1f} ms  ({args.items / sequential:8.0f} reservations/s)")
+    print(f"bulk       : {bulk * 1e3:8.1f} ms  ({args.items / bulk:8.0f} reservations/s)")
+    print(f"speedup    : {sequential / bulk:8.1f}x")
+
+if __name__ == "__main__":
+    main()
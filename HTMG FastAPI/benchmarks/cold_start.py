@@ -0,0 +1,73 @@
+"""
+Cold start of the FastAPI and Flask apps: import time and process start to first request.
+
+For every target of benchmarks.cross_framework, measures in fresh interpreters
+the time to import the app module, and the time from spawning the server to
+its first successful health check, once with MIGRATE_ON_STARTUP on (the schema
+is already current, as on a restart) and once with it off (migrations applied
+by a separate `python migrations.py` / `flask --app app migrate` step).
+
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import engine, reset_schema, seed
+from benchmarks.cross_framework import TARGETS, absolute_database_url
+from benchmarks.load import free_port, start_server
+from migrations import migrate
+
+# target -> app module imported by the server
+MODULES = {"fastapi": "main", "fastapi-async": "main", "flask": "app"}
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+
+def import_seconds(target: str, env: dict) -> float:
+    _, cwd, target_env, _ = TARGETS[target]
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(module=MODULES[target])],
+        env={**os.environ, **target_env, **env}, cwd=cwd, text=True, stderr=subprocess.DEVNULL
+    )
+    return float(output.strip().splitlines()[-1])
+
+def first_request_seconds(target: str, env: dict, log) -> float:
+    command, cwd, target_env, health_path = TARGETS[target]
+    port = free_port()
+    started = time.perf_counter()
+    server = start_server([sys.executable, *(part.format(port=port) for part in command)],
+                          {**target_env, **env}, cwd, port, health_path=health_path, log=log, interval=0.005)
+    elapsed = time.perf_counter() - started
+    server.terminate()
+    server.wait()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = absolute_database_url(engine.url.render_as_string(hide_password=False))
+    reset_schema()
+    seed(rooms=100, reservations=1000)
+    migrate(engine)
+
+    print(f"{engine.dialect.name}, median of {args.runs} runs")
+    print(f"{'target':14} {'migrate on startup':19} {'import':>10} {'first request':>14}")
+    log_path = os.path.join(tempfile.gettempdir(), "htmg-bench-cold-start.log")
+    with open(log_path, "w") as log:
+        for target in args.targets:
+            for migrate_on_startup in ("true", "false"):
+                env = {"DATABASE_URL": database_url, "MIGRATE_ON_STARTUP": migrate_on_startup}
+                imports = [import_seconds(target, env) for _ in range(args.runs)]
+                firsts = [first_request_seconds(target, env, log) for _ in range(args.runs)]
+                print(f"{target:14} {migrate_on_startup:19} {statistics.median(imports) * 1e3:8.0f} ms "
+                      f"{statistics.median(firsts) * 1e3:11.0f} ms")
+
+if __name__ == "__main__":
+    main()
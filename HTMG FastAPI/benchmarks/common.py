@@ -0,0 +1,60 @@
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+# Must be set before config/database are imported
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import insert
+
+from database import engine, Base
+from models import Guest, Room, Reservation
+
+ROOM_TYPES = ("single", "double", "suite")
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def seed(rooms: int, reservations: int, guests: int = 1000, start: date = None, seed_value: int = 42):
+    """
+    Fill the schema with `rooms` rooms and `reservations` non-overlapping stays
+    spread evenly across rooms, starting at `start` (default: today).
+    """
+    rng = random.Random(seed_value)
+    start = start or date.today()
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(insert(Guest), [
+            {"name": f"Guest {i}", "email": f"guest{i}@example.com", "created_at": now}
+            for i in range(1, guests + 1)
+        ])
+        conn.execute(insert(Room), [
+            {"room_number": str(i), "room_type": ROOM_TYPES[i % 3], "status": "available", "created_at": now}
+            for i in range(1, rooms + 1)
+        ])
+        per_room = max(reservations // rooms, 1)
+        batch = []
+        for room_id in range(1, rooms + 1):
+            day = start + timedelta(days=rng.randint(0, 3))
+            for _ in range(per_room):
+                nights = rng.randint(1, 7)
+                batch.append({
+                    "guest_id": rng.randint(1, guests), "room_id": room_id,
+                    "check_in": day, "check_out": day + timedelta(days=nights),
+                    "status": "confirmed", "created_at": now
+                })
+                day += timedelta(days=nights + rng.randint(0, 3))
+            if len(batch) >= 50_000:
+                conn.execute(insert(Reservation), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Reservation), batch)
+
+def timed(fn, iterations: int) -> float:
+    """Run fn `iterations` times and return the mean wall time per call in microseconds"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
@@ -0,0 +1,122 @@
+"""
+Load test the FastAPI (sync and async) and Flask implementations side by side.
+
+Each target is served over localhost against the same freshly seeded database
+(DATABASE_URL; SQLite or Postgres) and driven through every scenario in
+benchmarks.scenarios. Reports requests per second, p50/p95/p99 latency and SQL
+statements per request for each endpoint, and appends one JSON line per run to
+--output so results can be compared across commits.
+
+    python -m benchmarks.cross_framework --scale 1 --concurrency 50 --duration 10 --output bench.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from sqlalchemy.engine import make_url
+
+from benchmarks.common import reset_schema, seed
+from benchmarks.load import free_port, run_load, start_server
+from benchmarks.scenarios import SCENARIOS, Dataset, requests_for
+from config import settings
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLASK_DIR = os.path.join(os.path.dirname(APP_DIR), "HTMG Flask")
+
+# target -> (server command, working directory, extra environment, health path)
+TARGETS = {
+    "fastapi": (["-m", "uvicorn", "main:app", "--port", "{port}", "--log-level", "warning"],
+                APP_DIR, {"ASYNC_DATABASE": "false"}, "/health"),
+    "fastapi-async": (["-m", "uvicorn", "main:app", "--port", "{port}", "--log-level", "warning"],
+                      APP_DIR, {"ASYNC_DATABASE": "true"}, "/health"),
+    "flask": (["-m", "flask", "--app", "app", "run", "--port", "{port}", "--with-threads"],
+              FLASK_DIR, {}, "/api/health"),
+}
+
+def absolute_database_url(url: str) -> str:
+    """Servers run from different directories, so relative SQLite paths are resolved here"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database and not os.path.isabs(parsed.database):
+        parsed = parsed.set(database=os.path.abspath(parsed.database))
+    return parsed.render_as_string(hide_password=False)
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run_target(target: str, args, data: Dataset, database_url: str) -> list:
+    command, cwd, env, health_path = TARGETS[target]
+    reset_schema()
+    seed(rooms=data.rooms, reservations=data.reservations, guests=data.guests)
+
+    port = free_port()
+    env = {**env, "DATABASE_URL": database_url, "QUERY_COUNT_HEADER": "true"}
+    log_path = os.path.join(tempfile.gettempdir(), f"htmg-bench-{target}.log")
+    with open(log_path, "w") as log:
+        server = start_server([sys.executable, *(part.format(port=port) for part in command)],
+                              env, cwd, port, health_path=health_path, log=log)
+        results = []
+        try:
+            # booking writes last, so the read scenarios see the seeded data
+            for scenario in args.scenarios:
+                requests = requests_for(scenario, data)
+                result = asyncio.run(run_load("127.0.0.1", port, requests, args.concurrency, args.duration))
+                results.append({"target": target, "scenario": scenario, **result.summary()})
+                print_result(target, scenario, result)
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+def print_result(target: str, scenario: str, result) -> None:
+    print(f"\n{target} / {scenario}: {result.rps:.0f} req/s, {result.errors} errors, {result.rejected} rejected")
+    print(f"  {'endpoint':34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'err':>5}")
+    for name, stats in sorted(result.endpoints.items()):
+        row = stats.to_dict(result.elapsed)
+        queries = row["queries_per_request"]
+        print(f"  {name:34} {row['rps']:8.0f} {row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} "
+              f"{'-' if queries is None else f'{queries:.1f}':>8} {row['errors']:5}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=["polling", "listing", "booking"])
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="1.0 seeds 1,000 guests, 100 rooms and 5,000 reservations")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--output", help="append the run as one JSON line to this file")
+    args = parser.parse_args()
+
+    data = Dataset.at_scale(args.scale)
+    database_url = absolute_database_url(settings.database_url)
+    print(f"{make_url(database_url).get_backend_name()} scale={args.scale} ({data.guests} guests, {data.rooms} rooms, "
+          f"{data.reservations} reservations) concurrency={args.concurrency} duration={args.duration}s")
+
+    results = []
+    for target in args.targets:
+        results.extend(run_target(target, args, data, database_url))
+
+    if args.output:
+        run = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "database": make_url(database_url).get_backend_name(),
+            "scale": args.scale,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "results": results
+        }
+        with open(args.output, "a") as output:
+            output.write(json.dumps(run) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Time a full-year room-type inventory grid built from the occupancy matrix.
+
+    python -m benchmarks.inventory_calendar --rooms 5000 --reservations 200000
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from benchmarks.common import reset_schema, seed, timed, Reservation
+from database import SessionLocal
+from utils.inventory_calendar import InventoryCalendar
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=5000)
+    parser.add_argument("--reservations", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(args.rooms, args.reservations)
+
+    start = date.today()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        calendar = InventoryCalendar.build(db, start, args.days)
+        build_ms = (time.perf_counter() - started) * 1e3
+
+        # Matrix work only, without the database read
+        stays = calendar.occupancy.copy()
+        calendar.occupancy[:] = 0
+        rows = db.execute(select(Reservation.room_id, Reservation.check_in, Reservation.check_out)).all()
+        room_ids, check_ins, check_outs = zip(*rows)
+        started = time.perf_counter()
+        calendar.mark(room_ids, check_ins, check_outs)
+        mark_ms = (time.perf_counter() - started) * 1e3
+        assert (calendar.occupancy == stays).all()
+
+        started = time.perf_counter()
+        free = calendar.free_counts(start, args.days)
+        count_ms = (time.perf_counter() - started) * 1e3
+
+        add_us = timed(lambda: calendar.add_reservation(1, start, start + timedelta(days=3)), 10_000)
+    finally:
+        db.close()
+
+    print(f"rooms={args.rooms} reservations={args.reservations} nights={args.days}")
+    print(f"build (query + mark)   : {build_ms:8.1f} ms")
+    print(f"vectorized mark        : {mark_ms:8.1f} ms  ({len(rows)} stays)")
+    print(f"per-type free counts   : {count_ms:8.1f} ms  ({', '.join(free)})")
+    print(f"incremental add        : {add_us:8.1f} us/reservation")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Minimal asyncio HTTP/1.1 load generator with keep-alive connections.
+Dependency-free so the client itself is not the bottleneck at high concurrency.
+"""
+import asyncio
+import itertools
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# BaseResponse bodies report application errors (conflicts, not found) as status_code 2
+_APP_ERROR = re.compile(rb'"status_code":\s*2\b')
+
+@dataclass
+class RequestSpec:
+    """One request of a load scenario; `name` groups requests into per-endpoint stats"""
+    method: str
+    path: str
+    body: Optional[bytes] = None
+    name: Optional[str] = None
+
+    def encode(self, host: str) -> bytes:
+        head = f"{self.method} {self.path} HTTP/1.1\r\nHost: {host}\r\n"
+        if self.body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(self.body)}\r\n"
+        return (head + "\r\n").encode() + (self.body or b"")
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    # transport failures, timeouts, 5xx and internal errors reported in the body
+    errors: int = 0
+    # 4xx or status_code 2 in the body: answered, but refused (e.g. a booking conflict)
+    rejected: int = 0
+    # X-Query-Count of each answered request, when the server sends it
+    queries: List[int] = field(default_factory=list)
+
+    def percentile(self, p: float) -> float:
+        """Latency percentile in milliseconds"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)] * 1e3
+
+    def to_dict(self, elapsed: float) -> dict:
+        return {
+            "requests": len(self.latencies),
+            "rps": round(len(self.latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2) if self.queries else None
+        }
+
+@dataclass
+class LoadResult(EndpointStats):
+    """Totals over all requests plus the same stats per endpoint name"""
+    elapsed: float = 0.0
+    endpoints: Dict[str, EndpointStats] = field(default_factory=dict)
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def record(self, name: str, latency: Optional[float], rejected: bool = False,
+               queries: Optional[int] = None) -> None:
+        """Count one request; a latency of None marks an error"""
+        endpoint = self.endpoints.setdefault(name, EndpointStats())
+        for stats in (self, endpoint):
+            if latency is None:
+                stats.errors += 1
+                continue
+            stats.latencies.append(latency)
+            stats.rejected += rejected
+            if queries is not None:
+                stats.queries.append(queries)
+
+    def summary(self) -> dict:
+        return {
+            **self.to_dict(self.elapsed),
+            "endpoints": {name: stats.to_dict(self.elapsed) for name, stats in sorted(self.endpoints.items())}
+        }
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunks.append((await reader.readexactly(size + 2))[:size])
+            if size == 0:
+                break
+        body = b"".join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    if lines[0].startswith("HTTP/1.0") and headers.get("connection", "").lower() != "keep-alive":
+        headers["connection"] = "close"
+    return status, headers, body
+
+def _classify(status: int, body: bytes) -> Optional[bool]:
+    """None for an error, otherwise whether the request was rejected"""
+    if status >= 500:
+        return None
+    if status >= 400:
+        return True
+    if _APP_ERROR.search(body):
+        return None if b"Internal Server Error" in body else True
+    return False
+
+async def _worker(host: str, port: int, requests: Iterator[RequestSpec], deadline: float,
+                  result: LoadResult, timeout: float) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            spec = next(requests)
+            started = time.perf_counter()
+            writer.write(spec.encode(host))
+            await writer.drain()
+            status, headers, body = await asyncio.wait_for(_read_response(reader), timeout)
+            latency = time.perf_counter() - started
+            rejected = _classify(status, body)
+            queries = headers.get("x-query-count")
+            result.record(spec.name or f"{spec.method} {spec.path}", None if rejected is None else latency,
+                          bool(rejected), int(queries) if queries else None)
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        # a timed out connection is unusable for keep-alive, so the worker stops here
+        result.errors += 1
+    finally:
+        writer.close()
+
+async def run_load(host: str, port: int, requests: Union[Iterable[Union[str, RequestSpec]], Iterator[RequestSpec]],
+                   concurrency: int, duration: float, timeout: float = 10) -> LoadResult:
+    """
+    Drive requests over `concurrency` keep-alive connections for `duration` seconds.
+
+    `requests` is either a list of paths / RequestSpecs, replayed in a cycle as GETs
+    where a plain path is given, or an endless iterator of RequestSpecs (see
+    benchmarks.scenarios). A request that takes longer than `timeout` seconds
+    counts as an error.
+    """
+    if not isinstance(requests, Iterator):
+        requests = itertools.cycle([RequestSpec("GET", r) if isinstance(r, str) else r for r in requests])
+    result = LoadResult()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(_worker(host, port, requests, deadline, result, timeout) for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(command: List[str], env: dict, cwd: str, port: int, timeout: float = 30,
+                 health_path: str = "/health", log=None, interval: float = 0.2) -> subprocess.Popen:
+    """Start an app server subprocess and wait until it answers `health_path`"""
+    process = subprocess.Popen(command, env={**os.environ, **env}, cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=log or sys.stderr)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}{health_path}", timeout=1)
+            return process
+        except OSError:
+            time.sleep(interval)
+    process.kill()
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
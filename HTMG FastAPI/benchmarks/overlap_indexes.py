@@ -0,0 +1,88 @@
+"""
+Overlap-check and guest-reservation latency before and after the composite index migrations.
+
+Seeds the schema, drops the reservation and room secondary indexes to stand in
+for a database created before they existed, measures, applies the migrations
+the way an existing deployment would get them, and measures again.
+
+    python -m benchmarks.overlap_indexes --rooms 10000 --reservations 1000000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+
+from benchmarks.common import engine, reset_schema, seed, timed
+from database import SessionLocal
+from migrations import MIGRATIONS, create_index
+from models import Reservation, Room
+from utils.common_functions import CommonFunctions
+from utils.serializers import guest_reservation_serializer
+
+INDEXES = ("ix_reservations_room_id_status_dates", "ix_reservations_guest_id_created_at_id", "ix_rooms_status_room_type")
+
+def measure(db, probes, guests):
+    availability = iter(probes)
+    overlap_us = timed(lambda: CommonFunctions.check_room_availability(db, *next(availability)), len(probes))
+    guest_ids = iter(guests)
+    guest_us = timed(lambda: db.execute(
+        select(*guest_reservation_serializer.columns)
+        .join(Room, Room.id == Reservation.room_id)
+        .where(Reservation.guest_id == next(guest_ids))
+        .order_by(Reservation.created_at, Reservation.id)
+        .limit(50)
+    ).all(), len(guests))
+    return overlap_us, guest_us
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--reservations", type=int, default=1_000_000)
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(args.rooms, args.reservations, guests=args.guests)
+    with engine.begin() as conn:
+        for name in INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ANALYZE"))
+
+    rng = random.Random(7)
+    horizon = args.reservations // args.rooms * 7
+    probes = []
+    for _ in range(args.probes):
+        check_in = date.today() + timedelta(days=rng.randint(0, horizon))
+        probes.append((rng.randint(1, args.rooms), check_in, check_in + timedelta(days=rng.randint(1, 5))))
+    guests = [rng.randint(1, args.guests) for _ in range(args.probes)]
+
+    db = SessionLocal()
+    try:
+        before = measure(db, probes, guests)
+        db.rollback()
+
+        started = time.perf_counter()
+        for name in INDEXES:
+            create_index(engine, name)
+        build_s = time.perf_counter() - started
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE"))
+
+        after = measure(db, probes, guests)
+    finally:
+        db.close()
+
+    print(f"{engine.dialect.name} rooms={args.rooms} reservations={args.reservations} probes={args.probes}")
+    print(f"migrations {', '.join(str(m.version) for m in MIGRATIONS if m.version > 1)} built {len(INDEXES)} indexes "
+          f"in {build_s:.1f} s")
+    for label, without, with_index in (("overlap check", before[0], after[0]),
+                                       ("guest reservations", before[1], after[1])):
+        print(f"{label:19}: {without:12.1f} us -> {with_index:8.1f} us  ({without / with_index:.0f}x)")
+
+if __name__ == "__main__":
+    main()
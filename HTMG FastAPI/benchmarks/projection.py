@@ -0,0 +1,71 @@
+"""
+Rows per second and memory per row when listing reservations as full ORM entities
+(the previous `.all()` path) against column-projected rows.
+
+    python -m benchmarks.projection --rows 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from benchmarks.common import reset_schema, seed, Guest, Reservation, Room
+from database import SessionLocal
+from utils.serializers import reservation_serializer
+
+def load_entities(db):
+    """The previous list path: whole entities, with guest and room reached through relationships"""
+    rows = db.query(Reservation).join(Guest).join(Room).all()
+    for r in rows:
+        r.guest.name, r.guest.email, r.room.room_number, r.room.room_type
+    return rows
+
+def load_projection(db):
+    """The current list path: only the response columns, as plain rows"""
+    return (
+        db.query(*reservation_serializer.columns)
+        .join(Guest, Reservation.guest_id == Guest.id)
+        .join(Room, Reservation.room_id == Room.id)
+        .all()
+    )
+
+def measure(loader):
+    """Returns (rows, seconds, retained bytes, identity map size)"""
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = loader(db)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    del rows
+    gc.collect()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        rows = loader(db)
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return len(rows), elapsed, retained, len(db.identity_map)
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the reservations already in the database")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        reset_schema()
+        seed(rooms=5000, reservations=args.rows, guests=10_000)
+
+    for name, loader in (("entities", load_entities), ("projection", load_projection)):
+        count, elapsed, retained, identity_map = measure(loader)
+        gc.collect()
+        print(f"{name:10}: {count / elapsed:10.0f} rows/s  {retained / count:7.0f} bytes/row  "
+              f"identity map {identity_map} objects")
+
+if __name__ == "__main__":
+    main()
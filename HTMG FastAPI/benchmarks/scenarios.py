@@ -0,0 +1,82 @@
+"""
+Request mixes for the load tests. Both apps expose the same paths under /api,
+so every scenario runs unchanged against FastAPI and Flask.
+"""
+import json
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from benchmarks.load import RequestSpec
+
+@dataclass
+class Dataset:
+    """Row counts of the seeded database, so scenarios only ask for ids that exist"""
+    guests: int
+    rooms: int
+    reservations: int
+
+    @classmethod
+    def at_scale(cls, scale: float) -> "Dataset":
+        return cls(guests=int(1000 * scale), rooms=int(100 * scale), reservations=int(5000 * scale))
+
+    def guest(self, rng: random.Random) -> int:
+        return rng.randint(1, self.guests)
+
+    def room(self, rng: random.Random) -> int:
+        return rng.randint(1, self.rooms)
+
+# (weight, endpoint name, request factory)
+Mix = List[Tuple[int, str, Callable[[random.Random, Dataset], RequestSpec]]]
+
+def _get(path: str) -> RequestSpec:
+    return RequestSpec("GET", path)
+
+def _stay(rng: random.Random, earliest: int, latest: int) -> Tuple[date, date]:
+    check_in = date.today() + timedelta(days=rng.randint(earliest, latest))
+    return check_in, check_in + timedelta(days=rng.randint(1, 5))
+
+def _available_rooms(rng: random.Random, data: Dataset) -> RequestSpec:
+    check_in, check_out = _stay(rng, 0, 60)
+    return _get(f"/api/rooms/available?check_in={check_in}&check_out={check_out}")
+
+def _book(rng: random.Random, data: Dataset) -> RequestSpec:
+    # seeded stays cover roughly the first year; later dates mostly succeed, so
+    # the mix exercises both the insert path and the conflict check
+    check_in, check_out = _stay(rng, 30, 3650)
+    body = {"guest_id": data.guest(rng), "room_id": data.room(rng),
+            "check_in": check_in.isoformat(), "check_out": check_out.isoformat()}
+    return RequestSpec("POST", "/api/reservations", json.dumps(body).encode())
+
+SCENARIOS: Dict[str, Mix] = {
+    # front-desk screens and guest apps refreshing small pages and single records
+    "polling": [
+        (4, "GET /api/guests/{id}", lambda rng, data: _get(f"/api/guests/{data.guest(rng)}")),
+        (3, "GET /api/reservations/guest/{id}", lambda rng, data: _get(f"/api/reservations/guest/{data.guest(rng)}")),
+        (2, "GET /api/rooms", lambda rng, data: _get("/api/rooms?limit=20")),
+        (1, "GET /api/rooms/available", _available_rooms),
+    ],
+    # a burst of bookings, with availability searches in between
+    "booking": [
+        (3, "POST /api/reservations", _book),
+        (1, "GET /api/rooms/available", _available_rooms),
+    ],
+    # reports and exports pulling full pages
+    "listing": [
+        (2, "GET /api/reservations", lambda rng, data: _get("/api/reservations?limit=500")),
+        (1, "GET /api/guests", lambda rng, data: _get("/api/guests?limit=500")),
+        (1, "GET /api/rooms", lambda rng, data: _get("/api/rooms?limit=500")),
+    ],
+}
+
+def requests_for(scenario: str, data: Dataset, seed_value: int = 7) -> Iterator[RequestSpec]:
+    """Endless, reproducible stream of named requests drawn from a scenario's weighted mix"""
+    mix = SCENARIOS[scenario]
+    rng = random.Random(seed_value)
+    weights = [weight for weight, _, _ in mix]
+    while True:
+        _, name, factory = rng.choices(mix, weights)[0]
+        spec = factory(rng, data)
+        spec.name = name
+        yield spec
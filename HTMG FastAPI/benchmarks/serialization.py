@@ -0,0 +1,105 @@
+"""
+Encode throughput of list responses: hand-built dicts from entities + BaseResponse +
+response_model re-validation (the previous path) against RowSerializer rows + orjson bytes.
+
+    python -m benchmarks.serialization --rows 50000
+"""
+import argparse
+import json
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from benchmarks.common import reset_schema, seed, timed, Guest, Reservation, Room
+from database import SessionLocal
+from schemas.base import BaseResponse
+from utils.serializers import guest_serializer, json_response, reservation_serializer
+
+response_adapter = TypeAdapter(BaseResponse)
+
+def render_response_model(response: BaseResponse) -> bytes:
+    """What FastAPI does with a returned model when response_model=BaseResponse"""
+    value = response_adapter.validate_python(response.model_dump())
+    return JSONResponse(content=response_adapter.dump_python(value, mode="json")).body
+
+def legacy_reservations(reservations) -> bytes:
+    items = [
+        {
+            "id": r.id,
+            "guest_name": r.guest.name,
+            "guest_email": r.guest.email,
+            "room_number": r.room.room_number,
+            "room_type": r.room.room_type,
+            "check_in": r.check_in.isoformat(),
+            "check_out": r.check_out.isoformat(),
+            "status": r.status,
+            "created_at": r.created_at.isoformat()
+        }
+        for r in reservations
+    ]
+    return render_response_model(BaseResponse(
+        status_code=1, message="Reservations retrieved successfully", data={"items": items, "next_cursor": None}
+    ))
+
+def legacy_guests(guests) -> bytes:
+    items = [
+        {"id": g.id, "name": g.name, "email": g.email, "created_at": g.created_at.isoformat()}
+        for g in guests
+    ]
+    return render_response_model(BaseResponse(
+        status_code=1, message="Guests retrieved successfully", data={"items": items, "next_cursor": None}
+    ))
+
+def fast_reservations(reservations) -> bytes:
+    return json_response(
+        "Reservations retrieved successfully", {"items": reservation_serializer.many(reservations), "next_cursor": None}
+    ).body
+
+def fast_guests(guests) -> bytes:
+    return json_response(
+        "Guests retrieved successfully", {"items": guest_serializer.many(guests), "next_cursor": None}
+    ).body
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    reset_schema()
+    seed(rooms=1000, reservations=args.rows, guests=args.rows)
+
+    db = SessionLocal()
+    try:
+        reservations = db.query(Reservation).options(
+            joinedload(Reservation.guest), joinedload(Reservation.room)
+        ).limit(args.rows).all()
+        guests = db.query(Guest).limit(args.rows).all()
+        # the routes serialize column-projected rows, loaded in the same order
+        reservation_rows = db.execute(
+            select(*reservation_serializer.columns)
+            .join(Guest, Reservation.guest_id == Guest.id)
+            .join(Room, Reservation.room_id == Room.id)
+            .order_by(Reservation.id).limit(args.rows)
+        ).all()
+        guest_rows = db.execute(select(*guest_serializer.columns).order_by(Guest.id).limit(args.rows)).all()
+        reservations.sort(key=lambda r: r.id)
+        guests.sort(key=lambda g: g.id)
+
+        print(f"rows={len(reservations)} iterations={args.iterations}")
+        for name, entities, rows, legacy, fast in (
+            ("reservations", reservations, reservation_rows, legacy_reservations, fast_reservations),
+            ("guests", guests, guest_rows, legacy_guests, fast_guests),
+        ):
+            assert json.loads(legacy(entities)) == json.loads(fast(rows)), f"{name}: outputs differ"
+            before = timed(lambda: legacy(entities), args.iterations) / 1e6
+            after = timed(lambda: fast(rows), args.iterations) / 1e6
+            print(f"{name:12} before {len(rows) / before:10.0f} rows/s  after {len(rows) / after:10.0f} rows/s  "
+                  f"speedup {before / after:5.1f}x")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
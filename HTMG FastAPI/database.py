@@ -1,17 +1,53 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
+from pool_stats import TimedAsyncAdaptedQueuePool, TimedQueuePool, async_pool_stats, pool_stats
+from slow_queries import slow_query_log
+
+# Pool options shared by the sync and async engines
+pool_options = dict(
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping
+)
 
 # Create database engine
 engine = create_engine(
     settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
+    poolclass=TimedQueuePool,
+    **pool_options
 )
+pool_stats.attach(engine)
+slow_query_log.attach(engine)
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _async_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}[dialect]
+    return f"{dialect}+{driver}://{rest}"
+
+# Async engine and sessionmaker, only created when the async mode is enabled
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_database:
+    async_engine = create_async_engine(
+        settings.async_database_url or _async_url(settings.database_url),
+        poolclass=TimedAsyncAdaptedQueuePool,
+        **pool_options
+    )
+    async_pool_stats.attach(async_engine.sync_engine)
+    slow_query_log.attach(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -22,3 +58,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,41 @@
+"""
+Command-line bulk import of guests, rooms or staff from a CSV or NDJSON file.
+
+    python import_data.py guests guests.csv
+    python import_data.py rooms rooms.ndjson --chunk-size 2000
+"""
+import argparse
+import json
+import sys
+
+from database import engine, SessionLocal
+from migrations import migrate
+from utils.importer import IMPORTERS, detect_format, import_records, read_records
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import guests, rooms or staff")
+    parser.add_argument("entity", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="CSV (with header row) or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Detected from the file extension when omitted")
+    parser.add_argument("--chunk-size", type=int, help="Rows per chunk (defaults to settings.import_chunk_size)")
+    args = parser.parse_args()
+
+    migrate(engine)
+
+    def progress(report):
+        print(f"processed={report.processed} inserted={report.inserted} "
+              f"skipped={report.skipped} failed={report.failed}", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as stream:
+            records = read_records(stream, detect_format(args.path, args.format))
+            report = import_records(db, args.entity, records, args.chunk_size, on_progress=progress)
+    finally:
+        db.close()
+
+    print(json.dumps(report.to_dict(), indent=2))
+    return 1 if report.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
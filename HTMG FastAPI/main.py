@@ -1,20 +1,49 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
 from config import settings
-from database import engine, Base
-from routes import guest_router, room_router, staff_router, reservation_router
+from database import engine, async_engine, SessionLocal
+from migrations import migrate
+from pool_stats import async_pool_stats, pool_stats
+from slow_queries import slow_query_log
+from utils.availability_index import availability_index
+from utils.response_cache import response_cache
+from utils import metrics, profiler, query_counter
+if settings.async_database:
+    from async_routes import guest_router, room_router, staff_router, reservation_router
+else:
+    from routes import guest_router, room_router, staff_router, reservation_router
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema checks and index builds run once per worker at startup rather than at
+    # import, so importing the app (tests, tooling, reloader) stays cheap
+    if settings.migrate_on_startup:
+        await run_in_threadpool(migrate, engine)
+    if settings.availability_index_enabled:
+        db = SessionLocal()
+        try:
+            await run_in_threadpool(availability_index.build, db)
+        finally:
+            db.close()
+        availability_index.start_reconciler(SessionLocal, settings.availability_index_reconcile_seconds)
+    yield
+    availability_index.stop_reconciler()
 
-# Create FastAPI application
+# Create FastAPI application; the OpenAPI schema is generated on the first
+# request for /openapi.json (or the docs), not here
 app = FastAPI(
     title=settings.api_title,
     description=settings.api_description,
     version=settings.api_version,
-    docs_url="/docs",
-    redoc_url="/redoc"
+    docs_url="/docs" if settings.api_docs_enabled else None,
+    redoc_url="/redoc" if settings.api_docs_enabled else None,
+    openapi_url="/openapi.json" if settings.api_docs_enabled else None,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -26,6 +55,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count SQL statements per request and enforce the query budget
+query_counter.install(engine)
+if async_engine is not None:
+    query_counter.install(async_engine.sync_engine)
+
+def is_streamed(response) -> bool:
+    """
+    Streamed bodies (the NDJSON exports) have no Content-Length, unlike bodiless
+    204 / 304 answers. Their SQL runs while the body is sent, after the middleware
+    has returned, so per-request query counts and timings would only cover the
+    setup before the first row.
+    """
+    return response.status_code not in (204, 304) and "content-length" not in response.headers
+
+@app.middleware("http")
+async def enforce_query_budget(request: Request, call_next):
+    if settings.query_budget_mode == "off":
+        return await call_next(request)
+    try:
+        with query_counter.count_queries(
+            f"{request.method} {request.url.path}", settings.query_budget, settings.query_budget_mode
+        ) as counter:
+            response = await call_next(request)
+    except query_counter.QueryBudgetExceeded as ex:
+        return JSONResponse(status_code=500, content={"status_code": 2, "message": str(ex), "data": None})
+    # streamed exports are not counted past their first statement; no header rather than a wrong one
+    if settings.query_count_header and not is_streamed(response):
+        response.headers["X-Query-Count"] = str(counter.count)
+    return response
+
+# Server-Timing and sampled stack profiles (see settings.profiling_enabled)
+if settings.profiling_enabled:
+    profiler.install(engine)
+    if async_engine is not None:
+        profiler.install(async_engine.sync_engine)
+
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        sample = profiler.should_sample(
+            settings.profile_sample_rate, request.headers.get(profiler.DEBUG_HEADER), settings.profile_secret
+        )
+        profile, token = profiler.start(
+            f"{request.method} {request.url.path}", sample, settings.profile_interval_ms / 1e3
+        )
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.finish(profile, token)
+        if not is_streamed(response):
+            response.headers["Server-Timing"] = profile.server_timing()
+        if profile.sampled:
+            await run_in_threadpool(profile.write, settings.profile_dir, settings.profile_format, settings.profile_max_files)
+        return response
+
+# Per-route request and SQL metrics, exported at /metrics; outermost, so the
+# recorded latency includes the other middleware
+if settings.metrics_enabled:
+    metrics.install(engine)
+    if async_engine is not None:
+        metrics.install(async_engine.sync_engine)
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(guest_router, prefix="/api")
 app.include_router(room_router, prefix="/api")
@@ -45,6 +136,51 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db", tags=["Health"])
+def database_health():
+    """
+    Connection pool statistics: checked-out connections, overflow, timeouts,
+    and wait / checkout latency histograms in milliseconds
+    """
+    stats = {"status": "healthy", "pool": pool_stats.to_dict()}
+    if settings.async_database:
+        stats["async_pool"] = async_pool_stats.to_dict()
+    return stats
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text exposition: per-route requests, errors and latency, SQL statements, pool gauges"""
+    pools = {"sync": pool_stats}
+    if settings.async_database:
+        pools["async"] = async_pool_stats
+    return PlainTextResponse(metrics.registry.render(pools), media_type="text/plain; version=0.0.4")
+
+@app.get("/health/cache", tags=["Health"])
+def cache_health():
+    """Response cache size and hit / miss / eviction / invalidation counters"""
+    return {"status": "healthy", "response_cache": response_cache.stats()}
+
+@app.get("/admin/slow-queries", tags=["Admin"])
+def slow_queries(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum entries returned"),
+    route: Optional[str] = Query(None, description='Only entries of one route, e.g. "GET /api/reservations"'),
+    min_ms: float = Query(0, ge=0, description="Only entries at least this slow")
+):
+    """
+    Statements slower than slow_query_ms: the most recent executions (normalized SQL,
+    parameter types, route, duration) and per-statement totals with EXPLAIN plans
+    """
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "statements": slow_query_log.statements(),
+        "entries": slow_query_log.entries(limit, route, min_ms)
+    }
+
+@app.delete("/admin/slow-queries", tags=["Admin"])
+def clear_slow_queries():
+    slow_query_log.clear()
+    return {"status": "cleared"}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,179 @@
+"""
+Versioned schema migrations, recorded in the schema_migrations table.
+
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending versions
+
+Migrations only ever add: missing tables, the secondary indexes of the hot
+query shapes, the Postgres constraint that rules out double bookings, and
+the updated_at columns behind the ETags.
+Indexes are created with IF NOT EXISTS, and CONCURRENTLY on Postgres so
+existing tables stay writable while they build. Append new migrations to
+MIGRATIONS with the next version number; never edit applied ones.
+"""
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Set
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from database import Base, engine
+import models  # noqa: F401  (registers every table on Base.metadata)
+from models.reservations import OVERLAP_CONSTRAINT
+
+logger = logging.getLogger(__name__)
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+# Arbitrary key of the Postgres advisory lock that serializes concurrent runners
+_LOCK_KEY = 72_410_019
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Engine], None]
+
+def create_tables(engine: Engine) -> None:
+    """Create missing tables (with their indexes); existing tables are left alone"""
+    Base.metadata.create_all(bind=engine)
+
+def create_index(engine: Engine, name: str) -> None:
+    """
+    Create one of the model indexes if it is missing. On Postgres this runs
+    CREATE INDEX CONCURRENTLY outside a transaction; an INVALID index left by an
+    interrupted build is dropped and rebuilt.
+    """
+    index = next(i for table in Base.metadata.tables.values() for i in table.indexes if i.name == name)
+    quote = engine.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(column.name) for column in index.columns)
+    unique = "UNIQUE " if index.unique else ""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            invalid = conn.execute(text(
+                "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ), {"name": name}).scalar()
+            if invalid:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(name)}"))
+            conn.execute(text(
+                f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} ON {quote(index.table.name)} ({columns})"
+            ))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE {unique}INDEX IF NOT EXISTS {quote(name)} ON {quote(index.table.name)} ({columns})"))
+
+def create_indexes(*names: str) -> Callable[[Engine], None]:
+    def apply(engine: Engine) -> None:
+        for name in names:
+            create_index(engine, name)
+    return apply
+
+def create_overlap_constraint(engine: Engine) -> None:
+    """
+    Postgres only: an exclusion constraint (btree_gist) that refuses a second active
+    stay of a room on any night it is already booked, whatever code path writes it.
+    Adding it fails if the table already holds double bookings; cancel those first.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        exists = conn.execute(text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                              {"name": OVERLAP_CONSTRAINT}).scalar()
+        if not exists:
+            conn.execute(text(
+                f"ALTER TABLE reservations ADD CONSTRAINT {OVERLAP_CONSTRAINT} EXCLUDE USING gist "
+                "(room_id WITH =, daterange(check_in, check_out) WITH &&) "
+                "WHERE (status IN ('confirmed', 'checked_in'))"
+            ))
+
+def add_updated_at(engine: Engine) -> None:
+    """
+    Add the updated_at column read by the ETag watermarks to rooms, guests and
+    reservations, filled from created_at for existing rows, and index it on rooms.
+    """
+    column_type = DateTime().compile(dialect=engine.dialect)
+    for table in ("rooms", "guests", "reservations"):
+        if "updated_at" in {column["name"] for column in inspect(engine).get_columns(table)}:
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at {column_type}"))
+            conn.execute(text(f"UPDATE {table} SET updated_at = created_at"))
+    create_index(engine, "ix_rooms_updated_at")
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create tables", create_tables),
+    Migration(2, "Keyset pagination indexes", create_indexes(
+        "ix_guests_created_at_id", "ix_rooms_created_at_id", "ix_rooms_status_created_at_id",
+        "ix_staff_created_at_id", "ix_staff_department_created_at_id",
+        "ix_reservations_created_at_id", "ix_reservations_guest_id_created_at_id"
+    )),
+    Migration(3, "Booking overlap and free-room search indexes", create_indexes(
+        "ix_reservations_room_id_status_dates", "ix_rooms_status_room_type"
+    )),
+    Migration(4, "Reservation non-overlap exclusion constraint (Postgres)", create_overlap_constraint),
+    Migration(5, "updated_at columns for ETag watermarks", add_updated_at),
+]
+
+def applied_versions(engine: Engine) -> Set[int]:
+    schema_migrations.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)))
+
+def migrate(engine: Engine) -> List[int]:
+    """Apply pending migrations in version order and return the versions applied"""
+    lock = None
+    if engine.dialect.name == "postgresql":
+        # session-level lock on an autocommit connection: no open transaction for
+        # CREATE INDEX CONCURRENTLY to wait on
+        lock = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _LOCK_KEY})
+    try:
+        done = applied_versions(engine)
+        applied = []
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            if migration.version in done:
+                continue
+            logger.info("Applying migration %s: %s", migration.version, migration.description)
+            migration.apply(engine)
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(schema_migrations).values(
+                        version=migration.version, description=migration.description, applied_at=datetime.now()
+                    ))
+            except IntegrityError:
+                # another runner without a lock (SQLite) recorded it first; every step is idempotent
+                pass
+            applied.append(migration.version)
+        return applied
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
+            lock.close()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations without applying")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions(engine)
+        for migration in MIGRATIONS:
+            print(f"{migration.version:4}  {'applied' if migration.version in done else 'pending':8} {migration.description}")
+        return 0
+    applied = migrate(engine)
+    print(f"Applied {len(applied)} migration(s): {applied}" if applied else "Schema is up to date")
+    return 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,15 +1,21 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Index, Integer, String, DateTime
 from sqlalchemy.orm import relationship
 from database import Base
 
 class Guest(Base):
     __tablename__ = 'guests'
+    __table_args__ = (
+        # Keyset pagination order
+        Index('ix_guests_created_at_id', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), nullable=False, unique=True, index=True)
     created_at = Column(DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relationships
     reservations = relationship("Reservation", back_populates="guest")
@@ -1,10 +1,20 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey
+from sqlalchemy import Column, Index, Integer, String, DateTime, Date, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
 
+# Postgres exclusion constraint (migration 4): no two active stays of a room share a night
+OVERLAP_CONSTRAINT = 'ex_reservations_room_active_dates'
+
 class Reservation(Base):
     __tablename__ = 'reservations'
+    __table_args__ = (
+        # Keyset pagination order
+        Index('ix_reservations_created_at_id', 'created_at', 'id'),
+        Index('ix_reservations_guest_id_created_at_id', 'guest_id', 'created_at', 'id'),
+        # Overlap checks: availability and free-room search
+        Index('ix_reservations_room_id_status_dates', 'room_id', 'status', 'check_in', 'check_out'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     guest_id = Column(Integer, ForeignKey('guests.id'), nullable=False)
@@ -13,6 +23,8 @@ class Reservation(Base):
     check_out = Column(Date, nullable=False)
     status = Column(String(20), nullable=False, default='confirmed')
     created_at = Column(DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     # Relationships
     guest = relationship("Guest", back_populates="reservations")
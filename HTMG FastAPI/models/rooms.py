@@ -1,16 +1,27 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Index, Integer, String, DateTime
 from sqlalchemy.orm import relationship
 from database import Base
 
 class Room(Base):
     __tablename__ = 'rooms'
+    __table_args__ = (
+        # Keyset pagination order
+        Index('ix_rooms_created_at_id', 'created_at', 'id'),
+        Index('ix_rooms_status_created_at_id', 'status', 'created_at', 'id'),
+        # Free-room search
+        Index('ix_rooms_status_room_type', 'status', 'room_type'),
+        # ETag watermark of the room list
+        Index('ix_rooms_updated_at', 'updated_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     room_number = Column(String(10), nullable=False, unique=True, index=True)
     room_type = Column(String(50), nullable=False)  # single, double, suite
     status = Column(String(20), nullable=False, default='available')  # available, occupied, maintenance
     created_at = Column(DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     
     # Relationships
     reservations = relationship("Reservation", back_populates="room")
@@ -1,9 +1,14 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Index, Integer, String, DateTime
 from database import Base
 
 class Staff(Base):
     __tablename__ = 'staff'
+    __table_args__ = (
+        # Keyset pagination order
+        Index('ix_staff_created_at_id', 'created_at', 'id'),
+        Index('ix_staff_department_created_at_id', 'department', 'created_at', 'id'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     name = Column(String(100), nullable=False)
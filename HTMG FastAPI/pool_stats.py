@@ -0,0 +1,132 @@
+import threading
+import time
+from bisect import bisect_left
+from itertools import accumulate
+from typing import List
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Histogram bucket upper bounds in milliseconds; the last bucket catches the rest
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+    """Fixed-bucket latency histogram (milliseconds); buckets are reported cumulatively"""
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def to_dict(self) -> dict:
+        cumulative = list(accumulate(self.counts))
+        count = cumulative[-1]
+        buckets = {f"le_{bound}": c for bound, c in zip(BUCKETS_MS, cumulative)}
+        buckets["le_inf"] = count
+        return {
+            "count": count,
+            "avg_ms": round(self.total / count, 3) if count else 0.0,
+            "max_ms": round(self.max, 3),
+            "buckets": buckets
+        }
+
+class PoolStats:
+    """
+    Connection pool counters for one engine.
+
+    Checkouts, checkins, new connections and invalidations come from SQLAlchemy
+    pool events. Wait and checkout latency come from the timed pool classes below,
+    because no pool event fires before a checkout starts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.engine = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            # time spent in the pool queue, including opening a new connection
+            self.wait = Histogram()
+            # full checkout, including the pre-ping when enabled
+            self.checkout_latency = Histogram()
+
+    def attach(self, engine) -> None:
+        """Listen to the pool events of `engine` (sync or async); listeners survive pool recreation"""
+        self.engine = engine
+        pool = engine.pool
+        event.listen(pool, "connect", lambda *args: self._count("connects"))
+        event.listen(pool, "checkout", lambda *args: self._count("checkouts"))
+        event.listen(pool, "checkin", lambda *args: self._count("checkins"))
+        event.listen(pool, "invalidate", lambda *args: self._count("invalidations"))
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def observe(self, histogram: str, started: float) -> None:
+        ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            getattr(self, histogram).observe(ms)
+
+    def to_dict(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__ if pool else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait": self.wait.to_dict(),
+                "checkout_latency": self.checkout_latency.to_dict()
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout()
+            })
+        return stats
+
+class _TimedPoolMixin:
+    """Times queue waits and full checkouts into the class's `_stats`"""
+    _stats: PoolStats
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        self._stats.observe("checkout_latency", started)
+        return connection
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self._stats._count("timeouts")
+            raise
+        finally:
+            self._stats.observe("wait", started)
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    _stats = pool_stats
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    _stats = async_pool_stats
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
+from config import settings
 from database import get_db
 from models.guests import Guest
 from schemas.guests import GuestCreate, GuestResponse
 from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils import query_counter
+from utils.importer import detect_format, import_records, read_records
+from utils.serializers import guest_serializer, json_response
 
 router = APIRouter(prefix="/guests", tags=["Guests"])
 
@@ -20,36 +28,45 @@ router = APIRouter(prefix="/guests", tags=["Guests"])
         500: {"description": "Internal server error"}
     }
 )
-def create_guest(guest: GuestCreate, db: Session = Depends(get_db)):
+def create_guest(
+    guest: GuestCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate email: 'error' reports it, "
+                                                   "'return' also returns the existing guest (for safe client retries)"),
+    db: Session = Depends(get_db)
+):
     """
     Create a new guest with the following information:
     - **name**: Full name of the guest
     - **email**: Valid email address
     """
     try:
-        # Check if guest already exists
-        existing_guest = db.query(Guest).filter(Guest.email == guest.email).first()
-        if existing_guest:
+        # one round trip: a duplicate email inserts nothing and returns no row
+        created = db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Guest, "email", guest.dict(), guest_serializer.columns
+        )).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            db.rollback()
+            if if_exists == "return":
+                existing = db.execute(
+                    select(*guest_serializer.columns).where(Guest.email == guest.email)
+                ).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Guest with this email already exists",
+                        data=guest_serializer(existing)
+                    )
             return BaseResponse(
                 status_code=2,
                 message="Guest with this email already exists"
             )
-        
-        # Create new guest
-        db_guest = Guest(**guest.dict())
-        db.add(db_guest)
         db.commit()
-        db.refresh(db_guest)
         
         return BaseResponse(
             status_code=1,
             message="Guest created successfully",
-            data={
-                "id": db_guest.id,
-                "name": db_guest.name,
-                "email": db_guest.email,
-                "created_at": db_guest.created_at.isoformat()
-            }
+            data=guest_serializer(created)
         )
     except Exception as ex:
         db.rollback()
@@ -62,30 +79,77 @@ def create_guest(guest: GuestCreate, db: Session = Depends(get_db)):
     response_model=BaseResponse,
     summary="Get all guests",
     responses={
-        200: {"description": "List of guests"},
+        200: {
+            "description": "List of guests",
+            "content": {"application/x-ndjson": {}}
+        },
         500: {"description": "Internal server error"}
     }
 )
-def get_all_guests(db: Session = Depends(get_db)):
+def get_all_guests(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    export_format: Optional[str] = Query(None, alias="format", description="Set to 'ndjson' to stream every guest, one JSON object per line"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
+    db: Session = Depends(get_db)
+):
     """
-    Get all guests from the database
+    Get guests from the database, one page at a time.
+    With `?format=ndjson` (or `Accept: application/x-ndjson`) all guests are streamed instead.
+    With `?ids=1,2,3` just those guests are fetched, in chunked IN queries.
     """
     try:
-        guests = db.query(Guest).all()
-        guest_list = [
-            {
-                "id": g.id,
-                "name": g.name,
-                "email": g.email,
-                "created_at": g.created_at.isoformat()
-            }
-            for g in guests
-        ]
+        serializer = guest_serializer.project(fields, keep=(Guest.created_at, Guest.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            statements = CommonFunctions.ids_statements(select(*serializer.columns), Guest.id, id_list)
+            guests, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in db.execute(statement)], id_list
+            )
+            return json_response(
+                message="Guests retrieved successfully",
+                data={
+                    "items": serializer.many(guests),
+                    "missing": missing
+                }
+            )
+
+        if CommonFunctions.wants_ndjson(request, export_format):
+            statement = select(*serializer.columns).order_by(Guest.created_at, Guest.id)
+            return StreamingResponse(
+                CommonFunctions.stream_ndjson(statement, serializer),
+                media_type="application/x-ndjson"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        guests, next_cursor = CommonFunctions.paginate(db.query(*serializer.columns), Guest, after, limit)
+        guest_list = serializer.many(guests)
         
-        return BaseResponse(
-            status_code=1,
+        return json_response(
             message="Guests retrieved successfully",
-            data=guest_list
+            data={
+                "items": guest_list,
+                "next_cursor": next_cursor
+            }
         )
     except Exception as ex:
         return BaseResponse(
@@ -102,29 +166,69 @@ def get_all_guests(db: Session = Depends(get_db)):
         500: {"description": "Internal server error"}
     }
 )
-def get_guest_by_id(guest_id: int, db: Session = Depends(get_db)):
+@conditional_get(lambda guest_id, **_: watermark(Guest, Guest.id == guest_id))
+def get_guest_by_id(
+    guest_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
+    db: Session = Depends(get_db)
+):
     """
     Get a specific guest by their ID
     """
     try:
-        guest = db.query(Guest).filter(Guest.id == guest_id).first()
+        serializer = guest_serializer.project(fields)
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_serializer.names)}"
+            )
+
+        guest = db.query(*serializer.columns).filter(Guest.id == guest_id).first()
         if not guest:
             return BaseResponse(
                 status_code=2,
                 message="Guest not found"
             )
         
+        return json_response(
+            message="Guest retrieved successfully",
+            data=serializer(guest)
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import guests from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+def import_guests(
+    file: UploadFile = File(..., description="CSV with a header row (name, email) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream-import guests in chunks. Rows whose email already exists are skipped.
+    """
+    try:
+        # statement count grows with the file, so imports are exempt from the query budget
+        query_counter.set_budget(None)
+        records = read_records(file.file, detect_format(file.filename, import_format))
+        report = import_records(db, "guests", records)
+
         return BaseResponse(
             status_code=1,
-            message="Guest retrieved successfully",
-            data={
-                "id": guest.id,
-                "name": guest.name,
-                "email": guest.email,
-                "created_at": guest.created_at.isoformat()
-            }
+            message="Guest import finished",
+            data=report.to_dict()
         )
     except Exception as ex:
+        db.rollback()
         return BaseResponse(
             status_code=2,
             message=f"Internal Server Error: {ex}"
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import date
+from typing import Optional
 
 from database import get_db
 from models.reservations import Reservation
 from models.guests import Guest
 from models.rooms import Room
-from schemas.reservations import ReservationCreate, ReservationResponse
+from config import settings
+from schemas.reservations import ReservationCreate, ReservationBulkCreate, ReservationResponse
 from schemas.base import BaseResponse
 from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils.availability_index import availability_index
+from utils.inventory_calendar import inventory_cache
+from utils.serializers import guest_reservation_serializer, json_response, reservation_serializer
 
 router = APIRouter(prefix="/reservations", tags=["Reservations"])
 
@@ -33,17 +42,19 @@ def create_reservation(reservation: ReservationCreate, db: Session = Depends(get
     - **check_out**: Check-out date (YYYY-MM-DD)
     """
     try:
-        # Check if guest exists
-        guest = db.query(Guest).filter(Guest.id == reservation.guest_id).first()
-        if not guest:
+        # One statement locks the room and reads the room and the guest
+        room = CommonFunctions.lock_room_for_booking(db, reservation.guest_id, reservation.room_id)
+
+        # Check if guest exists; without a room row the guest is looked up on its own
+        guest_name = room.guest_name if room else db.scalar(select(Guest.name).where(Guest.id == reservation.guest_id))
+        if guest_name is None:
             return BaseResponse(
                 status_code=2,
                 message="Guest not found"
             )
 
         # Check if room exists
-        room = db.query(Room).filter(Room.id == reservation.room_id).first()
-        if not room:
+        if room is None:
             return BaseResponse(
                 status_code=2,
                 message="Room not found"
@@ -62,31 +73,182 @@ def create_reservation(reservation: ReservationCreate, db: Session = Depends(get
                 message="Check-in cannot be in the past"
             )
 
-        # Check room availability
-        if not CommonFunctions.check_room_availability(db, reservation.room_id, reservation.check_in, reservation.check_out):
+        # Check room availability: status here, overlaps in the insert itself
+        reservation_id = None
+        if room.status == 'available' and not availability_index.overlaps(
+                reservation.room_id, reservation.check_in, reservation.check_out):
+            reservation_id = db.scalar(CommonFunctions.insert_if_available_statement(
+                reservation.guest_id, reservation.room_id, reservation.check_in, reservation.check_out
+            ))
+        if reservation_id is None:
             return BaseResponse(
                 status_code=2,
                 message="Room not available for selected dates"
             )
 
-        # Create new reservation
-        db_reservation = Reservation(**reservation.dict())
-        db.add(db_reservation)
         db.commit()
-        db.refresh(db_reservation)
+        availability_index.add(reservation.room_id, reservation.check_in, reservation.check_out, reservation_id)
+        inventory_cache.add_reservation(reservation.room_id, reservation.check_in, reservation.check_out)
         
         return BaseResponse(
             status_code=1,
             message="Reservation created successfully",
             data={
-                "id": db_reservation.id,
-                "guest_name": guest.name,
+                "id": reservation_id,
+                "guest_name": guest_name,
                 "room_number": room.room_number,
-                "check_in": db_reservation.check_in.isoformat(),
-                "check_out": db_reservation.check_out.isoformat(),
-                "status": db_reservation.status
+                "check_in": reservation.check_in.isoformat(),
+                "check_out": reservation.check_out.isoformat(),
+                "status": "confirmed"
             }
         )
+    except IntegrityError as ex:
+        db.rollback()
+        if CommonFunctions.is_overlap_violation(ex):
+            # the database-side constraint caught an overlap written without the room lock
+            return BaseResponse(
+                status_code=2,
+                message="Room not available for selected dates"
+            )
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+    except Exception as ex:
+        db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+    finally:
+        # end the transaction and release the room lock now: the session is only closed after the response is sent
+        db.rollback()
+
+@router.post("/bulk", 
+    response_model=BaseResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create many reservations at once (all or nothing)",
+    responses={
+        201: {"description": "Reservations created successfully"},
+        400: {"description": "Validation error"},
+        500: {"description": "Internal server error"}
+    }
+)
+def create_reservations_bulk(payload: ReservationBulkCreate, db: Session = Depends(get_db)):
+    """
+    Create a batch of reservations in a single transaction.
+    Guests, rooms and overlaps are validated for the whole batch with one query each,
+    including overlaps between items of the batch. If any item fails, nothing is created
+    and the per-item results say why.
+    """
+    try:
+        items = payload.reservations
+        if len(items) > settings.bulk_max_items:
+            return BaseResponse(
+                status_code=2,
+                message=f"A bulk request can contain at most {settings.bulk_max_items} reservations"
+            )
+
+        guest_names = dict(db.execute(
+            select(Guest.id, Guest.name).where(Guest.id.in_({i.guest_id for i in items}))
+        ).all())
+        rooms = {
+            r.id: r for r in db.execute(
+                select(Room.id, Room.room_number, Room.status).where(Room.id.in_({i.room_id for i in items}))
+            )
+        }
+
+        today = date.today()
+        errors = {}
+        for index, item in enumerate(items):
+            room = rooms.get(item.room_id)
+            if item.guest_id not in guest_names:
+                errors[index] = "Guest not found"
+            elif not room:
+                errors[index] = "Room not found"
+            elif item.check_in >= item.check_out:
+                errors[index] = "Check-out must be after check-in"
+            elif item.check_in < today:
+                errors[index] = "Check-in cannot be in the past"
+            elif room.status != 'available':
+                errors[index] = "Room not available for selected dates"
+
+        # One range query fetches every active stay that could collide with the batch
+        candidates = [(index, item) for index, item in enumerate(items) if index not in errors]
+        booked = {}
+        if candidates:
+            # Lock the batch's rooms first, so concurrent bookings cannot slip in between check and insert
+            CommonFunctions.lock_rooms(db, {item.room_id for _, item in candidates})
+            stays = db.execute(
+                select(Reservation.room_id, Reservation.check_in, Reservation.check_out).where(
+                    Reservation.room_id.in_({item.room_id for _, item in candidates}),
+                    Reservation.status.in_(['confirmed', 'checked_in']),
+                    Reservation.check_out > min(item.check_in for _, item in candidates),
+                    Reservation.check_in < max(item.check_out for _, item in candidates)
+                )
+            )
+            for room_id, check_in, check_out in stays:
+                booked.setdefault(room_id, []).append((check_in, check_out))
+
+        # Walk each room's batch items in check-in order so items also collide with each other
+        for index, item in sorted(candidates, key=lambda c: (c[1].room_id, c[1].check_in)):
+            room_stays = booked.setdefault(item.room_id, [])
+            if any(check_out > item.check_in and check_in < item.check_out for check_in, check_out in room_stays):
+                errors[index] = "Room not available for selected dates"
+            else:
+                room_stays.append((item.check_in, item.check_out))
+
+        if errors:
+            # release the room locks now: the session is only closed after the response is sent
+            db.rollback()
+            return BaseResponse(
+                status_code=2,
+                message="No reservations were created: some items are invalid",
+                data=[
+                    {"index": index, "status_code": 2 if index in errors else 1,
+                     "message": errors.get(index, "Valid")}
+                    for index in range(len(items))
+                ]
+            )
+
+        ids = db.scalars(
+            insert(Reservation).returning(Reservation.id, sort_by_parameter_order=True),
+            [item.dict() for item in items]
+        ).all()
+        db.commit()
+
+        for reservation_id, item in zip(ids, items):
+            availability_index.add(item.room_id, item.check_in, item.check_out, reservation_id)
+            inventory_cache.add_reservation(item.room_id, item.check_in, item.check_out)
+
+        return BaseResponse(
+            status_code=1,
+            message=f"{len(ids)} reservations created successfully",
+            data=[
+                {
+                    "index": index,
+                    "status_code": 1,
+                    "id": reservation_id,
+                    "guest_name": guest_names[item.guest_id],
+                    "room_number": rooms[item.room_id].room_number,
+                    "check_in": item.check_in.isoformat(),
+                    "check_out": item.check_out.isoformat(),
+                    "status": "confirmed"
+                }
+                for index, (reservation_id, item) in enumerate(zip(ids, items))
+            ]
+        )
+    except IntegrityError as ex:
+        db.rollback()
+        if CommonFunctions.is_overlap_violation(ex):
+            return BaseResponse(
+                status_code=2,
+                message="No reservations were created: a room is not available for the selected dates"
+            )
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
     except Exception as ex:
         db.rollback()
         return BaseResponse(
@@ -98,36 +260,83 @@ def create_reservation(reservation: ReservationCreate, db: Session = Depends(get
     response_model=BaseResponse,
     summary="Get all reservations",
     responses={
-        200: {"description": "List of reservations"},
+        200: {
+            "description": "List of reservations",
+            "content": {"application/x-ndjson": {}}
+        },
         500: {"description": "Internal server error"}
     }
 )
-def get_all_reservations(db: Session = Depends(get_db)):
+def get_all_reservations(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    export_format: Optional[str] = Query(None, alias="format", description="Set to 'ndjson' to stream every reservation, one JSON object per line"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,check_in,status; only those columns are selected"),
+    db: Session = Depends(get_db)
+):
     """
-    Get all reservations from the database
+    Get reservations from the database, one page at a time.
+    With `?format=ndjson` (or `Accept: application/x-ndjson`) all reservations are streamed instead.
+    With `?ids=1,2,3` just those reservations are fetched, in chunked IN queries.
     """
     try:
-        reservations = db.query(Reservation).join(Guest).join(Room).all()
+        serializer = reservation_serializer.project(fields, keep=(Reservation.created_at, Reservation.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(reservation_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            joined = CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+            statements = CommonFunctions.ids_statements(joined, Reservation.id, id_list)
+            reservations, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in db.execute(statement)], id_list
+            )
+            return json_response(
+                message="Reservations retrieved successfully",
+                data={
+                    "items": serializer.many(reservations),
+                    "missing": missing
+                }
+            )
+
+        if CommonFunctions.wants_ndjson(request, export_format):
+            statement = (
+                CommonFunctions.join_reservation_tables(select(*serializer.columns), serializer)
+                .order_by(Reservation.created_at, Reservation.id)
+            )
+            return StreamingResponse(
+                CommonFunctions.stream_ndjson(statement, serializer),
+                media_type="application/x-ndjson"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        query = CommonFunctions.join_reservation_tables(db.query(*serializer.columns), serializer)
+        reservations, next_cursor = CommonFunctions.paginate(query, Reservation, after, limit)
         
-        reservation_list = [
-            {
-                "id": r.id,
-                "guest_name": r.guest.name,
-                "guest_email": r.guest.email,
-                "room_number": r.room.room_number,
-                "room_type": r.room.room_type,
-                "check_in": r.check_in.isoformat(),
-                "check_out": r.check_out.isoformat(),
-                "status": r.status,
-                "created_at": r.created_at.isoformat()
-            }
-            for r in reservations
-        ]
+        reservation_list = serializer.many(reservations)
         
-        return BaseResponse(
-            status_code=1,
+        return json_response(
             message="Reservations retrieved successfully",
-            data=reservation_list
+            data={
+                "items": reservation_list,
+                "next_cursor": next_cursor
+            }
         )
     except Exception as ex:
         return BaseResponse(
@@ -143,30 +352,46 @@ def get_all_reservations(db: Session = Depends(get_db)):
         500: {"description": "Internal server error"}
     }
 )
-def get_guest_reservations(guest_id: int, db: Session = Depends(get_db)):
+@conditional_get(lambda guest_id, **_: watermark(Reservation, Reservation.guest_id == guest_id))
+def get_guest_reservations(
+    guest_id: int,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,check_in,status; only those columns are selected"),
+    db: Session = Depends(get_db)
+):
     """
-    Get all reservations for a specific guest
+    Get reservations for a specific guest, one page at a time
     """
     try:
-        reservations = db.query(Reservation).filter(Reservation.guest_id == guest_id).join(Room).all()
+        serializer = guest_reservation_serializer.project(fields, keep=(Reservation.created_at, Reservation.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(guest_reservation_serializer.names)}"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        query = (
+            CommonFunctions.join_reservation_tables(db.query(*serializer.columns), serializer)
+            .filter(Reservation.guest_id == guest_id)
+        )
+        reservations, next_cursor = CommonFunctions.paginate(query, Reservation, after, limit)
         
-        reservation_list = [
-            {
-                "id": r.id,
-                "room_number": r.room.room_number,
-                "room_type": r.room.room_type,
-                "check_in": r.check_in.isoformat(),
-                "check_out": r.check_out.isoformat(),
-                "status": r.status,
-                "created_at": r.created_at.isoformat()
-            }
-            for r in reservations
-        ]
+        reservation_list = serializer.many(reservations)
         
-        return BaseResponse(
-            status_code=1,
+        return json_response(
             message="Guest reservations retrieved successfully",
-            data=reservation_list
+            data={
+                "items": reservation_list,
+                "next_cursor": next_cursor
+            }
         )
     except Exception as ex:
         return BaseResponse(
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional
+from datetime import date, timedelta
+from typing import Literal, Optional
 
 from database import get_db
 from models.rooms import Room
 from schemas.rooms import RoomCreate, RoomResponse
 from schemas.base import BaseResponse
+from config import settings
+from utils.common_functions import CommonFunctions
+from utils.etag import conditional_get, watermark
+from utils.inventory_calendar import inventory_cache
+from utils import query_counter
+from utils.importer import detect_format, import_records, read_records
+from utils.response_cache import response_cache
+from utils.serializers import json_response, room_serializer
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
@@ -20,37 +30,47 @@ router = APIRouter(prefix="/rooms", tags=["Rooms"])
         500: {"description": "Internal server error"}
     }
 )
-def create_room(room: RoomCreate, db: Session = Depends(get_db)):
+def create_room(
+    room: RoomCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate room number: 'error' reports it, "
+                                                   "'return' also returns the existing room (for safe client retries)"),
+    db: Session = Depends(get_db)
+):
     """
     Create a new room with the following information:
     - **room_number**: Unique room number
     - **room_type**: Type of room (single, double, suite)
     """
     try:
-        # Check if room already exists
-        existing_room = db.query(Room).filter(Room.room_number == room.room_number).first()
-        if existing_room:
+        # one round trip: a duplicate room_number inserts nothing and returns no row
+        created = db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Room, "room_number", room.dict(), room_serializer.columns
+        )).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            db.rollback()
+            if if_exists == "return":
+                existing = db.execute(
+                    select(*room_serializer.columns).where(Room.room_number == room.room_number)
+                ).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Room number already exists",
+                        data=room_serializer(existing)
+                    )
             return BaseResponse(
                 status_code=2,
                 message="Room number already exists"
             )
-        
-        # Create new room
-        db_room = Room(**room.dict())
-        db.add(db_room)
         db.commit()
-        db.refresh(db_room)
+        inventory_cache.invalidate()
+        response_cache.invalidate("rooms")
         
         return BaseResponse(
             status_code=1,
             message="Room created successfully",
-            data={
-                "id": db_room.id,
-                "room_number": db_room.room_number,
-                "room_type": db_room.room_type,
-                "status": db_room.status,
-                "created_at": db_room.created_at.isoformat()
-            }
+            data=room_serializer(created)
         )
     except Exception as ex:
         db.rollback()
@@ -59,6 +79,10 @@ def create_room(room: RoomCreate, db: Session = Depends(get_db)):
             message=f"Internal Server Error: {ex}"
         )
 
+def cached_rooms_page(status_filter=None, ids=None, cursor=None, limit=None, fields=None, **_):
+    """The cached room page for these parameters, looked up by conditional_get before any SQL"""
+    return response_cache.get("rooms", (status_filter, cursor, limit, fields)) if ids is None else None
+
 @router.get("", 
     response_model=BaseResponse,
     summary="Get all rooms with optional status filter",
@@ -67,33 +91,119 @@ def create_room(room: RoomCreate, db: Session = Depends(get_db)):
         500: {"description": "Internal server error"}
     }
 )
+@conditional_get(lambda **_: watermark(Room), cached=cached_rooms_page)
 def get_all_rooms(
     status_filter: Optional[str] = Query(None, description="Filter by room status (available, occupied, maintenance)"),
-    db: Session = Depends(get_db)
+    ids: Optional[str] = Query(None, description="Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,room_number; only those columns are selected"),
+    db: Session = Depends(get_db),
+    etag: str = ""
 ):
     """
-    Get all rooms from the database with optional status filtering
+    Get rooms from the database with optional status filtering, one page at a time.
+    Successful pages are cached with their ETag until a room write in this process invalidates
+    them or they expire; a hit (200 or 304) runs no SQL. Writes made by other workers show up
+    once the entry expires (response_cache_seconds).
+    With `?ids=1,2,3` just those rooms are fetched, in chunked IN queries (not cached).
     """
+    cache_key = (status_filter, cursor, limit, fields)
+    generation = response_cache.generation("rooms")
+
     try:
+        serializer = room_serializer.project(fields, keep=(Room.created_at, Room.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(room_serializer.names)}"
+            )
+
+        if ids is not None:
+            id_list = CommonFunctions.parse_ids(ids)
+            if id_list is None:
+                return BaseResponse(
+                    status_code=2,
+                    message=f"Invalid ids: expected 1 to {settings.batch_ids_max} comma-separated integers"
+                )
+            statements = CommonFunctions.ids_statements(select(*serializer.columns), Room.id, id_list)
+            rooms, missing = CommonFunctions.order_by_ids(
+                [row for statement in statements for row in db.execute(statement)], id_list
+            )
+            return json_response(
+                message="Rooms retrieved successfully",
+                data={
+                    "items": serializer.many(rooms),
+                    "missing": missing
+                }
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        query = db.query(*serializer.columns)
         if status_filter:
-            rooms = db.query(Room).filter(Room.status == status_filter).all()
-        else:
-            rooms = db.query(Room).all()
+            query = query.filter(Room.status == status_filter)
+        rooms, next_cursor = CommonFunctions.paginate(query, Room, after, limit)
         
-        room_list = [
-            {
-                "id": r.id,
-                "room_number": r.room_number,
-                "room_type": r.room_type,
-                "status": r.status,
-                "created_at": r.created_at.isoformat()
-            }
-            for r in rooms
-        ]
+        room_list = serializer.many(rooms)
         
-        return BaseResponse(
-            status_code=1,
+        return response_cache.store("rooms", cache_key, generation, json_response(
             message="Rooms retrieved successfully",
+            data={
+                "items": room_list,
+                "next_cursor": next_cursor
+            }
+        ), etag)
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.get("/available", 
+    response_model=BaseResponse,
+    summary="Find rooms free for a date range",
+    responses={
+        200: {"description": "List of free rooms"},
+        400: {"description": "Validation error"},
+        500: {"description": "Internal server error"}
+    }
+)
+def get_available_rooms(
+    check_in: date = Query(..., description="Check-in Date (YYYY-MM-DD)"),
+    check_out: date = Query(..., description="Check-out Date (YYYY-MM-DD)"),
+    room_type: Optional[Literal["single", "double", "suite"]] = Query(None, description="Filter by room type (single, double, suite)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,room_number; only those columns are selected"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get every available room with no active reservation overlapping the given dates
+    """
+    try:
+        serializer = room_serializer.project(fields)
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(room_serializer.names)}"
+            )
+
+        if check_in >= check_out:
+            return BaseResponse(
+                status_code=2,
+                message="Check-out must be after check-in"
+            )
+
+        rooms = CommonFunctions.find_available_rooms(db, check_in, check_out, room_type, serializer.columns)
+
+        room_list = serializer.many(rooms)
+
+        return json_response(
+            message="Available rooms retrieved successfully",
             data=room_list
         )
     except Exception as ex:
@@ -101,3 +211,74 @@ def get_all_rooms(
             status_code=2,
             message=f"Internal Server Error: {ex}"
         )
+
+@router.get("/inventory", 
+    response_model=BaseResponse,
+    summary="Free rooms per room type for each night",
+    responses={
+        200: {"description": "Inventory calendar"},
+        500: {"description": "Internal server error"}
+    }
+)
+def get_room_inventory(
+    start: Optional[date] = Query(None, description="First night (YYYY-MM-DD), defaults to today"),
+    days: int = Query(30, ge=1, le=settings.inventory_max_days, description="Number of nights"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get how many rooms of each type are free on each night of the window
+    """
+    try:
+        start = start or date.today()
+        calendar = inventory_cache.get(db, start, days)
+
+        return json_response(
+            message="Room inventory retrieved successfully",
+            data={
+                "start": start.isoformat(),
+                "days": days,
+                "dates": [(start + timedelta(days=n)).isoformat() for n in range(days)],
+                "free": calendar.free_counts(start, days)
+            }
+        )
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import rooms from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+def import_rooms(
+    file: UploadFile = File(..., description="CSV with a header row (room_number, room_type) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream-import rooms in chunks. Rows whose room number already exists are skipped.
+    """
+    try:
+        # statement count grows with the file, so imports are exempt from the query budget
+        query_counter.set_budget(None)
+        records = read_records(file.file, detect_format(file.filename, import_format))
+        report = import_records(db, "rooms", records,
+                                on_progress=lambda _: response_cache.invalidate("rooms"))
+        inventory_cache.invalidate()
+
+        return BaseResponse(
+            status_code=1,
+            message="Room import finished",
+            data=report.to_dict()
+        )
+    except Exception as ex:
+        db.rollback()
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Literal, Optional
 
 from database import get_db
 from models.staff import Staff
 from schemas.staff import StaffCreate, StaffResponse
 from schemas.base import BaseResponse
+from utils.common_functions import CommonFunctions
+from utils import query_counter
+from utils.importer import detect_format, import_records, read_records
+from utils.response_cache import response_cache
+from utils.serializers import json_response, staff_serializer
 
 router = APIRouter(prefix="/staff", tags=["Staff"])
 
@@ -20,7 +26,12 @@ router = APIRouter(prefix="/staff", tags=["Staff"])
         500: {"description": "Internal server error"}
     }
 )
-def create_staff(staff: StaffCreate, db: Session = Depends(get_db)):
+def create_staff(
+    staff: StaffCreate,
+    if_exists: Literal["error", "return"] = Query("error", description="On a duplicate email: 'error' reports it, "
+                                                   "'return' also returns the existing staff member (for safe client retries)"),
+    db: Session = Depends(get_db)
+):
     """
     Create a new staff member with the following information:
     - **name**: Full name of the staff member
@@ -29,31 +40,34 @@ def create_staff(staff: StaffCreate, db: Session = Depends(get_db)):
     - **position**: Job position
     """
     try:
-        # Check if staff already exists
-        existing_staff = db.query(Staff).filter(Staff.email == staff.email).first()
-        if existing_staff:
+        # one round trip: a duplicate email inserts nothing and returns no row
+        created = db.execute(CommonFunctions.insert_unless_exists_statement(
+            db, Staff, "email", staff.dict(), staff_serializer.columns
+        )).first()
+        if created is None:
+            # release the write lock the insert attempt took
+            db.rollback()
+            if if_exists == "return":
+                existing = db.execute(
+                    select(*staff_serializer.columns).where(Staff.email == staff.email)
+                ).first()
+                if existing is not None:
+                    return BaseResponse(
+                        status_code=1,
+                        message="Staff member with this email already exists",
+                        data=staff_serializer(existing)
+                    )
             return BaseResponse(
                 status_code=2,
                 message="Staff member with this email already exists"
             )
-        
-        # Create new staff member
-        db_staff = Staff(**staff.dict())
-        db.add(db_staff)
         db.commit()
-        db.refresh(db_staff)
+        response_cache.invalidate("staff")
         
         return BaseResponse(
             status_code=1,
             message="Staff member created successfully",
-            data={
-                "id": db_staff.id,
-                "name": db_staff.name,
-                "email": db_staff.email,
-                "department": db_staff.department,
-                "position": db_staff.position,
-                "created_at": db_staff.created_at.isoformat()
-            }
+            data=staff_serializer(created)
         )
     except Exception as ex:
         db.rollback()
@@ -72,35 +86,86 @@ def create_staff(staff: StaffCreate, db: Session = Depends(get_db)):
 )
 def get_all_staff(
     department: Optional[str] = Query(None, description="Filter by department (housekeeping, front_desk, maintenance)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (capped by the server)"),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields, e.g. id,name; only those columns are selected"),
     db: Session = Depends(get_db)
 ):
     """
-    Get all staff members from the database with optional department filtering
+    Get staff members from the database with optional department filtering, one page at a time.
+    Successful pages are served from the response cache until a staff write invalidates it.
     """
+    cache_key = (department, cursor, limit, fields)
+    cached = response_cache.get("staff", cache_key)
+    if cached is not None:
+        return cached
+    generation = response_cache.generation("staff")
+
     try:
+        serializer = staff_serializer.project(fields, keep=(Staff.created_at, Staff.id))
+        if serializer is None:
+            return BaseResponse(
+                status_code=2,
+                message=f"Invalid fields: expected a comma-separated subset of {', '.join(staff_serializer.names)}"
+            )
+
+        after = CommonFunctions.decode_cursor(cursor) if cursor else None
+        if cursor and not after:
+            return BaseResponse(
+                status_code=2,
+                message="Invalid pagination cursor"
+            )
+
+        query = db.query(*serializer.columns)
         if department:
-            staff_members = db.query(Staff).filter(Staff.department == department).all()
-        else:
-            staff_members = db.query(Staff).all()
+            query = query.filter(Staff.department == department)
+        staff_members, next_cursor = CommonFunctions.paginate(query, Staff, after, limit)
         
-        staff_list = [
-            {
-                "id": s.id,
-                "name": s.name,
-                "email": s.email,
-                "department": s.department,
-                "position": s.position,
-                "created_at": s.created_at.isoformat()
-            }
-            for s in staff_members
-        ]
+        staff_list = serializer.many(staff_members)
         
+        return response_cache.store("staff", cache_key, generation, json_response(
+            message="Staff retrieved successfully",
+            data={
+                "items": staff_list,
+                "next_cursor": next_cursor
+            }
+        ))
+    except Exception as ex:
+        return BaseResponse(
+            status_code=2,
+            message=f"Internal Server Error: {ex}"
+        )
+
+@router.post("/import", 
+    response_model=BaseResponse,
+    summary="Import staff members from a CSV or NDJSON file",
+    responses={
+        200: {"description": "Import summary with per-row errors"},
+        500: {"description": "Internal server error"}
+    }
+)
+def import_staff(
+    file: UploadFile = File(..., description="CSV with a header row (name, email, department, position) or NDJSON"),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="File format, detected from the file name when omitted"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream-import staff members in chunks. Rows whose email already exists are skipped.
+    """
+    try:
+        # statement count grows with the file, so imports are exempt from the query budget
+        query_counter.set_budget(None)
+        records = read_records(file.file, detect_format(file.filename, import_format))
+        report = import_records(db, "staff", records,
+                                on_progress=lambda _: response_cache.invalidate("staff"))
+
         return BaseResponse(
             status_code=1,
-            message="Staff retrieved successfully",
-            data=staff_list
+            message="Staff import finished",
+            data=report.to_dict()
         )
     except Exception as ex:
+        db.rollback()
         return BaseResponse(
             status_code=2,
             message=f"Internal Server Error: {ex}"
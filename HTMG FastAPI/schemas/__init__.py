@@ -2,12 +2,12 @@ from .base import BaseResponse
 from .guests import GuestCreate, GuestResponse
 from .rooms import RoomCreate, RoomResponse
 from .staff import StaffCreate, StaffResponse
-from .reservations import ReservationCreate, ReservationResponse
+from .reservations import ReservationCreate, ReservationBulkCreate, ReservationResponse
 
 __all__ = [
     'BaseResponse',
     'GuestCreate', 'GuestResponse',
     'RoomCreate', 'RoomResponse', 
     'StaffCreate', 'StaffResponse',
-    'ReservationCreate', 'ReservationResponse'
+    'ReservationCreate', 'ReservationBulkCreate', 'ReservationResponse'
 ]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
 
 class ReservationBase(BaseModel):
     guest_id: int = Field(..., description="Guest ID", example=1)
@@ -11,6 +11,9 @@ class ReservationBase(BaseModel):
 class ReservationCreate(ReservationBase):
     pass
 
+class ReservationBulkCreate(BaseModel):
+    reservations: List[ReservationCreate] = Field(..., min_length=1, description="Reservations to create together")
+
 class ReservationResponse(BaseModel):
     id: int
     guest_name: str
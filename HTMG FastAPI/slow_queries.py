@@ -0,0 +1,165 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, List, Optional
+from sqlalchemy import event
+from config import settings
+
+# String and numeric literals, and placeholder lists such as IN (?, ?, ?)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+
+# Only these are EXPLAINed; EXPLAIN without ANALYZE never runs the statement
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE")
+_EXPLAIN_PREFIX = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+def normalize(statement: str) -> str:
+    """Collapse whitespace and replace literals and placeholder lists, so equal statements group together"""
+    statement = " ".join(statement.split())
+    statement = _LITERALS.sub("?", statement)
+    return _PLACEHOLDER_LIST.sub("(...)", statement)
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types of the bound parameters, never their values"""
+    if executemany:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}" if parameters else "[]"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        types = [type(value).__name__ for value in parameters]
+        if len(types) > 5 and len(set(types)) == 1:
+            return f"({len(types)} x {types[0]})"
+        return "(" + ", ".join(types) + ")"
+    return type(parameters).__name__
+
+class SlowQueryLog:
+    """
+    Statements slower than `threshold_ms`, hooked into an engine's cursor events.
+
+    Keeps the last `capacity` slow executions in a ring buffer, plus per-statement
+    totals for up to `max_statements` normalized statements (least recently seen
+    are dropped first). With `explain` on, the plan of each distinct slow statement
+    is captured once on Postgres and SQLite, on the same connection and inside a
+    savepoint on Postgres, so a failing EXPLAIN cannot abort the transaction.
+    """
+
+    def __init__(self, threshold_ms: float, capacity: int = 500, max_statements: int = 200,
+                 explain: bool = False, enabled: bool = True):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.enabled = enabled
+        self.max_statements = max_statements
+        self._entries: deque = deque(maxlen=capacity)
+        self._statements: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach(self, engine) -> None:
+        """Listen to `engine` (a sync Engine, or an AsyncEngine's sync_engine)"""
+        if not self.enabled:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1e3
+        if duration_ms >= self.threshold_ms:
+            self.record(conn, statement, parameters, executemany, duration_ms)
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration_ms: float) -> None:
+        sql = normalize(statement)
+        fingerprint = hashlib.sha1(sql.encode()).hexdigest()[:12]
+        entry = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "fingerprint": fingerprint,
+            "duration_ms": round(duration_ms, 3),
+            "route": _current_route(),
+            "sql": sql,
+            "parameters": parameter_shape(parameters, executemany)
+        }
+        with self._lock:
+            self._entries.append(entry)
+            stats = self._statements.pop(fingerprint, None) or {
+                "fingerprint": fingerprint, "sql": sql, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "routes": [], "plan": None
+            }
+            stats["count"] += 1
+            stats["total_ms"] = round(stats["total_ms"] + duration_ms, 3)
+            stats["max_ms"] = max(stats["max_ms"], entry["duration_ms"])
+            stats["last_seen"] = entry["at"]
+            if entry["route"] and entry["route"] not in stats["routes"] and len(stats["routes"]) < 10:
+                stats["routes"].append(entry["route"])
+            self._statements[fingerprint] = stats
+            while len(self._statements) > self.max_statements:
+                self._statements.popitem(last=False)
+            needs_plan = self.explain and stats["plan"] is None and not executemany
+            if needs_plan:
+                # claim it, so concurrent executions do not explain it again
+                stats["plan"] = []
+        if needs_plan:
+            stats["plan"] = _explain(conn, statement, parameters)
+
+    def entries(self, limit: int = 100, route: Optional[str] = None, min_ms: float = 0) -> List[dict]:
+        """Most recent slow executions first"""
+        with self._lock:
+            entries = list(self._entries)
+        matching = [e for e in reversed(entries)
+                    if e["duration_ms"] >= min_ms and (route is None or e["route"] == route)]
+        return matching[:limit]
+
+    def statements(self, limit: int = 50) -> List[dict]:
+        """Distinct slow statements, by total time spent in them"""
+        with self._lock:
+            statements = [dict(s, routes=list(s["routes"])) for s in self._statements.values()]
+        return sorted(statements, key=lambda s: s["total_ms"], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._statements.clear()
+
+def _current_route() -> Optional[str]:
+    # the query counter middleware labels each request "METHOD /path"
+    from utils import query_counter
+    counter = query_counter.current()
+    return counter.label if counter is not None else None
+
+def _explain(conn, statement: str, parameters) -> List[str]:
+    prefix = _EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    savepoint = conn.dialect.name == "postgresql"
+    # a raw DBAPI cursor, so the EXPLAIN itself fires no engine events
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        # SQLite: (id, parent, notused, detail); Postgres: one text column per plan line
+        return [str(row[-1]) for row in rows]
+    except Exception as ex:
+        if savepoint:
+            try:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            except Exception:
+                pass
+        return [f"EXPLAIN failed: {ex}"]
+    finally:
+        cursor.close()
+
+slow_query_log = SlowQueryLog(
+    settings.slow_query_ms, settings.slow_query_log_size, settings.slow_query_max_statements,
+    settings.slow_query_explain, settings.slow_query_log_enabled
+)
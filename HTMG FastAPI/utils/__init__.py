@@ -1,3 +1,5 @@
 from .common_functions import CommonFunctions
+from .availability_index import AvailabilityIndex, availability_index
+from .inventory_calendar import InventoryCalendar, inventory_cache
 
-__all__ = ['CommonFunctions']
+__all__ = ['CommonFunctions', 'AvailabilityIndex', 'availability_index', 'InventoryCalendar', 'inventory_cache']
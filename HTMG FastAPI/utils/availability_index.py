@@ -0,0 +1,115 @@
+import logging
+import threading
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Callable, Dict, List, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.reservations import Reservation
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('confirmed', 'checked_in')
+
+# (check_in, check_out, reservation_id), kept sorted by check_in per room
+Stay = Tuple[date, date, int]
+
+class AvailabilityIndex:
+    """
+    In-process index of active stays per room.
+
+    Answers "does this range overlap an active stay?" in O(log n) so obviously
+    unavailable bookings are rejected without a database round trip. A miss is
+    never trusted on its own: the caller still runs the SQL check, so the
+    database stays the source of truth for the final write.
+
+    The API only ever adds stays (nothing cancels or checks out a reservation),
+    so there is no incremental removal. A stay that stops being active through
+    another process or a direct write keeps its room rejected here until the
+    next reconcile(), i.e. for up to availability_index_reconcile_seconds (300 s).
+    """
+
+    def __init__(self):
+        self._stays: Dict[int, List[Stay]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.ready = False
+
+    @staticmethod
+    def _load(db: Session) -> Dict[int, List[Stay]]:
+        stays: Dict[int, List[Stay]] = {}
+        rows = db.execute(
+            select(Reservation.room_id, Reservation.check_in, Reservation.check_out, Reservation.id)
+            .where(Reservation.status.in_(ACTIVE_STATUSES))
+        )
+        for room_id, check_in, check_out, reservation_id in rows:
+            stays.setdefault(room_id, []).append((check_in, check_out, reservation_id))
+        for room_stays in stays.values():
+            room_stays.sort()
+        return stays
+
+    def build(self, db: Session) -> None:
+        """Load every active stay from the database"""
+        stays = self._load(db)
+        with self._lock:
+            self._stays = stays
+            self.ready = True
+
+    def reconcile(self, db: Session) -> int:
+        """
+        Rebuild from the database and return how many rooms had drifted.
+        Drift comes from writes made by other processes or outside the API.
+        """
+        stays = self._load(db)
+        with self._lock:
+            drifted = sum(
+                1 for room_id in stays.keys() | self._stays.keys()
+                if stays.get(room_id) != self._stays.get(room_id)
+            )
+            self._stays = stays
+            self.ready = True
+        if drifted:
+            logger.info("Availability index reconciled %d drifted room(s)", drifted)
+        return drifted
+
+    def add(self, room_id: int, check_in: date, check_out: date, reservation_id: int) -> None:
+        """Record a committed active stay"""
+        if not self.ready:
+            return
+        with self._lock:
+            insort(self._stays.setdefault(room_id, []), (check_in, check_out, reservation_id))
+
+    def overlaps(self, room_id: int, check_in: date, check_out: date) -> bool:
+        """
+        True if an indexed stay overlaps [check_in, check_out).
+        Active stays of one room never overlap each other, so the stay with the
+        latest check-in before check_out is the only one that can reach past check_in.
+        """
+        if not self.ready:
+            return False
+        with self._lock:
+            room_stays = self._stays.get(room_id)
+            if not room_stays:
+                return False
+            i = bisect_left(room_stays, (check_out,))
+            return i > 0 and room_stays[i - 1][1] > check_in
+
+    def start_reconciler(self, session_factory: Callable[[], Session], interval: int) -> None:
+        """Run reconcile() every `interval` seconds on a daemon thread"""
+        def run():
+            while not self._stop.wait(interval):
+                db = session_factory()
+                try:
+                    self.reconcile(db)
+                except Exception:
+                    logger.exception("Availability index reconciliation failed")
+                finally:
+                    db.close()
+
+        self._stop.clear()
+        threading.Thread(target=run, name="availability-index-reconciler", daemon=True).start()
+
+    def stop_reconciler(self) -> None:
+        self._stop.set()
+
+availability_index = AvailabilityIndex()
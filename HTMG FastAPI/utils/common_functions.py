@@ -1,8 +1,24 @@
 import re
-from datetime import date
+import json
+import time
+import asyncio
+import base64
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from fastapi import Request
+from sqlalchemy import insert, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models.reservations import Reservation
+from config import settings
+from database import SessionLocal, AsyncSessionLocal
+from models.guests import Guest
+from models.reservations import OVERLAP_CONSTRAINT, Reservation
 from models.rooms import Room
+from utils.availability_index import availability_index
+from utils.serializers import ndjson_lines
 
 class CommonFunctions:
 
@@ -16,6 +32,10 @@ class CommonFunctions:
     def check_room_availability(db: Session, room_id: int, check_in: date, check_out: date) -> bool:
         """Check if room is available for given dates"""
         try:
+            # Fast reject from the in-process index; a miss still goes to the database
+            if availability_index.overlaps(room_id, check_in, check_out):
+                return False
+
             room = db.query(Room).filter(Room.id == room_id).first()
             if not room or room.status != 'available':
                 return False
@@ -30,3 +50,277 @@ class CommonFunctions:
             return overlapping is None
         except Exception:
             return False
+
+    @staticmethod
+    async def check_room_availability_async(db: AsyncSession, room_id: int, check_in: date, check_out: date) -> bool:
+        """Async variant of check_room_availability"""
+        try:
+            if availability_index.overlaps(room_id, check_in, check_out):
+                return False
+
+            room = await db.get(Room, room_id)
+            if not room or room.status != 'available':
+                return False
+
+            overlapping = await db.scalar(select(Reservation.id).where(
+                Reservation.room_id == room_id,
+                Reservation.status.in_(['confirmed', 'checked_in']),
+                Reservation.check_out > check_in,
+                Reservation.check_in < check_out
+            ).limit(1))
+
+            return overlapping is None
+        except Exception:
+            return False
+
+    @staticmethod
+    def lock_rooms(db: Session, room_ids: Iterable[int]) -> None:
+        """
+        Serialize bookings of the given rooms until the transaction ends. Call it
+        before the availability check and the insert, ahead of any other write.
+        Postgres locks the room rows (in id order, so batches cannot deadlock) and
+        bookings of other rooms go ahead in parallel. SQLite allows one writer, so
+        the transaction starts with BEGIN IMMEDIATE, retried booking_lock_retries
+        times when the database is still locked after the busy timeout.
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            db.execute(select(Room.id).where(Room.id.in_(sorted(set(room_ids)))).order_by(Room.id).with_for_update())
+            return
+        for attempt in range(settings.booking_lock_retries + 1):
+            try:
+                db.execute(text("BEGIN IMMEDIATE"))
+                return
+            except OperationalError as ex:
+                if "locked" not in str(ex) or attempt == settings.booking_lock_retries:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    @staticmethod
+    async def lock_rooms_async(db: AsyncSession, room_ids: Iterable[int]) -> None:
+        """Async variant of lock_rooms"""
+        if db.get_bind().dialect.name != "sqlite":
+            await db.execute(select(Room.id).where(Room.id.in_(sorted(set(room_ids)))).order_by(Room.id).with_for_update())
+            return
+        for attempt in range(settings.booking_lock_retries + 1):
+            try:
+                await db.execute(text("BEGIN IMMEDIATE"))
+                return
+            except OperationalError as ex:
+                if "locked" not in str(ex) or attempt == settings.booking_lock_retries:
+                    raise
+                await asyncio.sleep(0.05 * 2 ** attempt)
+
+    @staticmethod
+    def insert_unless_exists_statement(db, model, key: str, values: dict, columns: Sequence):
+        """
+        INSERT ... ON CONFLICT (key) DO NOTHING RETURNING `columns` (Postgres and SQLite).
+        One round trip, and no window between a duplicate check and the insert for a
+        concurrent request to slip into: a duplicate `key` just returns no row.
+        """
+        dialect_insert = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}[db.get_bind().dialect.name]
+        return dialect_insert(model).values(**values).on_conflict_do_nothing(index_elements=[key]).returning(*columns)
+
+    @staticmethod
+    def booking_lookup_statement(guest_id: int, room_id: int):
+        """One row with the room's number and status and the guest's name (None if no such guest); no row if no such room"""
+        guest_name = select(Guest.name).where(Guest.id == guest_id).scalar_subquery()
+        return select(Room.room_number, Room.status, guest_name.label("guest_name")).where(Room.id == room_id)
+
+    @staticmethod
+    def lock_room_for_booking(db: Session, guest_id: int, room_id: int):
+        """
+        Lock the room as lock_rooms does and read the booking_lookup_statement row.
+        On Postgres both happen in one statement (SELECT ... FOR UPDATE OF rooms).
+        """
+        statement = CommonFunctions.booking_lookup_statement(guest_id, room_id)
+        if db.get_bind().dialect.name == "sqlite":
+            CommonFunctions.lock_rooms(db, [room_id])
+        else:
+            statement = statement.with_for_update(of=Room)
+        return db.execute(statement).first()
+
+    @staticmethod
+    async def lock_room_for_booking_async(db: AsyncSession, guest_id: int, room_id: int):
+        """Async variant of lock_room_for_booking"""
+        statement = CommonFunctions.booking_lookup_statement(guest_id, room_id)
+        if db.get_bind().dialect.name == "sqlite":
+            await CommonFunctions.lock_rooms_async(db, [room_id])
+        else:
+            statement = statement.with_for_update(of=Room)
+        return (await db.execute(statement)).first()
+
+    @staticmethod
+    def insert_if_available_statement(guest_id: int, room_id: int, check_in: date, check_out: date):
+        """
+        INSERT ... SELECT ... WHERE NOT EXISTS: books the stay only if no active
+        reservation of the room overlaps it, and returns the new id (no row otherwise).
+        Run it after lock_rooms, so the overlap check sees every committed booking.
+        """
+        overlapping = select(Reservation.id).where(
+            Reservation.room_id == room_id,
+            Reservation.status.in_(['confirmed', 'checked_in']),
+            Reservation.check_out > check_in,
+            Reservation.check_in < check_out
+        ).exists()
+        values = select(
+            literal(guest_id, Reservation.guest_id.type), literal(room_id, Reservation.room_id.type),
+            literal(check_in, Reservation.check_in.type), literal(check_out, Reservation.check_out.type),
+            literal('confirmed', Reservation.status.type), literal(datetime.now(), Reservation.created_at.type)
+        ).where(~overlapping)
+        return insert(Reservation).from_select(
+            ["guest_id", "room_id", "check_in", "check_out", "status", "created_at"], values
+        ).returning(Reservation.id)
+
+    @staticmethod
+    def is_overlap_violation(ex: IntegrityError) -> bool:
+        """True if an insert was refused by the Postgres non-overlap exclusion constraint"""
+        return OVERLAP_CONSTRAINT in str(ex.orig)
+
+    @staticmethod
+    def available_rooms_statement(check_in: date, check_out: date, room_type: Optional[str] = None,
+                                  columns: Optional[Sequence] = None):
+        """
+        Select every available room with no active reservation overlapping the dates.
+        Uses the same overlap rule as check_room_availability, as one anti-join.
+        Selects `columns` as plain rows when given, whole Room entities otherwise.
+        """
+        overlapping = select(Reservation.id).where(
+            Reservation.room_id == Room.id,
+            Reservation.status.in_(['confirmed', 'checked_in']),
+            Reservation.check_out > check_in,
+            Reservation.check_in < check_out
+        ).exists()
+
+        statement = select(*(columns or [Room])).where(Room.status == 'available', ~overlapping)
+        if room_type:
+            statement = statement.where(Room.room_type == room_type)
+        return statement.order_by(Room.id)
+
+    @staticmethod
+    def find_available_rooms(db: Session, check_in: date, check_out: date, room_type: Optional[str] = None,
+                             columns: Optional[Sequence] = None) -> list:
+        """Find every available room with no active reservation overlapping the dates"""
+        statement = CommonFunctions.available_rooms_statement(check_in, check_out, room_type, columns)
+        return (db.execute(statement) if columns else db.scalars(statement)).all()
+
+    @staticmethod
+    def encode_cursor(created_at: datetime, row_id: int) -> str:
+        """Encode a (created_at, id) keyset position as an opaque cursor token"""
+        raw = json.dumps([created_at.isoformat(), row_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+        """Decode a cursor token back to (created_at, id), or None if it is malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, row_id = json.loads(raw)
+            return datetime.fromisoformat(created_at), int(row_id)
+        except Exception:
+            return None
+
+    @staticmethod
+    def keyset_query(query, model, after: Optional[Tuple[datetime, int]] = None, limit: Optional[int] = None):
+        """
+        Restrict a Query or select() to one keyset page on (created_at, id).
+        Fetches one extra row so split_page can tell whether another page exists.
+        Returns the new query and the effective page size.
+        """
+        limit = min(limit or settings.default_page_size, settings.max_page_size)
+        if after:
+            query = query.filter(tuple_(model.created_at, model.id) > after)
+        return query.order_by(model.created_at, model.id).limit(limit + 1), limit
+
+    @staticmethod
+    def split_page(rows: list, limit: int):
+        """Trim the look-ahead row and build the next cursor (None on the last page)"""
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, CommonFunctions.encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    @staticmethod
+    def paginate(query, model, after: Optional[Tuple[datetime, int]] = None, limit: Optional[int] = None):
+        """
+        Keyset-paginate a query on (created_at, id).
+        Returns the page rows and the cursor for the next page (None on the last page).
+        """
+        query, limit = CommonFunctions.keyset_query(query, model, after, limit)
+        return CommonFunctions.split_page(query.all(), limit)
+
+    @staticmethod
+    def parse_ids(ids: str) -> Optional[List[int]]:
+        """
+        Parse a comma-separated ?ids= list, dropping repeats but keeping the input order.
+        None if an entry is not an integer or there are more than batch_ids_max ids.
+        """
+        try:
+            parsed = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+        except ValueError:
+            return None
+        if not parsed or len(parsed) > settings.batch_ids_max:
+            return None
+        return parsed
+
+    @staticmethod
+    def ids_statements(statement, id_column, ids: list) -> list:
+        """`statement` restricted to `id_column IN (...)`, one statement per batch_ids_chunk_size values"""
+        size = settings.batch_ids_chunk_size
+        return [statement.where(id_column.in_(ids[start:start + size])) for start in range(0, len(ids), size)]
+
+    @staticmethod
+    def order_by_ids(rows: Iterable, ids: List[int]) -> Tuple[list, List[int]]:
+        """Rows (keyed by their `id`) in the order of `ids`, and the ids no row was found for"""
+        by_id = {row.id: row for row in rows}
+        return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+    @staticmethod
+    def join_reservation_tables(query, serializer):
+        """
+        Select a Query or select() from reservations, joining guests and rooms only
+        when `serializer` selects columns from them.
+        """
+        query = query.select_from(Reservation)
+        if serializer.selects_from(Guest):
+            query = query.join(Guest, Reservation.guest_id == Guest.id)
+        if serializer.selects_from(Room):
+            query = query.join(Room, Reservation.room_id == Room.id)
+        return query
+
+    @staticmethod
+    def call_with_session(func: Callable, **kwargs):
+        """Call a sync route function with its own session; used to run blocking work off the event loop"""
+        db = SessionLocal()
+        try:
+            return func(db=db, **kwargs)
+        finally:
+            db.close()
+
+    @staticmethod
+    def wants_ndjson(request: Request, export_format: Optional[str] = None) -> bool:
+        """True when the client asked for an NDJSON stream via ?format=ndjson or the Accept header"""
+        if export_format:
+            return export_format.lower() == 'ndjson'
+        return 'application/x-ndjson' in request.headers.get('accept', '')
+
+    @staticmethod
+    def stream_ndjson(statement, serialize: Callable) -> Iterator[bytes]:
+        """
+        Stream the rows of a select statement as NDJSON using a server-side cursor.
+        Opens its own session because the generator outlives the request dependency.
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(statement.execution_options(yield_per=settings.stream_batch_size))
+            for rows in result.partitions():
+                yield ndjson_lines(serialize(row) for row in rows)
+        finally:
+            db.close()
+
+    @staticmethod
+    async def stream_ndjson_async(statement, serialize: Callable) -> AsyncIterator[bytes]:
+        """Async variant of stream_ndjson, for the async database mode"""
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(statement.execution_options(yield_per=settings.stream_batch_size))
+            async for rows in result.partitions():
+                yield ndjson_lines(serialize(row) for row in rows)
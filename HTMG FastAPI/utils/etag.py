@@ -0,0 +1,120 @@
+import functools
+import hashlib
+import inspect
+from typing import Callable, Optional
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+def watermark(model, *criteria) -> Select:
+    """
+    Cheap version of the rows matching `criteria`: their count plus the highest
+    id and updated_at. Inserts and deletes move the count or id, and updates move
+    updated_at, which the model sets on every SQLAlchemy UPDATE.
+    """
+    return select(func.count(model.id), func.max(model.id), func.max(model.updated_at)).where(*criteria)
+
+def make_etag(version, query: str) -> str:
+    """Strong ETag over a version row and the query string (filters and page)"""
+    digest = hashlib.sha1(repr((tuple(version), query)).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix still matches"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def succeeded(result) -> bool:
+    """
+    True for a successful route result: a BaseResponse or dict with status_code 1,
+    or a 2xx Response whose JSON body (see json_response, which writes status_code
+    first) does not report status_code 2. Streams count as successful.
+    """
+    if isinstance(result, Response):
+        body = getattr(result, "body", None)
+        return 200 <= result.status_code < 300 and not (body and body.startswith(b'{"status_code":2'))
+    status_code = result.get("status_code") if isinstance(result, dict) else getattr(result, "status_code", None)
+    return status_code == 1
+
+def conditional_get(version: Callable[..., Select], cached: Optional[Callable[..., Optional[Response]]] = None):
+    """
+    Add ETag / If-None-Match support to a GET route that takes a `db` session.
+
+    `version` receives the route's path and query parameters as keywords and
+    returns a cheap SELECT (see watermark) whose single row identifies the
+    current state. When the client's If-None-Match matches, the route returns
+    304 without running its query or serializing anything. Only successful
+    responses get an ETag, so an error body is never replayed through a 304.
+    A route that declares an `etag` parameter receives the computed ETag (to key
+    a cache on it); it is not exposed as a query parameter. `cached` receives the
+    same keywords and returns a cached Response carrying its ETag, or None; a hit
+    is answered (200 or 304) before the version query, so it runs no SQL. Works on
+    sync routes (Session) and async routes (AsyncSession).
+
+    The ETag only changes when the watermark does: a raw SQL UPDATE that leaves
+    updated_at alone, a write stamped by a worker whose clock lags behind, or a
+    change to a joined table (rooms shown in a guest's reservations) is not seen.
+    """
+    def decorator(route):
+        signature = inspect.signature(route)
+        extra = [
+            inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation)
+            for name, annotation in (("request", Request), ("response", Response))
+            if name not in signature.parameters
+        ]
+
+        wants_etag = "etag" in signature.parameters
+
+        def prepare(kwargs):
+            request = kwargs["request"] if "request" in signature.parameters else kwargs.pop("request")
+            response = kwargs["response"] if "response" in signature.parameters else kwargs.pop("response")
+            params = {k: v for k, v in kwargs.items() if k not in ("db", "request", "response")}
+            return request, response, version(**params)
+
+        def from_cache(request, kwargs):
+            hit = cached(**{k: v for k, v in kwargs.items() if k not in ("db", "request", "response")})
+            if hit is not None and etag_matches(request.headers.get("if-none-match"), hit.headers.get("ETag", "")):
+                return Response(status_code=304, headers={"ETag": hit.headers["ETag"]})
+            return hit
+
+        def tag(result, response, etag):
+            # routes may return a ready Response (cached bytes, streams) or a model
+            if succeeded(result):
+                (result if isinstance(result, Response) else response).headers["ETag"] = etag
+            return result
+
+        if inspect.iscoroutinefunction(route):
+            @functools.wraps(route)
+            async def wrapper(**kwargs):
+                request, response, statement = prepare(kwargs)
+                hit = from_cache(request, kwargs) if cached else None
+                if hit is not None:
+                    return hit
+                row = (await kwargs["db"].execute(statement)).one()
+                etag = make_etag(row, request.url.query)
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                if wants_etag:
+                    kwargs["etag"] = etag
+                return tag(await route(**kwargs), response, etag)
+        else:
+            @functools.wraps(route)
+            def wrapper(**kwargs):
+                request, response, statement = prepare(kwargs)
+                hit = from_cache(request, kwargs) if cached else None
+                if hit is not None:
+                    return hit
+                row = kwargs["db"].execute(statement).one()
+                etag = make_etag(row, request.url.query)
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                if wants_etag:
+                    kwargs["etag"] = etag
+                return tag(route(**kwargs), response, etag)
+
+        parameters = [parameter for parameter in signature.parameters.values() if parameter.name != "etag"]
+        wrapper.__signature__ = signature.replace(parameters=[*parameters, *extra])
+        return wrapper
+    return decorator
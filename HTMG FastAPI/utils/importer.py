@@ -0,0 +1,166 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from config import settings
+from models import Guest, Room, Staff
+from utils.common_functions import CommonFunctions
+from schemas import GuestCreate, RoomCreate, StaffCreate
+
+# entity -> (model, input schema, unique key, column defaults not covered by the schema)
+IMPORTERS = {
+    'guests': (Guest, GuestCreate, 'email', {}),
+    'rooms': (Room, RoomCreate, 'room_number', {'status': 'available'}),
+    'staff': (Staff, StaffCreate, 'email', {}),
+}
+
+# (line number, parsed record or None, parse error or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+class ImportReport:
+    """Running totals for one import; keeps at most `import_max_errors` error rows"""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def add_error(self, line: Optional[int], error: str, rows: int = 1) -> None:
+        self.failed += rows
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors
+        }
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick 'csv' or 'ndjson' from an explicit choice or the file extension"""
+    if requested:
+        return requested.lower()
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+def read_records(stream: Iterable[bytes], file_format: str) -> Iterator[Record]:
+    """Lazily parse a binary CSV or NDJSON stream line by line"""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, {k: v for k, v in record.items() if k is not None}, None
+    elif file_format == 'ndjson':
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as ex:
+                yield line_num, None, f"Invalid JSON: {ex}"
+                continue
+            if isinstance(record, dict):
+                yield line_num, record, None
+            else:
+                yield line_num, None, "Each line must be a JSON object"
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+def _copy_rows(db: Session, model, rows: List[dict]) -> None:
+    """Load rows with Postgres COPY through the session's connection"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[c] for c in columns] for row in rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    finally:
+        cursor.close()
+
+def import_records(
+    db: Session,
+    entity: str,
+    records: Iterator[Record],
+    chunk_size: Optional[int] = None,
+    on_progress: Optional[Callable[[ImportReport], None]] = None
+) -> ImportReport:
+    """
+    Import records chunk by chunk. Each chunk is validated, de-duplicated on its
+    unique key in memory, checked against existing rows with IN queries of
+    batch_ids_chunk_size keys (under SQLite's 999 bind-parameter limit) and written with executemany (COPY on Postgres), then committed.
+    """
+    model, schema, key, defaults = IMPORTERS[entity]
+    key_column = getattr(model, key)
+    use_copy = db.get_bind().dialect.name == 'postgresql'
+    chunk_size = chunk_size or settings.import_chunk_size
+    report = ImportReport()
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        rows: Dict[str, dict] = {}
+        for line, record, error in chunk:
+            report.processed += 1
+            if error:
+                report.add_error(line, error)
+                continue
+            try:
+                row = schema(**record).dict()
+            except ValidationError as ex:
+                report.add_error(line, "; ".join(
+                    f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in ex.errors()
+                ))
+                continue
+            if row[key] in rows:
+                report.skipped += 1
+                continue
+            rows[row[key]] = row
+
+        existing = {
+            value
+            for statement in CommonFunctions.ids_statements(select(key_column), key_column, list(rows))
+            for value in db.scalars(statement)
+        }
+        now = datetime.now()
+        # COPY skips the model's Python-side defaults, so the timestamps are set here
+        timestamps = {'created_at': now, 'updated_at': now} if hasattr(model, 'updated_at') else {'created_at': now}
+        new_rows = [
+            {**defaults, **row, **timestamps}
+            for value, row in rows.items() if value not in existing
+        ]
+        report.skipped += len(rows) - len(new_rows)
+
+        if new_rows:
+            try:
+                if use_copy:
+                    _copy_rows(db, model, new_rows)
+                else:
+                    db.execute(insert(model), new_rows)
+                db.commit()
+                report.inserted += len(new_rows)
+            except Exception as ex:
+                db.rollback()
+                report.add_error(chunk[0][0], f"Chunk starting at line {chunk[0][0]} was not imported: {ex}",
+                                 rows=len(new_rows))
+
+        if on_progress:
+            on_progress(report)
+
+    return report
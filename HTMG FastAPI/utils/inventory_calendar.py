@@ -0,0 +1,144 @@
+import threading
+import time
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from config import settings
+from models.reservations import Reservation
+from models.rooms import Room
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ACTIVE_STATUSES = ('confirmed', 'checked_in')
+ROOM_TYPES = ('single', 'double', 'suite')
+
+class InventoryCalendar:
+    """
+    Room x night occupancy matrix over a fixed window of nights.
+
+    occupancy[r, n] counts active stays of room r on night start + n, so
+    reservations can be added (and removed) incrementally without a rebuild.
+    numpy is imported on first use rather than with the module, so it is only
+    loaded once /rooms/inventory is asked for, not on every app start.
+    """
+
+    def __init__(self, start: date, days: int, room_ids: Sequence[int], room_types: Sequence[str],
+                 bookable: Sequence[bool]):
+        import numpy as np
+
+        self.start = start
+        self.days = days
+        order = np.argsort(np.asarray(room_ids, dtype=np.int64))
+        self.room_ids = np.asarray(room_ids, dtype=np.int64)[order]
+        self.room_types = np.asarray(room_types, dtype=object)[order]
+        self.bookable = np.asarray(bookable, dtype=bool)[order]
+        self.occupancy = np.zeros((len(self.room_ids), days), dtype=np.int16)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, db: Session, start: date, days: int) -> "InventoryCalendar":
+        """Load rooms and the active reservations touching the window, then mark them in bulk"""
+        rooms = db.execute(select(Room.id, Room.room_type, Room.status)).all()
+        calendar = cls(
+            start, days,
+            [r.id for r in rooms], [r.room_type for r in rooms], [r.status == 'available' for r in rooms]
+        )
+
+        end = start + timedelta(days=days)
+        stays = db.execute(
+            select(Reservation.room_id, Reservation.check_in, Reservation.check_out).where(
+                Reservation.status.in_(ACTIVE_STATUSES),
+                Reservation.check_out > start,
+                Reservation.check_in < end
+            )
+        ).all()
+        if stays:
+            room_ids, check_ins, check_outs = zip(*stays)
+            calendar.mark(room_ids, check_ins, check_outs)
+        return calendar
+
+    def _offsets(self, dates: Sequence[date]) -> "np.ndarray":
+        """Night offsets from the window start, clipped to [0, days]"""
+        import numpy as np
+
+        # date.toordinal() is far cheaper than numpy's datetime64 conversion of date objects
+        offsets = np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates))
+        return np.clip(offsets - self.start.toordinal(), 0, self.days)
+
+    def mark(self, room_ids: Sequence[int], check_ins: Sequence[date], check_outs: Sequence[date], delta: int = 1) -> None:
+        """
+        Add `delta` to every night of every given stay at once: +delta at each
+        check-in, -delta at each check-out, then a cumulative sum along the nights.
+        """
+        import numpy as np
+
+        rows = np.searchsorted(self.room_ids, np.asarray(room_ids, dtype=np.int64))
+        starts = self._offsets(check_ins)
+        ends = self._offsets(check_outs)
+        keep = (rows < len(self.room_ids)) & (starts < ends)
+        rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+        width = self.days + 1
+        size = len(self.room_ids) * width
+        diff = (
+            np.bincount(rows * width + starts, minlength=size) -
+            np.bincount(rows * width + ends, minlength=size)
+        ).reshape(len(self.room_ids), width) * delta
+        with self._lock:
+            self.occupancy += np.cumsum(diff[:, :-1], axis=1).astype(np.int16)
+
+    def add_reservation(self, room_id: int, check_in: date, check_out: date, delta: int = 1) -> None:
+        """Mark a single stay; touches only that room's row"""
+        import numpy as np
+
+        row = int(np.searchsorted(self.room_ids, room_id))
+        if row >= len(self.room_ids) or self.room_ids[row] != room_id:
+            return
+        first, last = self._offsets([check_in, check_out])
+        with self._lock:
+            self.occupancy[row, first:last] += delta
+
+    def covers(self, start: date, days: int) -> bool:
+        return self.start <= start and start + timedelta(days=days) <= self.start + timedelta(days=self.days)
+
+    def free_counts(self, start: date, days: int) -> Dict[str, List[int]]:
+        """Free rooms per room type for each night of [start, start + days)"""
+        first = (start - self.start).days
+        with self._lock:
+            free = (self.occupancy[:, first:first + days] == 0) & self.bookable[:, None]
+        return {
+            room_type: free[self.room_types == room_type].sum(axis=0).tolist()
+            for room_type in ROOM_TYPES + tuple(sorted(set(self.room_types) - set(ROOM_TYPES)))
+        }
+
+class InventoryCache:
+    """Keeps the last built calendar and serves any window it covers until it expires"""
+
+    def __init__(self):
+        self._calendar: Optional[InventoryCalendar] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, start: date, days: int) -> InventoryCalendar:
+        with self._lock:
+            calendar = self._calendar
+            fresh = time.monotonic() - self._built_at < settings.inventory_cache_seconds
+            if calendar and fresh and calendar.covers(start, days):
+                return calendar
+
+            calendar = InventoryCalendar.build(db, start, max(days, settings.inventory_horizon_days))
+            self._calendar, self._built_at = calendar, time.monotonic()
+            return calendar
+
+    def add_reservation(self, room_id: int, check_in: date, check_out: date) -> None:
+        calendar = self._calendar
+        if calendar:
+            calendar.add_reservation(room_id, check_in, check_out)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._calendar = None
+
+inventory_cache = InventoryCache()
@@ -0,0 +1,87 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# statements kept per counter for the budget report
+MAX_RECORDED = 20
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+class QueryCounter:
+    """SQL statements executed within one request (or one `count_queries` block)"""
+
+    def __init__(self, label: str, budget: Optional[int] = None):
+        self.label = label
+        self.budget = budget
+        self.count = 0
+        self.statements: List[str] = []
+
+    def add(self, statement: str) -> None:
+        self.count += 1
+        if len(self.statements) < MAX_RECORDED:
+            self.statements.append(" ".join(statement.split()))
+
+    @property
+    def exceeded(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def report(self) -> str:
+        statements = "\n  ".join(self.statements)
+        return f"{self.label} ran {self.count} SQL statements (budget {self.budget}):\n  {statements}"
+
+_current: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.add(statement)
+
+def install(engine) -> None:
+    """Count statements run on `engine` (a sync Engine, or an AsyncEngine's sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+def current() -> Optional[QueryCounter]:
+    return _current.get()
+
+def set_budget(budget: Optional[int]) -> None:
+    """
+    Change the budget of the running request. Routes whose statement count
+    grows with their input (imports) call set_budget(None) to opt out.
+    """
+    counter = _current.get()
+    if counter is not None:
+        counter.budget = budget
+
+def start(label: str, budget: Optional[int] = None) -> Tuple[QueryCounter, Token]:
+    """Begin counting in the current context; pass the result to finish()"""
+    counter = QueryCounter(label, budget)
+    return counter, _current.set(counter)
+
+def finish(counter: QueryCounter, token: Token, mode: str = "raise") -> None:
+    """
+    Stop counting. An exceeded budget raises QueryBudgetExceeded (mode "raise")
+    or logs a warning (mode "warn").
+    """
+    _current.reset(token)
+    if counter.exceeded:
+        if mode == "raise":
+            raise QueryBudgetExceeded(counter.report())
+        if mode == "warn":
+            logger.warning(counter.report())
+
+@contextmanager
+def count_queries(label: str = "block", budget: Optional[int] = None, mode: str = "raise"):
+    """
+    Count the statements run inside the block (see finish() for the budget check).
+    Counters follow the context into threadpool calls and child tasks.
+    """
+    counter, token = start(label, budget)
+    try:
+        yield counter
+    finally:
+        finish(counter, token, mode)
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from fastapi.responses import Response
+from config import settings
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of serialized JSON responses with a TTL.
+
+    Entries are grouped by namespace (one per listing endpoint) and keyed by
+    the request's filter and page parameters. Writes call invalidate(namespace)
+    after they commit. Each namespace has a generation counter, so a response
+    built from a read that raced with an invalidation is never stored. An entry
+    can carry the ETag it was served with, so a conditional GET can be answered
+    from the cache without recomputing it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, bytes, Optional[str]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def generation(self, namespace: str) -> int:
+        """Read before querying and pass to store(), which skips caching if a write happened since"""
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Response]:
+        """The cached response for a key, or None on a miss"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end((namespace, key))
+                self.hits += 1
+                return Response(
+                    content=entry[1], media_type="application/json", headers={"ETag": entry[2]} if entry[2] else None
+                )
+            if entry:
+                del self._entries[(namespace, key)]
+            self.misses += 1
+            return None
+
+    def store(self, namespace: str, key: Hashable, generation: int, response: Response,
+              etag: Optional[str] = None) -> Response:
+        """Cache the serialized body (and ETag) of a successful response and pass the response through"""
+        if not self.enabled:
+            return response
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return response
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, response.body, etag)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return response
+
+    def invalidate(self, namespace: str) -> None:
+        """Drop every cached response of a namespace"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for entry_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[entry_key]
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+response_cache = ResponseCache(
+    settings.response_cache_max_entries, settings.response_cache_seconds, settings.response_cache_enabled
+)
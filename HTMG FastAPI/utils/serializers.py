@@ -0,0 +1,78 @@
+from typing import Any, Iterable, List, Optional, Sequence
+import orjson
+from fastapi.responses import Response
+from models import Guest, Reservation, Room, Staff
+
+class RowSerializer:
+    """
+    The named columns a response needs, plus their conversion to plain dicts.
+
+    Routes select `columns` instead of whole entities, so rows come back as
+    lightweight tuples that never enter the session's identity map, and each
+    row becomes a dict with one zip. Output keys are the column keys (labels
+    where given). Dates and datetimes stay as Python objects; orjson encodes
+    them in the same ISO 8601 form `.isoformat()` produces.
+    """
+
+    def __init__(self, *columns):
+        self.columns = columns
+        self.names = tuple(column.key for column in columns)
+
+    def __call__(self, row) -> dict:
+        return dict(zip(self.names, row))
+
+    def many(self, rows: Iterable) -> List[dict]:
+        names = self.names
+        return [dict(zip(names, row)) for row in rows]
+
+    def project(self, fields: Optional[str], keep: Sequence = ()) -> Optional["RowSerializer"]:
+        """
+        The serializer for a ?fields= subset of the output keys (self when fields
+        is None), or None if a field is unknown. `keep` columns a route needs from
+        every row (the keyset cursor's created_at and id) are selected after the
+        requested ones, so zip leaves them out of the output.
+        """
+        if fields is None:
+            return self
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        if not names or any(name not in self.names for name in names):
+            return None
+        by_name = dict(zip(self.names, self.columns))
+        projected = RowSerializer(*(by_name[name] for name in names))
+        projected.columns += tuple(column for column in keep if column.key not in names)
+        return projected
+
+    def selects_from(self, model) -> bool:
+        """True if any selected column comes from the model's table, i.e. the query needs to join it"""
+        return any(getattr(column.expression, "element", column.expression).table is model.__table__
+                   for column in self.columns)
+
+guest_serializer = RowSerializer(Guest.id, Guest.name, Guest.email, Guest.created_at)
+room_serializer = RowSerializer(Room.id, Room.room_number, Room.room_type, Room.status, Room.created_at)
+staff_serializer = RowSerializer(
+    Staff.id, Staff.name, Staff.email, Staff.department, Staff.position, Staff.created_at
+)
+# select from Reservation joined to Guest and Room
+reservation_serializer = RowSerializer(
+    Reservation.id, Guest.name.label("guest_name"), Guest.email.label("guest_email"), Room.room_number,
+    Room.room_type, Reservation.check_in, Reservation.check_out, Reservation.status, Reservation.created_at
+)
+# select from Reservation joined to Room
+guest_reservation_serializer = RowSerializer(
+    Reservation.id, Room.room_number, Room.room_type, Reservation.check_in, Reservation.check_out,
+    Reservation.status, Reservation.created_at
+)
+
+def json_response(message: str, data: Optional[Any] = None, status_code: int = 1) -> Response:
+    """
+    Encode a BaseResponse-shaped body straight to JSON bytes. Skips building a
+    BaseResponse and FastAPI's response_model validation and re-encoding.
+    """
+    return Response(
+        content=orjson.dumps({"status_code": status_code, "message": message, "data": data}),
+        media_type="application/json"
+    )
+
+def ndjson_lines(rows: Iterable[dict]) -> bytes:
+    """Encode dicts as newline-terminated JSON lines"""
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
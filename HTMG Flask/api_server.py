@@ -1,4 +1,6 @@
-from flask import Flask, Blueprint
+import time
+
+from flask import Flask, Blueprint, Response, g, jsonify, request
 from flask_restx import Api
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import create_engine
@@ -6,28 +8,132 @@ from sqlalchemy import create_engine
 from config import Config
 
 api_blueprint = Blueprint('api', __name__, url_prefix='/api')
-api = Api(api_blueprint, title='Hotel Management API', doc='/docs')
+api = Api(title='Hotel Management API', doc='/docs' if Config.API_DOCS_ENABLED else False)
+# Api() does not pass add_specs on, only init_app reads it; without it swagger.json stays served
+api.init_app(api_blueprint, add_specs=Config.API_DOCS_ENABLED)
 
 db = SQLAlchemy()   
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+
+    from apis.pool_stats import TimedQueuePool
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**app.config['SQLALCHEMY_ENGINE_OPTIONS'], 'poolclass': TimedQueuePool}
     
     db.init_app(app)
 
     with app.app_context():
         app.register_blueprint(api_blueprint)
 
-        from apis import guest_ns, room_ns, staff_ns, reservation_ns
+        from apis import guest_ns, room_ns, staff_ns, reservation_ns, health_ns, admin_ns
         # Register namespaces (removed auth_ns)
         api.add_namespace(guest_ns, path='/guests')
         api.add_namespace(room_ns, path='/rooms')
         api.add_namespace(staff_ns, path='/staff')
         api.add_namespace(reservation_ns, path='/reservations')
+        api.add_namespace(health_ns, path='/health')
+        api.add_namespace(admin_ns, path='/admin')
+
+        from apis.pool_stats import pool_stats
+        pool_stats.attach(db.engine)
+
+        from apis.slow_queries import slow_query_log
+        slow_query_log.attach(db.engine)
+
+        register_query_budget(app)
+        register_metrics(app)
+        if app.config['PROFILING_ENABLED']:
+            register_profiler(app)
 
-        # Create all tables
-        # db.drop_all()
-        db.create_all()
+        # Create missing tables and indexes (also available as `flask --app app migrate`)
+        from migrations import migrate, migrate_command
+        if app.config['MIGRATE_ON_STARTUP']:
+            migrate(db.engine)
+        app.cli.add_command(migrate_command)
+
+        from apis.importer import import_command
+        app.cli.add_command(import_command)
+
+        if app.config.get('AVAILABILITY_INDEX_ENABLED'):
+            from apis.availability_index import availability_index
+            availability_index.build()
+            availability_index.start_reconciler(app, app.config['AVAILABILITY_INDEX_RECONCILE_SECONDS'])
 
         return app
+
+def register_query_budget(app):
+    """Count SQL statements per request and enforce QUERY_BUDGET"""
+    from apis import query_counter
+    query_counter.install(db.engine)
+
+    @app.before_request
+    def start_query_counter():
+        if app.config['QUERY_BUDGET_MODE'] != 'off':
+            g.query_counter = query_counter.start(f'{request.method} {request.path}', app.config['QUERY_BUDGET'])
+
+    @app.after_request
+    def check_query_budget(response):
+        if 'query_counter' not in g:
+            return response
+        counter, token = g.pop('query_counter')
+        try:
+            query_counter.finish(counter, token, app.config['QUERY_BUDGET_MODE'])
+        except query_counter.QueryBudgetExceeded as ex:
+            response = jsonify({'message': str(ex), 'status_code': 2})
+            response.status_code = 500
+        if app.config['QUERY_COUNT_HEADER']:
+            response.headers['X-Query-Count'] = str(counter.count)
+        return response
+
+def register_metrics(app):
+    """Per-route request and SQL metrics, exported in the Prometheus format at /metrics"""
+    from apis import metrics
+    from apis.pool_stats import pool_stats
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.registry.render({'sync': pool_stats}), mimetype='text/plain; version=0.0.4')
+
+    if not app.config['METRICS_ENABLED']:
+        return
+    metrics.install(db.engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        if 'request_started' not in g:
+            return response
+        seconds = time.perf_counter() - g.pop('request_started')
+        app_error = (response.status_code < 400 and not response.is_streamed
+                     and metrics.APP_ERROR.search(response.get_data(), 0, 512) is not None)
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.registry.observe_request(request.method, route, response.status_code, seconds, app_error)
+        return response
+
+def register_profiler(app):
+    """Server-Timing on every request and sampled stack profiles written to PROFILE_DIR"""
+    from apis import profiler
+    profiler.install(db.engine)
+
+    @app.before_request
+    def start_profile():
+        sample = profiler.should_sample(
+            app.config['PROFILE_SAMPLE_RATE'], request.headers.get(profiler.DEBUG_HEADER), app.config['PROFILE_SECRET']
+        )
+        g.request_profile = profiler.start(
+            f'{request.method} {request.path}', sample, app.config['PROFILE_INTERVAL_MS'] / 1e3
+        )
+
+    @app.after_request
+    def finish_profile(response):
+        if 'request_profile' not in g:
+            return response
+        profile = profiler.finish(*g.pop('request_profile'))
+        response.headers['Server-Timing'] = profile.server_timing()
+        if profile.sampled:
+            profile.write(app.config['PROFILE_DIR'], app.config['PROFILE_FORMAT'], app.config['PROFILE_MAX_FILES'])
+        return response
@@ -2,5 +2,7 @@ from .guest_routes import guest_ns
 from .room_routes import room_ns
 from .staff_routes import staff_ns
 from .reservation_routes import reservation_ns
+from .health_routes import health_ns
+from .admin_routes import admin_ns
 
-__all__ = ['guest_ns', 'room_ns', 'staff_ns', 'reservation_ns']
+__all__ = ['guest_ns', 'room_ns', 'staff_ns', 'reservation_ns', 'health_ns', 'admin_ns']
@@ -0,0 +1,37 @@
+from flask_restx import Resource, Namespace, reqparse
+from api_server import api
+from apis.slow_queries import slow_query_log
+
+# Define namespace
+admin_ns = Namespace('Admin', description='Operations API')
+
+@admin_ns.route('/slow-queries')
+class SlowQueriesApi(Resource):
+    @api.doc(params={'limit': 'Maximum entries returned', 'route': 'Only entries of one route, e.g. "GET /api/reservations"',
+                     'min_ms': 'Only entries at least this slow'})
+    def get(self):
+        """
+        Statements slower than SLOW_QUERY_MS: the most recent executions (normalized SQL,
+        parameter types, route, duration) and per-statement totals with EXPLAIN plans
+        """
+        try:
+            parser = reqparse.RequestParser()
+            parser.add_argument('limit', type=int, location='args', default=100, help='Maximum entries returned')
+            parser.add_argument('route', type=str, location='args', help='Route label')
+            parser.add_argument('min_ms', type=float, location='args', default=0, help='Minimum duration')
+            args = parser.parse_args()
+
+            return {
+                'threshold_ms': slow_query_log.threshold_ms,
+                'statements': slow_query_log.statements(),
+                'entries': slow_query_log.entries(min(max(args['limit'], 1), 1000), args.get('route'), args['min_ms'])
+            }, 200
+        except Exception as ex:
+            return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
+
+    def delete(self):
+        """
+        Clear the slow-query log
+        """
+        slow_query_log.clear()
+        return {'status': 'cleared'}, 200
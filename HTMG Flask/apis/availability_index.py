@@ -0,0 +1,99 @@
+import logging
+import threading
+from bisect import bisect_left, insort
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('confirmed', 'checked_in')
+
+class AvailabilityIndex:
+    """
+    In-process index of active stays per room, kept as (check_in, check_out, reservation_id)
+    tuples sorted by check_in. Used to reject overlapping bookings without a database
+    round trip; a miss still goes to the database, which stays the source of truth.
+
+    Stays are only ever added, since the API never cancels or checks out a
+    reservation. One that stops being active outside the API keeps its room
+    rejected until the next reconcile, up to AVAILABILITY_INDEX_RECONCILE_SECONDS (300 s).
+    """
+
+    def __init__(self):
+        self._stays = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.ready = False
+
+    @staticmethod
+    def _load():
+        from api_server import db
+        from models.reservations import Reservation
+
+        stays = {}
+        rows = db.session.query(
+            Reservation.room_id, Reservation.check_in, Reservation.check_out, Reservation.id
+        ).filter(Reservation.status.in_(ACTIVE_STATUSES))
+        for room_id, check_in, check_out, reservation_id in rows:
+            stays.setdefault(room_id, []).append((check_in, check_out, reservation_id))
+        for room_stays in stays.values():
+            room_stays.sort()
+        return stays
+
+    def build(self):
+        """Load every active stay from the database (needs an app context)"""
+        stays = self._load()
+        with self._lock:
+            self._stays = stays
+            self.ready = True
+
+    def reconcile(self):
+        """Rebuild from the database and return how many rooms had drifted"""
+        stays = self._load()
+        with self._lock:
+            drifted = sum(
+                1 for room_id in stays.keys() | self._stays.keys()
+                if stays.get(room_id) != self._stays.get(room_id)
+            )
+            self._stays = stays
+            self.ready = True
+        if drifted:
+            logger.info('Availability index reconciled %d drifted room(s)', drifted)
+        return drifted
+
+    def add(self, room_id, check_in, check_out, reservation_id):
+        """Record a committed active stay"""
+        if not self.ready:
+            return
+        with self._lock:
+            insort(self._stays.setdefault(room_id, []), (check_in, check_out, reservation_id))
+
+    def overlaps(self, room_id, check_in, check_out):
+        """
+        True if an indexed stay overlaps [check_in, check_out). Active stays of one room
+        never overlap, so only the last stay starting before check_out can reach past check_in.
+        """
+        if not self.ready:
+            return False
+        with self._lock:
+            room_stays = self._stays.get(room_id)
+            if not room_stays:
+                return False
+            i = bisect_left(room_stays, (check_out,))
+            return i > 0 and room_stays[i - 1][1] > check_in
+
+    def start_reconciler(self, app, interval):
+        """Run reconcile() every `interval` seconds on a daemon thread"""
+        def run():
+            while not self._stop.wait(interval):
+                with app.app_context():
+                    try:
+                        self.reconcile()
+                    except Exception:
+                        logger.exception('Availability index reconciliation failed')
+
+        self._stop.clear()
+        threading.Thread(target=run, name='availability-index-reconciler', daemon=True).start()
+
+    def stop_reconciler(self):
+        self._stop.set()
+
+availability_index = AvailabilityIndex()
@@ -1,5 +1,9 @@
 from config import Config
-import re, os
+from datetime import date, datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import re, os, json, base64
 
 class CommonFunctions:
 
@@ -9,4 +13,123 @@ class CommonFunctions:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
 
+    @staticmethod
+    def insert_unless_exists(model, key, values, columns, if_exists='error'):
+        """
+        INSERT ... ON CONFLICT (key) DO NOTHING RETURNING columns (Postgres and SQLite):
+        one round trip, with no window between a duplicate check and the insert.
+        Returns (row, created). On a duplicate key the row is None, or with
+        if_exists='return' the existing row; the caller commits a created row.
+        """
+        from api_server import db
+
+        session = db.session
+        dialect_insert = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}[session.get_bind().dialect.name]
+        row = session.execute(
+            dialect_insert(model).values(**values).on_conflict_do_nothing(index_elements=[key]).returning(*columns)
+        ).first()
+        if row is not None:
+            return row, True
+        # release the write lock the insert attempt took
+        session.rollback()
+        if if_exists == 'return':
+            row = session.execute(select(*columns).where(getattr(model, key) == values.get(key))).first()
+        return row, False
+
+    @staticmethod
+    def encode_cursor(created_at, row_id):
+        """Encode a (created_at, id) keyset position as an opaque cursor token"""
+        raw = json.dumps([created_at.isoformat(), row_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode a cursor token back to (created_at, id), or None if it is malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, row_id = json.loads(raw)
+            return datetime.fromisoformat(created_at), int(row_id)
+        except Exception:
+            return None
+
+    @staticmethod
+    def parse_ids(ids):
+        """
+        Parse a comma-separated ?ids= list, dropping repeats but keeping the input order.
+        None if an entry is not an integer or there are more than BATCH_IDS_MAX ids.
+        """
+        try:
+            parsed = list(dict.fromkeys(int(part) for part in ids.split(',') if part.strip()))
+        except ValueError:
+            return None
+        if not parsed or len(parsed) > Config.BATCH_IDS_MAX:
+            return None
+        return parsed
+
+    @staticmethod
+    def fetch_by_ids(query, id_column, ids):
+        """
+        Run a query for the given ids in IN chunks of BATCH_IDS_CHUNK_SIZE.
+        Returns the rows in the order of ids, and the ids no row was found for.
+        """
+        size = Config.BATCH_IDS_CHUNK_SIZE
+        by_id = {}
+        for start in range(0, len(ids), size):
+            for row in query.filter(id_column.in_(ids[start:start + size])).all():
+                by_id[row.id] = row
+        return [by_id[i] for i in ids if i in by_id], [i for i in ids if i not in by_id]
+
+    @staticmethod
+    def project_fields(columns, fields, keep=()):
+        """
+        The output names and the columns to select for a ?fields= subset of `columns`
+        (output name -> column, all of them when fields is None), or None if a field
+        is unknown. `keep` columns (the keyset cursor's created_at and id) are selected
+        after the requested ones but left out of the output.
+        """
+        if fields is None:
+            names = list(columns)
+        else:
+            names = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+        if not names or any(name not in columns for name in names):
+            return None
+        selected = [columns[name] for name in names]
+        selected += [column for column in keep if column.key not in names]
+        return names, selected
+
+    @staticmethod
+    def invalid_fields(columns):
+        """The 400 response to a ?fields= list that is not a subset of `columns`"""
+        return {'message': f'Invalid fields: expected a comma-separated subset of {", ".join(columns)}',
+                'status_code': 2}, 400
+
+    @staticmethod
+    def selects_from(columns, model):
+        """True if any of the columns comes from the model's table, i.e. the query needs to join it"""
+        return any(getattr(column.expression, 'element', column.expression).table is model.__table__
+                   for column in columns)
+
+    @staticmethod
+    def row_to_dict(row, names):
+        """The named leading values of a result row, with dates and datetimes in ISO 8601"""
+        return {name: value.isoformat() if isinstance(value, (date, datetime)) else value
+                for name, value in zip(names, row)}
+
+    @staticmethod
+    def paginate(query, model, after=None, limit=None):
+        """
+        Keyset-paginate a query on (created_at, id).
+        Returns the page rows and the cursor for the next page (None on the last page).
+        """
+        limit = min(max(limit or Config.DEFAULT_PAGE_SIZE, 1), Config.MAX_PAGE_SIZE)
+        if after:
+            query = query.filter(tuple_(model.created_at, model.id) > after)
+
+        rows = query.order_by(model.created_at, model.id).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = CommonFunctions.encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
 
@@ -0,0 +1,56 @@
+import functools
+import hashlib
+from flask import Response, request
+from sqlalchemy import func, select
+
+def watermark(model, *criteria):
+    """
+    Cheap version of the rows matching `criteria`: their count plus the highest
+    id and updated_at. Inserts and deletes move the count or id, and updates move
+    updated_at, which the model sets on every SQLAlchemy UPDATE.
+    """
+    return select(func.count(model.id), func.max(model.id), func.max(model.updated_at)).where(*criteria)
+
+def make_etag(version, query):
+    """Strong ETag over a version row and the query string (filters and page)"""
+    digest = hashlib.sha1(repr((tuple(version), query)).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match uses the weak comparison, so a W/ prefix still matches"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
+def conditional_get(version):
+    """
+    Add ETag / If-None-Match support to a Resource's get method.
+
+    `version` receives the view arguments (e.g. guest_id) as keywords and returns
+    a cheap SELECT (see watermark) whose single row identifies the current state.
+    When the client's If-None-Match matches, the method returns 304 without
+    running its query or serializing anything. Only successful responses carry
+    the ETag, so an error is never answered with a 304 later.
+
+    The ETag only changes when the watermark does: a raw SQL UPDATE that leaves
+    updated_at alone, a write stamped by a worker whose clock lags behind, or a
+    change to a joined table (rooms shown in a guest's reservations) is not seen.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            from api_server import db
+
+            row = db.session.execute(version(**kwargs)).one()
+            etag = make_etag(row, request.query_string.decode())
+            if etag_matches(request.headers.get('If-None-Match'), etag):
+                return Response(status=304, headers={'ETag': etag})
+
+            result = method(self, *args, **kwargs)
+            body, status = result[:2] if isinstance(result, tuple) else (result, 200)
+            if not 200 <= status < 300 or (isinstance(body, dict) and body.get('status_code') == 2):
+                return body, status
+            return body, status, {'ETag': etag}
+        return wrapper
+    return decorator
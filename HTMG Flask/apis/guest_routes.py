@@ -1,7 +1,8 @@
-from flask_restx import Resource, fields, Namespace
+from flask_restx import Resource, fields, Namespace, reqparse
 from api_server import api
 from flask import request
 from models import Guest
+from .etag import conditional_get, watermark
 from .common_functions import CommonFunctions
 
 # Define namespace
@@ -32,13 +33,19 @@ guest_response_model = api.model('Guest Response Model', {
 class GuestListApi(Resource):
     @api.expect(guest_input_model, validate=True)
     @api.response(201, 'Guest created successfully', base_response_model)
+    @api.response(200, 'Existing guest returned (if_exists=return)', base_response_model)
     @api.response(400, 'Validation error', base_response_model)
     @api.response(409, 'Guest already exists', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'if_exists': "On a duplicate email: 'error' (default) answers 409, 'return' answers 200 with the existing guest"})
     def post(self):
         """
         Create a new guest
         """
+        parser = reqparse.RequestParser()
+        parser.add_argument('if_exists', type=str, location='args', default='error',
+                            choices=['error', 'return'], help='Duplicate handling')
+        args = parser.parse_args()
         try:
             payload = api.payload
             
@@ -46,19 +53,28 @@ class GuestListApi(Resource):
             if not CommonFunctions.validate_email(payload.get('email')):
                 return {'message': 'Please enter a valid email address', 'status_code': 2}, 400
             
-            response, status = Guest.create_guest(payload)
+            response, status = Guest.create_guest(payload, if_exists=args.get('if_exists'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
 
     @api.response(200, 'List of guests', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'ids': 'Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored', 'cursor': 'Opaque cursor from a previous page\'s next_cursor', 'limit': 'Page size (capped by the server)', 'fields': 'Comma-separated response fields, e.g. id,name; only those columns are selected'})
     def get(self):
         """
-        Get all guests
+        Get guests, one page at a time
         """
         try:
-            response, status = Guest.get_all_guests()
+            parser = reqparse.RequestParser()
+            parser.add_argument('cursor', type=str, location='args', help='Pagination cursor')
+            parser.add_argument('ids', type=str, location='args', help='Comma-separated ids')
+            parser.add_argument('limit', type=int, location='args', help='Page size')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
+            args = parser.parse_args()
+
+            response, status = Guest.get_all_guests(cursor=args.get('cursor'), limit=args.get('limit'),
+                                                    ids=args.get('ids'), fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -68,12 +84,18 @@ class GuestDetailApi(Resource):
     @api.response(200, 'Guest details', base_response_model)
     @api.response(404, 'Guest not found', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'fields': 'Comma-separated response fields, e.g. id,name; only those columns are selected'})
+    @conditional_get(lambda guest_id: watermark(Guest, Guest.id == guest_id))
     def get(self, guest_id):
         """
         Get guest details by ID
         """
         try:
-            response, status = Guest.get_guest_by_id(guest_id)
+            parser = reqparse.RequestParser()
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
+            args = parser.parse_args()
+
+            response, status = Guest.get_guest_by_id(guest_id, fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -0,0 +1,26 @@
+from flask_restx import Resource, Namespace
+from api_server import api
+from apis.pool_stats import pool_stats
+
+# Define namespace
+health_ns = Namespace('Health', description='Service Health API')
+
+@health_ns.route('')
+class HealthApi(Resource):
+    def get(self):
+        """
+        Liveness check
+        """
+        return {'status': 'healthy'}, 200
+
+@health_ns.route('/db')
+class DatabaseHealthApi(Resource):
+    def get(self):
+        """
+        Connection pool statistics: checked-out connections, overflow, timeouts,
+        and wait / checkout latency histograms in milliseconds
+        """
+        try:
+            return {'status': 'healthy', 'pool': pool_stats.to_dict()}, 200
+        except Exception as ex:
+            return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -0,0 +1,194 @@
+import codecs
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+
+import click
+from flask.cli import with_appcontext
+from jsonschema import Draft4Validator
+from sqlalchemy import insert, select
+
+from config import Config
+
+ENTITIES = ('guests', 'rooms', 'staff')
+
+def _importers():
+    """entity -> (model, input model, unique key, column defaults not covered by the input)"""
+    from models import Guest, Room, Staff
+    from apis.guest_routes import guest_input_model
+    from apis.room_routes import room_input_model
+    from apis.staff_routes import staff_input_model
+    return {
+        'guests': (Guest, guest_input_model, 'email', {}),
+        'rooms': (Room, room_input_model, 'room_number', {'status': 'available'}),
+        'staff': (Staff, staff_input_model, 'email', {}),
+    }
+
+class ImportReport:
+    """Running totals for one import; keeps at most IMPORT_MAX_ERRORS error rows"""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, error, rows=1):
+        self.failed += rows
+        if len(self.errors) < Config.IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line, 'error': error})
+
+    def to_dict(self):
+        return {
+            'processed': self.processed,
+            'inserted': self.inserted,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors
+        }
+
+def detect_format(filename, requested=None):
+    """Pick 'csv' or 'ndjson' from an explicit choice or the file extension"""
+    if requested:
+        return requested.lower()
+    if filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return 'csv'
+
+def read_records(stream, file_format):
+    """Lazily parse a binary CSV or NDJSON stream line by line, as (line, record, error)"""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, {k: v for k, v in record.items() if k is not None}, None
+    elif file_format == 'ndjson':
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as ex:
+                yield line_num, None, f'Invalid JSON: {ex}'
+                continue
+            if isinstance(record, dict):
+                yield line_num, record, None
+            else:
+                yield line_num, None, 'Each line must be a JSON object'
+    else:
+        raise ValueError(f'Unsupported import format: {file_format}')
+
+def _validate(validator, fields, key, record):
+    """The record reduced to the input model's fields, or an error message"""
+    errors = sorted(validator.iter_errors(record), key=lambda e: list(e.path))
+    if errors:
+        return None, '; '.join(f"{'.'.join(str(p) for p in e.path) or 'record'}: {e.message}" for e in errors)
+    from apis.common_functions import CommonFunctions
+
+    if key == 'email' and not CommonFunctions.validate_email(record['email']):
+        return None, 'email: Please enter a valid email address'
+    return {field: record[field] for field in fields if field in record}, None
+
+def _copy_rows(model, rows):
+    """Load rows with Postgres COPY through the session's connection"""
+    from api_server import db
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([row[c] for c in columns] for row in rows)
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+def import_records(entity, records, chunk_size=None, on_progress=None):
+    """
+    Import records chunk by chunk. Each chunk is validated against the create
+    endpoint's input model, de-duplicated on its unique key in memory, checked
+    against existing rows with IN queries of BATCH_IDS_CHUNK_SIZE keys and
+    written with executemany (COPY on Postgres), then committed.
+    """
+    from api_server import db
+
+    model, input_model, key, defaults = _importers()[entity]
+    key_column = getattr(model, key)
+    validator = Draft4Validator(input_model.__schema__)
+    fields = list(input_model)
+    use_copy = db.engine.dialect.name == 'postgresql'
+    chunk_size = chunk_size or Config.IMPORT_CHUNK_SIZE
+    report = ImportReport()
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        rows = {}
+        for line, record, error in chunk:
+            report.processed += 1
+            if error is None:
+                record, error = _validate(validator, fields, key, record)
+            if error:
+                report.add_error(line, error)
+                continue
+            if record[key] in rows:
+                report.skipped += 1
+                continue
+            rows[record[key]] = record
+
+        keys = list(rows)
+        size = Config.BATCH_IDS_CHUNK_SIZE
+        existing = {
+            value
+            for start in range(0, len(keys), size)
+            for value in db.session.scalars(select(key_column).where(key_column.in_(keys[start:start + size])))
+        }
+        now = datetime.now()
+        # COPY skips the model's Python-side defaults, so the timestamps are set here
+        timestamps = {'created_at': now, 'updated_at': now} if hasattr(model, 'updated_at') else {'created_at': now}
+        new_rows = [{**defaults, **row, **timestamps} for value, row in rows.items() if value not in existing]
+        report.skipped += len(rows) - len(new_rows)
+
+        if new_rows:
+            try:
+                if use_copy:
+                    _copy_rows(model, new_rows)
+                else:
+                    db.session.execute(insert(model), new_rows)
+                db.session.commit()
+                report.inserted += len(new_rows)
+            except Exception as ex:
+                db.session.rollback()
+                report.add_error(chunk[0][0], f'Chunk starting at line {chunk[0][0]} was not imported: {ex}',
+                                 rows=len(new_rows))
+
+        if on_progress:
+            on_progress(report)
+
+    return report
+
+@click.command('import')
+@click.argument('entity', type=click.Choice(ENTITIES))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'ndjson']),
+              help='Detected from the file extension when omitted')
+@click.option('--chunk-size', type=int, help='Rows per chunk (defaults to IMPORT_CHUNK_SIZE)')
+@with_appcontext
+def import_command(entity, path, file_format, chunk_size):
+    """Bulk import guests, rooms or staff from a CSV (with header row) or NDJSON file"""
+    def progress(report):
+        click.echo(f'processed={report.processed} inserted={report.inserted} '
+                   f'skipped={report.skipped} failed={report.failed}', err=True)
+
+    with open(path, 'rb') as stream:
+        report = import_records(entity, read_records(stream, detect_format(path, file_format)),
+                                chunk_size, on_progress=progress)
+
+    click.echo(json.dumps(report.to_dict(), indent=2))
+    sys.exit(1 if report.failed else 0)
@@ -0,0 +1,182 @@
+import re
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import event
+from apis.pool_stats import BUCKETS_MS
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# status_code 2 in a response body marks an application error
+APP_ERROR = re.compile(rb'"status_code":\s*2\b')
+
+def _new_histogram():
+    # one count per bucket, one for +Inf, then the sum
+    return [0] * (len(BUCKETS) + 1) + [0.0]
+
+def _observe(histograms, key, value):
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = _new_histogram()
+    histogram[bisect_left(BUCKETS, value)] += 1
+    histogram[-1] += value
+
+class _Shard:
+    """Metrics recorded by one thread; only that thread writes to it"""
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.request_seconds = {}
+        self.statement_seconds = {}
+
+    def merge(self, other):
+        for name in ('requests', 'errors'):
+            target = getattr(self, name)
+            for key, count in dict(getattr(other, name)).items():
+                target[key] += count
+        for name in ('request_seconds', 'statement_seconds'):
+            target = getattr(self, name)
+            for key, histogram in dict(getattr(other, name)).items():
+                merged = target.setdefault(key, _new_histogram())
+                for i, value in enumerate(list(histogram)):
+                    merged[i] += value
+
+class Metrics:
+    """
+    Request, SQL and connection pool metrics in the Prometheus text format.
+
+    Recording is lock-free: Flask serves each request on one thread, and every
+    thread writes to its own shard. The lock is only taken when a thread records
+    for the first time, when it exits (its shard is folded into the retired
+    totals) and on scrape, which merges all shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = _Shard()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(threading.current_thread(), self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._lock:
+            self._retired.merge(shard)
+            self._shards.remove(shard)
+
+    def observe_request(self, method, route, status, seconds, app_error=False):
+        shard = self._shard()
+        shard.requests[(method, route, status)] += 1
+        _observe(shard.request_seconds, (method, route), seconds)
+        if status >= 500:
+            shard.errors[(method, route, 'server')] += 1
+        elif status >= 400:
+            shard.errors[(method, route, 'client')] += 1
+        elif app_error:
+            shard.errors[(method, route, 'application')] += 1
+
+    def observe_statement(self, operation, seconds):
+        _observe(self._shard().statement_seconds, operation, seconds)
+
+    def snapshot(self):
+        total = _Shard()
+        with self._lock:
+            total.merge(self._retired)
+            for shard in self._shards:
+                total.merge(shard)
+        return total
+
+    def render(self, pools=None):
+        """Exposition text; `pools` maps a pool label to its PoolStats"""
+        snapshot = self.snapshot()
+        lines = []
+
+        _header(lines, 'http_requests_total', 'counter', 'Requests by route, method and HTTP status')
+        for (method, route, status), count in sorted(snapshot.requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        _header(lines, 'http_request_errors_total', 'counter',
+                'Failed requests: server (5xx), client (4xx) and application (status_code 2 in a 2xx body)')
+        for (method, route, kind), count in sorted(snapshot.errors.items()):
+            lines.append(f'http_request_errors_total{{method="{method}",route="{route}",kind="{kind}"}} {count}')
+
+        _header(lines, 'http_request_duration_seconds', 'histogram', 'Request latency by route')
+        for (method, route), histogram in sorted(snapshot.request_seconds.items()):
+            _histogram(lines, 'http_request_duration_seconds', f'method="{method}",route="{route}"', histogram, BUCKETS)
+
+        _header(lines, 'db_statement_duration_seconds', 'histogram', 'SQL statement latency by operation')
+        for operation, histogram in sorted(snapshot.statement_seconds.items()):
+            _histogram(lines, 'db_statement_duration_seconds', f'operation="{operation}"', histogram, BUCKETS)
+
+        if pools:
+            _render_pools(lines, pools)
+        return '\n'.join(lines) + '\n'
+
+def _header(lines, name, kind, description):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def _histogram(lines, name, labels, histogram, bounds):
+    """`histogram` holds per-bucket counts, the +Inf count and the sum"""
+    cumulative = 0
+    for bound, count in zip(bounds, histogram):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    count = cumulative + histogram[-2]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram[-1]:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+
+def _render_pools(lines, pools):
+    stats = {label: pool_stats.to_dict() for label, pool_stats in pools.items()}
+    for name, key, description in (
+        ('db_pool_size', 'size', 'Configured pool size'),
+        ('db_pool_checked_out', 'checked_out', 'Connections currently in use'),
+        ('db_pool_checked_in', 'checked_in', 'Idle connections in the pool'),
+        ('db_pool_overflow', 'overflow', 'Connections opened beyond pool_size'),
+    ):
+        _header(lines, name, 'gauge', description)
+        for label, values in stats.items():
+            if key in values:
+                lines.append(f'{name}{{pool="{label}"}} {values[key]}')
+    for name, key, description in (
+        ('db_pool_connects_total', 'connects', 'New DBAPI connections'),
+        ('db_pool_checkouts_total', 'checkouts', 'Connection checkouts'),
+        ('db_pool_invalidations_total', 'invalidations', 'Invalidated connections'),
+        ('db_pool_timeouts_total', 'timeouts', 'Checkouts that timed out waiting for a connection'),
+    ):
+        _header(lines, name, 'counter', description)
+        for label, values in stats.items():
+            lines.append(f'{name}{{pool="{label}"}} {values[key]}')
+    _header(lines, 'db_pool_wait_seconds', 'histogram', 'Time spent waiting for a pooled connection')
+    bounds = [ms / 1000 for ms in BUCKETS_MS]
+    for label, pool_stats in pools.items():
+        wait = pool_stats.wait
+        _histogram(lines, 'db_pool_wait_seconds', f'pool="{label}"', [*wait.counts, wait.total / 1000], bounds)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if started:
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'
+        registry.observe_statement(operation, time.perf_counter() - started.pop())
+
+def install(engine):
+    """Time statements run on `engine`"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+registry = Metrics()
@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADER = 'X-Debug-Profile'
+
+def _is_idle(frame):
+    """A thread blocked in a selector or waiting on a queue"""
+    if frame.f_code.co_filename.endswith('selectors.py'):
+        return True
+    for _ in range(3):
+        if frame is None:
+            break
+        if frame.f_code.co_name == 'get' and frame.f_code.co_filename.endswith('queue.py'):
+            return True
+        frame = frame.f_back
+    return False
+
+class RequestProfile:
+    """
+    Timing of one request: wall time and time spent in SQL, plus (when sampled)
+    a stack sample of the request's thread every `interval` seconds.
+
+    Flask serves each request on a single thread, so only that thread is sampled.
+    """
+
+    def __init__(self, label, sample=False, interval=0.005):
+        self.label = label
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.db_time = 0.0
+        self.queries = 0
+        self.threads = {threading.get_ident()}
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._sampler = None
+        if sample:
+            self._sampler = threading.Thread(target=self._sample, name='request-profiler', daemon=True)
+            self._sampler.start()
+
+    @property
+    def sampled(self):
+        return self._sampler is not None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.threads):
+                frame = frames.get(thread_id)
+                if frame is None or _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+
+    def server_timing(self):
+        """Server-Timing header value splitting the request into SQL and Python time"""
+        total = (self.elapsed if self.elapsed is not None else time.perf_counter() - self.started) * 1e3
+        db = self.db_time * 1e3
+        return (f'db;dur={db:.2f};desc="SQL ({self.queries} statements)", '
+                f'app;dur={total - db:.2f};desc="Python", total;dur={total:.2f}')
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format (flamegraph.pl, speedscope, inferno)"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self):
+        """speedscope.app sampled-profile JSON"""
+        frame_index = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([frame_index.setdefault(name, len(frame_index)) for name in stack])
+            weights.append(round(count * self.interval * 1e3, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "hotel-management-api",
+            "shared": {"frames": [{"name": name} for name in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.label,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round((self.elapsed or 0) * 1e3, 3),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+    def write(self, directory, file_format='speedscope', max_files=100):
+        """Write the samples to `directory`, keeping its newest `max_files` profiles, and return the file path"""
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", '-', self.label).strip('-')
+        extension = 'speedscope.json' if file_format == 'speedscope' else 'collapsed.txt'
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{uuid.uuid4().hex[:6]}.{extension}")
+        with open(path, 'w') as output:
+            if file_format == 'speedscope':
+                json.dump(self.speedscope(), output)
+            else:
+                output.write(self.collapsed())
+        logger.info('Profile of %s written to %s', self.label, path)
+        prune(directory, max_files)
+        return path
+
+def prune(directory, max_files):
+    """Delete all but the newest `max_files` profiles in `directory`"""
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(('.speedscope.json', '.collapsed.txt')):
+            try:
+                profiles.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    for _, path in sorted(profiles, reverse=True)[max_files:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # another worker pruned it first
+            pass
+
+_current = ContextVar('request_profile', default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is not None:
+        profile.threads.add(threading.get_ident())
+        conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    if profile is not None and conn.info.get('profile_started'):
+        profile.db_time += time.perf_counter() - conn.info['profile_started'].pop()
+        profile.queries += 1
+
+def install(engine):
+    """Time statements run on `engine`"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def sign_debug_token(secret, ttl=3600):
+    """Value for the X-Debug-Profile header that forces profiling until it expires"""
+    expires = str(int(time.time()) + ttl)
+    return f"{expires}.{hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()}"
+
+def verify_debug_token(token, secret):
+    """Tokens are only accepted when a secret is configured"""
+    if not secret or not token or '.' not in token:
+        return False
+    expires, signature = token.split('.', 1)
+    expected = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature, expected) and expires.isdigit() and int(expires) > time.time()
+
+def should_sample(sample_rate, token, secret):
+    return (sample_rate > 0 and random.random() < sample_rate) or verify_debug_token(token, secret)
+
+def start(label, sample=False, interval=0.005):
+    """Begin timing the current request; pass the result to finish()"""
+    profile = RequestProfile(label, sample, interval)
+    return profile, _current.set(profile)
+
+def finish(profile, token):
+    _current.reset(token)
+    profile.stop()
+    return profile
+
+if __name__ == '__main__':
+    # print a debug header value: python -m apis.profiler [ttl seconds]
+    from config import Config
+    if not Config.PROFILE_SECRET:
+        sys.exit('PROFILE_SECRET is not set, so debug profile tokens are disabled')
+    print(f"{DEBUG_HEADER}: {sign_debug_token(Config.PROFILE_SECRET, int(sys.argv[1]) if len(sys.argv) > 1 else 3600)}")
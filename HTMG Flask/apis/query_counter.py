@@ -0,0 +1,83 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# statements kept per counter for the budget report
+MAX_RECORDED = 20
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+class QueryCounter:
+    """SQL statements executed within one request (or one `count_queries` block)"""
+
+    def __init__(self, label, budget=None):
+        self.label = label
+        self.budget = budget
+        self.count = 0
+        self.statements = []
+
+    def add(self, statement):
+        self.count += 1
+        if len(self.statements) < MAX_RECORDED:
+            self.statements.append(' '.join(statement.split()))
+
+    @property
+    def exceeded(self):
+        return self.budget is not None and self.count > self.budget
+
+    def report(self):
+        statements = '\n  '.join(self.statements)
+        return f"{self.label} ran {self.count} SQL statements (budget {self.budget}):\n  {statements}"
+
+_current = ContextVar('query_counter', default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.add(statement)
+
+def install(engine):
+    """Count statements run on `engine`"""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+
+def current():
+    return _current.get()
+
+def set_budget(budget):
+    """
+    Change the budget of the running request, e.g. set_budget(None) for a
+    route whose statement count grows with its input.
+    """
+    counter = _current.get()
+    if counter is not None:
+        counter.budget = budget
+
+def start(label, budget=None):
+    """Begin counting in the current context; pass the result to finish()"""
+    counter = QueryCounter(label, budget)
+    return counter, _current.set(counter)
+
+def finish(counter, token, mode='raise'):
+    """
+    Stop counting. An exceeded budget raises QueryBudgetExceeded (mode 'raise')
+    or logs a warning (mode 'warn').
+    """
+    _current.reset(token)
+    if counter.exceeded:
+        if mode == 'raise':
+            raise QueryBudgetExceeded(counter.report())
+        if mode == 'warn':
+            logger.warning(counter.report())
+
+@contextmanager
+def count_queries(label='block', budget=None, mode='raise'):
+    """Count the statements run inside the block (see finish() for the budget check)"""
+    counter, token = start(label, budget)
+    try:
+        yield counter
+    finally:
+        finish(counter, token, mode)
@@ -2,6 +2,7 @@ from flask_restx import Resource, fields, Namespace, reqparse
 from api_server import api
 from flask import request
 from models import Reservation
+from .etag import conditional_get, watermark
 
 # Define namespace
 reservation_ns = Namespace('Reservations', description='Reservation Management API')
@@ -55,12 +56,21 @@ class ReservationApi(Resource):
 
     @api.response(200, 'List of reservations', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'ids': 'Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored', 'cursor': 'Opaque cursor from a previous page\'s next_cursor', 'limit': 'Page size (capped by the server)', 'fields': 'Comma-separated response fields, e.g. id,check_in,status; only those columns are selected'})
     def get(self):
         """
-        Get all reservations
+        Get reservations, one page at a time
         """
         try:
-            response, status = Reservation.get_all_reservations()
+            parser = reqparse.RequestParser()
+            parser.add_argument('cursor', type=str, location='args', help='Pagination cursor')
+            parser.add_argument('ids', type=str, location='args', help='Comma-separated ids')
+            parser.add_argument('limit', type=int, location='args', help='Page size')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
+            args = parser.parse_args()
+
+            response, status = Reservation.get_all_reservations(cursor=args.get('cursor'), limit=args.get('limit'),
+                                                                ids=args.get('ids'), fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -69,12 +79,21 @@ class ReservationApi(Resource):
 class GuestReservationsApi(Resource):
     @api.response(200, 'Guest reservations', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'cursor': 'Opaque cursor from a previous page\'s next_cursor', 'limit': 'Page size (capped by the server)', 'fields': 'Comma-separated response fields, e.g. id,check_in,status; only those columns are selected'})
+    @conditional_get(lambda guest_id: watermark(Reservation, Reservation.guest_id == guest_id))
     def get(self, guest_id):
         """
-        View guest reservations by guest ID
+        View guest reservations by guest ID, one page at a time
         """
         try:
-            response, status = Reservation.get_guest_reservations(guest_id)
+            parser = reqparse.RequestParser()
+            parser.add_argument('cursor', type=str, location='args', help='Pagination cursor')
+            parser.add_argument('limit', type=int, location='args', help='Page size')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
+            args = parser.parse_args()
+
+            response, status = Reservation.get_guest_reservations(guest_id, cursor=args.get('cursor'),
+                                                                  limit=args.get('limit'), fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -2,6 +2,8 @@ from flask_restx import Resource, fields, Namespace, reqparse
 from api_server import api
 from flask import request
 from models import Room
+from .etag import conditional_get, watermark
+from datetime import datetime
 
 # Define namespace
 room_ns = Namespace('Rooms', description='Room Management API')
@@ -32,23 +34,30 @@ room_response_model = api.model('Room Response Model', {
 class RoomListApi(Resource):
     @api.expect(room_input_model, validate=True)
     @api.response(201, 'Room created successfully', base_response_model)
+    @api.response(200, 'Existing room returned (if_exists=return)', base_response_model)
     @api.response(400, 'Validation error', base_response_model)
     @api.response(409, 'Room already exists', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'if_exists': "On a duplicate room number: 'error' (default) answers 409, 'return' answers 200 with the existing room"})
     def post(self):
         """
         Create a new room
         """
+        parser = reqparse.RequestParser()
+        parser.add_argument('if_exists', type=str, location='args', default='error',
+                            choices=['error', 'return'], help='Duplicate handling')
+        args = parser.parse_args()
         try:
             payload = api.payload
-            response, status = Room.create_room(payload)
+            response, status = Room.create_room(payload, if_exists=args.get('if_exists'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
 
     @api.response(200, 'List of rooms', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
-    @api.doc(params={'status': 'Filter by room status (available, occupied, maintenance)'})
+    @api.doc(params={'ids': 'Comma-separated ids to fetch in one request, returned in this order with the missing ones listed; other parameters are ignored', 'status': 'Filter by room status (available, occupied, maintenance)', 'cursor': 'Opaque cursor from a previous page\'s next_cursor', 'limit': 'Page size (capped by the server)', 'fields': 'Comma-separated response fields, e.g. id,room_number; only those columns are selected'})
+    @conditional_get(lambda **_: watermark(Room))
     def get(self):
         """
         Get all rooms with optional status filter
@@ -59,10 +68,49 @@ class RoomListApi(Resource):
             parser.add_argument('status', type=str, location='args', 
                               choices=['available', 'occupied', 'maintenance'], 
                               help='Filter by room status')
+            parser.add_argument('cursor', type=str, location='args', help='Pagination cursor')
+            parser.add_argument('ids', type=str, location='args', help='Comma-separated ids')
+            parser.add_argument('limit', type=int, location='args', help='Page size')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
             args = parser.parse_args()
             
-            response, status = Room.get_all_rooms(status_filter=args.get('status'))
+            response, status = Room.get_all_rooms(status_filter=args.get('status'),
+                                                  cursor=args.get('cursor'), limit=args.get('limit'),
+                                                  ids=args.get('ids'), fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
 
+@room_ns.route('/available')
+class AvailableRoomsApi(Resource):
+    @api.response(200, 'List of free rooms', base_response_model)
+    @api.response(400, 'Validation error', base_response_model)
+    @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'check_in': 'Check-in Date (YYYY-MM-DD)', 'check_out': 'Check-out Date (YYYY-MM-DD)',
+                     'room_type': 'Filter by room type (single, double, suite)',
+                     'fields': 'Comma-separated response fields, e.g. id,room_number; only those columns are selected'})
+    def get(self):
+        """
+        Find rooms free for a date range
+        """
+        try:
+            parser = reqparse.RequestParser()
+            parser.add_argument('check_in', type=str, location='args', required=True, help='Check-in Date (YYYY-MM-DD)')
+            parser.add_argument('check_out', type=str, location='args', required=True, help='Check-out Date (YYYY-MM-DD)')
+            parser.add_argument('room_type', type=str, location='args',
+                              choices=['single', 'double', 'suite'],
+                              help='Filter by room type')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
+            args = parser.parse_args()
+
+            try:
+                check_in = datetime.strptime(args.get('check_in'), '%Y-%m-%d').date()
+                check_out = datetime.strptime(args.get('check_out'), '%Y-%m-%d').date()
+            except ValueError:
+                return {'message': 'Dates must be in YYYY-MM-DD format', 'status_code': 2}, 400
+
+            response, status = Room.get_available_rooms(check_in, check_out, room_type=args.get('room_type'),
+                                                        fields=args.get('fields'))
+            return response, status
+        except Exception as ex:
+            return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -38,13 +38,19 @@ staff_response_model = api.model('Staff Response Model', {
 class StaffListApi(Resource):
     @api.expect(staff_input_model, validate=True)
     @api.response(201, 'Staff member created successfully', base_response_model)
+    @api.response(200, 'Existing staff member returned (if_exists=return)', base_response_model)
     @api.response(400, 'Validation error', base_response_model)
     @api.response(409, 'Staff member already exists', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
+    @api.doc(params={'if_exists': "On a duplicate email: 'error' (default) answers 409, 'return' answers 200 with the existing staff member"})
     def post(self):
         """
         Create a new staff member
         """
+        parser = reqparse.RequestParser()
+        parser.add_argument('if_exists', type=str, location='args', default='error',
+                            choices=['error', 'return'], help='Duplicate handling')
+        args = parser.parse_args()
         try:
             payload = api.payload
             
@@ -52,14 +58,14 @@ class StaffListApi(Resource):
             if not CommonFunctions.validate_email(payload.get('email')):
                 return {'message': 'Please enter a valid email address', 'status_code': 2}, 400
             
-            response, status = Staff.create_staff(payload)
+            response, status = Staff.create_staff(payload, if_exists=args.get('if_exists'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
 
     @api.response(200, 'List of staff members', base_response_model)
     @api.response(500, 'Internal server error', base_response_model)
-    @api.doc(params={'department': 'Filter by department (housekeeping, front_desk, maintenance)'})
+    @api.doc(params={'department': 'Filter by department (housekeeping, front_desk, maintenance)', 'cursor': 'Opaque cursor from a previous page\'s next_cursor', 'limit': 'Page size (capped by the server)', 'fields': 'Comma-separated response fields, e.g. id,name; only those columns are selected'})
     def get(self):
         """
         Get all staff members with optional department filter
@@ -70,9 +76,14 @@ class StaffListApi(Resource):
             parser.add_argument('department', type=str, location='args', 
                               choices=['housekeeping', 'front_desk', 'maintenance'], 
                               help='Filter by department')
+            parser.add_argument('cursor', type=str, location='args', help='Pagination cursor')
+            parser.add_argument('limit', type=int, location='args', help='Page size')
+            parser.add_argument('fields', type=str, location='args', help='Response fields')
             args = parser.parse_args()
             
-            response, status = Staff.get_all_staff(department_filter=args.get('department'))
+            response, status = Staff.get_all_staff(department_filter=args.get('department'),
+                                                   cursor=args.get('cursor'), limit=args.get('limit'),
+                                                   fields=args.get('fields'))
             return response, status
         except Exception as ex:
             return {'message': f'Internal Server Error: {ex}', 'status_code': 2}, 500
@@ -1,77 +1,118 @@
 from datetime import datetime
 from api_server import db
+from config import Config
 
 class Guest(db.Model):
     __tablename__ = 'guests'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_guests_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False, unique=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     @staticmethod
-    def create_guest(data):
-        """Create a new guest"""
+    def response_columns():
+        """Response field name -> column, in response order"""
+        return {'id': Guest.id, 'name': Guest.name, 'email': Guest.email, 'created_at': Guest.created_at}
+
+    @staticmethod
+    def create_guest(data, if_exists='error'):
+        """
+        Create a new guest in one INSERT ... ON CONFLICT DO NOTHING round trip.
+        With if_exists='return' a duplicate answers 200 with the existing guest.
+        """
         try:
-            existing_guest = Guest.query.filter_by(email=data.get('email')).first()
-            if existing_guest:
+            from apis.common_functions import CommonFunctions
+
+            row, created = CommonFunctions.insert_unless_exists(
+                Guest, 'email', data, (Guest.id, Guest.name, Guest.email, Guest.created_at), if_exists
+            )
+            if not created and row is None:
                 return {'message': 'Guest with this email already exists', 'status_code': 2}, 409
-            
-            guest = Guest(**data)
-            db.session.add(guest)
-            db.session.commit()
-            
+            if created:
+                db.session.commit()
+
             return {
-                'message': 'Guest created successfully',
+                'message': 'Guest created successfully' if created else 'Guest with this email already exists',
                 'status_code': 1,
                 'data': {
-                    'id': guest.id,
-                    'name': guest.name,
-                    'email': guest.email,
-                    'created_at': guest.created_at.isoformat()
+                    'id': row.id,
+                    'name': row.name,
+                    'email': row.email,
+                    'created_at': row.created_at.isoformat()
                 }
-            }, 201
+            }, 201 if created else 200
         except Exception as ex:
             db.session.rollback()
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
     @staticmethod
-    def get_all_guests():
-        """Get all guests"""
+    def get_all_guests(cursor=None, limit=None, ids=None, fields=None):
+        """Get guests, one page at a time, or just the rows with the given ids"""
         try:
-            guests = Guest.query.all()
-            guest_list = [{
-                'id': g.id,
-                'name': g.name,
-                'email': g.email,
-                'created_at': g.created_at.isoformat()
-            } for g in guests]
+            from apis.common_functions import CommonFunctions
+
+            # ids replace paging, so the cursor is only checked without them
+            id_list = CommonFunctions.parse_ids(ids) if ids is not None else None
+            if ids is not None and id_list is None:
+                return {'message': f'Invalid ids: expected 1 to {Config.BATCH_IDS_MAX} comma-separated integers',
+                        'status_code': 2}, 400
+            after = CommonFunctions.decode_cursor(cursor) if cursor and id_list is None else None
+            if cursor and id_list is None and not after:
+                return {'message': 'Invalid pagination cursor', 'status_code': 2}, 400
+            projection = CommonFunctions.project_fields(Guest.response_columns(), fields,
+                                                        keep=(Guest.created_at, Guest.id))
+            if projection is None:
+                return CommonFunctions.invalid_fields(Guest.response_columns())
+            names, columns = projection
+
+            # Only the response columns, as plain rows outside the identity map
+            query = db.session.query(*columns)
+            if id_list is not None:
+                guests, missing = CommonFunctions.fetch_by_ids(query, Guest.id, id_list)
+            else:
+                guests, next_cursor = CommonFunctions.paginate(query, Guest, after, limit)
+            guest_list = [CommonFunctions.row_to_dict(g, names) for g in guests]
             
             return {
                 'message': 'Guests retrieved successfully',
                 'status_code': 1,
-                'data': guest_list
+                'data': {
+                    'items': guest_list,
+                    'missing': missing
+                } if id_list is not None else {
+                    'items': guest_list,
+                    'next_cursor': next_cursor
+                }
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
     @staticmethod
-    def get_guest_by_id(guest_id):
+    def get_guest_by_id(guest_id, fields=None):
         """Get guest by ID"""
         try:
-            guest = Guest.query.get(guest_id)
+            from apis.common_functions import CommonFunctions
+
+            projection = CommonFunctions.project_fields(Guest.response_columns(), fields)
+            if projection is None:
+                return CommonFunctions.invalid_fields(Guest.response_columns())
+            names, columns = projection
+
+            guest = db.session.query(*columns).filter(Guest.id == guest_id).first()
             if not guest:
                 return {'message': 'Guest not found', 'status_code': 2}, 404
             
             return {
                 'message': 'Guest retrieved successfully',
                 'status_code': 1,
-                'data': {
-                    'id': guest.id,
-                    'name': guest.name,
-                    'email': guest.email,
-                    'created_at': guest.created_at.isoformat()
-                }
+                'data': CommonFunctions.row_to_dict(guest, names)
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
@@ -1,8 +1,21 @@
 from datetime import datetime, date
+from sqlalchemy import insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from api_server import db
+from config import Config
+
+# Postgres exclusion constraint (migration 4): no two active stays of a room share a night
+OVERLAP_CONSTRAINT = 'ex_reservations_room_active_dates'
 
 class Reservation(db.Model):
     __tablename__ = 'reservations'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_reservations_created_at_id', 'created_at', 'id'),
+        db.Index('ix_reservations_guest_id_created_at_id', 'guest_id', 'created_at', 'id'),
+        # Overlap checks: availability and free-room search
+        db.Index('ix_reservations_room_id_status_dates', 'room_id', 'status', 'check_in', 'check_out'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     guest_id = db.Column(db.Integer, db.ForeignKey('guests.id'), nullable=False)
@@ -11,23 +24,89 @@ class Reservation(db.Model):
     check_out = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='confirmed')
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     # Relationships
     guest = db.relationship('Guest', backref=db.backref('reservations', lazy=True))
     room = db.relationship('Room', backref=db.backref('reservations', lazy=True))
 
+    @staticmethod
+    def response_columns():
+        """Response field name -> column, in response order (joined to guests and rooms)"""
+        from models.guests import Guest
+        from models.rooms import Room
+
+        return {'id': Reservation.id, 'guest_name': Guest.name.label('guest_name'),
+                'guest_email': Guest.email.label('guest_email'), 'room_number': Room.room_number,
+                'room_type': Room.room_type, 'check_in': Reservation.check_in, 'check_out': Reservation.check_out,
+                'status': Reservation.status, 'created_at': Reservation.created_at}
+
+    @staticmethod
+    def guest_response_columns():
+        """Response field name -> column of a guest's reservations (joined to rooms)"""
+        from models.rooms import Room
+
+        return {'id': Reservation.id, 'room_number': Room.room_number, 'room_type': Room.room_type,
+                'check_in': Reservation.check_in, 'check_out': Reservation.check_out, 'status': Reservation.status,
+                'created_at': Reservation.created_at}
+
+    @staticmethod
+    def query_columns(columns):
+        """
+        Query columns from reservations as plain rows, joining guests and rooms
+        only when some of the columns come from them
+        """
+        from apis.common_functions import CommonFunctions
+        from models.guests import Guest
+        from models.rooms import Room
+
+        query = db.session.query(*columns).select_from(Reservation)
+        if CommonFunctions.selects_from(columns, Guest):
+            query = query.join(Guest, Reservation.guest_id == Guest.id)
+        if CommonFunctions.selects_from(columns, Room):
+            query = query.join(Room, Reservation.room_id == Room.id)
+        return query
+
+    @staticmethod
+    def insert_if_available(guest_id, room_id, check_in, check_out):
+        """
+        INSERT ... SELECT ... WHERE NOT EXISTS: books the stay only if no active
+        reservation of the room overlaps it. Returns the new id, or None.
+        Run it after Room.lock_rooms, so the overlap check sees every committed booking.
+        """
+        overlapping = select(Reservation.id).where(
+            Reservation.room_id == room_id,
+            Reservation.status.in_(['confirmed', 'checked_in']),
+            Reservation.check_out > check_in,
+            Reservation.check_in < check_out
+        ).exists()
+        values = select(
+            literal(guest_id, Reservation.guest_id.type), literal(room_id, Reservation.room_id.type),
+            literal(check_in, Reservation.check_in.type), literal(check_out, Reservation.check_out.type),
+            literal('confirmed', Reservation.status.type), literal(datetime.now(), Reservation.created_at.type)
+        ).where(~overlapping)
+        return db.session.scalar(insert(Reservation).from_select(
+            ['guest_id', 'room_id', 'check_in', 'check_out', 'status', 'created_at'], values
+        ).returning(Reservation.id))
+
     @staticmethod
     def create_reservation(data):
         """Create a new reservation with availability check"""
         try:
             from models.guests import Guest
             from models.rooms import Room
-            
-            guest = Guest.query.get(data.get('guest_id'))
-            if not guest:
+
+            # One statement locks the room and reads the room and the guest
+            room = Room.lock_room_for_booking(data.get('guest_id'), data.get('room_id'))
+
+            # Without a room row the guest is looked up on its own
+            guest_name = room.guest_name if room else db.session.scalar(
+                select(Guest.name).where(Guest.id == data.get('guest_id'))
+            )
+            if guest_name is None:
                 return {'message': 'Guest not found', 'status_code': 2}, 404
 
-            room = Room.query.get(data.get('room_id'))
             if not room:
                 return {'message': 'Room not found', 'status_code': 2}, 404
 
@@ -40,82 +119,115 @@ class Reservation(db.Model):
             if check_in < date.today():
                 return {'message': 'Check-in cannot be in the past', 'status_code': 2}, 400
 
-            if not Room.check_room_availability(data.get('room_id'), check_in, check_out):
-                return {'message': 'Room not available for selected dates', 'status_code': 2}, 409
-
+            from apis.availability_index import availability_index
 
-            reservation = Reservation(
-                guest_id=data.get('guest_id'),
-                room_id=data.get('room_id'),
-                check_in=check_in,
-                check_out=check_out
-            )
+            # Room status here, overlaps in the insert itself
+            reservation_id = None
+            if room.status == 'available' and not availability_index.overlaps(data.get('room_id'), check_in, check_out):
+                reservation_id = Reservation.insert_if_available(data.get('guest_id'), data.get('room_id'),
+                                                                 check_in, check_out)
+            if reservation_id is None:
+                return {'message': 'Room not available for selected dates', 'status_code': 2}, 409
 
-            db.session.add(reservation)
             db.session.commit()
+            availability_index.add(data.get('room_id'), check_in, check_out, reservation_id)
             
             return {
                 'message': 'Reservation created successfully',
                 'status_code': 1,
                 'data': {
-                    'id': reservation.id,
-                    'guest_name': guest.name,
+                    'id': reservation_id,
+                    'guest_name': guest_name,
                     'room_number': room.room_number,
-                    'check_in': reservation.check_in.isoformat(),
-                    'check_out': reservation.check_out.isoformat(),
-                    'status': reservation.status
+                    'check_in': check_in.isoformat(),
+                    'check_out': check_out.isoformat(),
+                    'status': 'confirmed'
                 }
             }, 201
+        except IntegrityError as ex:
+            db.session.rollback()
+            if OVERLAP_CONSTRAINT in str(ex.orig):
+                # the database-side constraint caught an overlap written without the room lock
+                return {'message': 'Room not available for selected dates', 'status_code': 2}, 409
+            return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
         except Exception as ex:
             db.session.rollback()
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
+        finally:
+            # end the transaction and release the room lock on every path
+            db.session.rollback()
 
     @staticmethod
-    def get_guest_reservations(guest_id):
-        """Get all reservations for a guest"""
+    def get_guest_reservations(guest_id, cursor=None, limit=None, fields=None):
+        """Get reservations for a guest, one page at a time"""
         try:
-            reservations = Reservation.query.filter_by(guest_id=guest_id).all()
+            from apis.common_functions import CommonFunctions
+
+            after = CommonFunctions.decode_cursor(cursor) if cursor else None
+            if cursor and not after:
+                return {'message': 'Invalid pagination cursor', 'status_code': 2}, 400
+            projection = CommonFunctions.project_fields(Reservation.guest_response_columns(), fields,
+                                                        keep=(Reservation.created_at, Reservation.id))
+            if projection is None:
+                return CommonFunctions.invalid_fields(Reservation.guest_response_columns())
+            names, columns = projection
+
+            # Only the requested columns, joined to rooms only when needed
+            query = Reservation.query_columns(columns).filter(Reservation.guest_id == guest_id)
+            reservations, next_cursor = CommonFunctions.paginate(query, Reservation, after, limit)
             
-            reservation_list = [{
-                'id': r.id,
-                'room_number': r.room.room_number,
-                'room_type': r.room.room_type,
-                'check_in': r.check_in.isoformat(),
-                'check_out': r.check_out.isoformat(),
-                'status': r.status,
-                'created_at': r.created_at.isoformat()
-            } for r in reservations]
+            reservation_list = [CommonFunctions.row_to_dict(r, names) for r in reservations]
             
             return {
                 'message': 'Guest reservations retrieved successfully',
                 'status_code': 1,
-                'data': reservation_list
+                'data': {
+                    'items': reservation_list,
+                    'next_cursor': next_cursor
+                }
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
     @staticmethod
-    def get_all_reservations():
-        """Get all reservations"""
+    def get_all_reservations(cursor=None, limit=None, ids=None, fields=None):
+        """Get reservations, one page at a time, or just the rows with the given ids"""
         try:
-            reservations = Reservation.query.all()
+            from apis.common_functions import CommonFunctions
+
+            # ids replace paging, so the cursor is only checked without them
+            id_list = CommonFunctions.parse_ids(ids) if ids is not None else None
+            if ids is not None and id_list is None:
+                return {'message': f'Invalid ids: expected 1 to {Config.BATCH_IDS_MAX} comma-separated integers',
+                        'status_code': 2}, 400
+            after = CommonFunctions.decode_cursor(cursor) if cursor and id_list is None else None
+            if cursor and id_list is None and not after:
+                return {'message': 'Invalid pagination cursor', 'status_code': 2}, 400
+            projection = CommonFunctions.project_fields(Reservation.response_columns(), fields,
+                                                        keep=(Reservation.created_at, Reservation.id))
+            if projection is None:
+                return CommonFunctions.invalid_fields(Reservation.response_columns())
+            names, columns = projection
+
+            # Only the requested columns, joined to guests and rooms only when needed
+            query = Reservation.query_columns(columns)
+            if id_list is not None:
+                reservations, missing = CommonFunctions.fetch_by_ids(query, Reservation.id, id_list)
+            else:
+                reservations, next_cursor = CommonFunctions.paginate(query, Reservation, after, limit)
             
-            reservation_list = [{
-                'id': r.id,
-                'guest_name': r.guest.name,
-                'guest_email': r.guest.email,
-                'room_number': r.room.room_number,
-                'room_type': r.room.room_type,
-                'check_in': r.check_in.isoformat(),
-                'check_out': r.check_out.isoformat(),
-                'status': r.status,
-                'created_at': r.created_at.isoformat()
-            } for r in reservations]
+            reservation_list = [CommonFunctions.row_to_dict(r, names) for r in reservations]
             
             return {
                 'message': 'Reservations retrieved successfully',
                 'status_code': 1,
-                'data': reservation_list
+                'data': {
+                    'items': reservation_list,
+                    'missing': missing
+                } if id_list is not None else {
+                    'items': reservation_list,
+                    'next_cursor': next_cursor
+                }
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
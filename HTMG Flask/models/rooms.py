@@ -1,72 +1,200 @@
+import time
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
 from api_server import db
+from config import Config
 
 class Room(db.Model):
     __tablename__ = 'rooms'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_rooms_created_at_id', 'created_at', 'id'),
+        db.Index('ix_rooms_status_created_at_id', 'status', 'created_at', 'id'),
+        # Free-room search
+        db.Index('ix_rooms_status_room_type', 'status', 'room_type'),
+        # ETag watermark of the room list
+        db.Index('ix_rooms_updated_at', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     room_number = db.Column(db.String(10), nullable=False, unique=True)
     room_type = db.Column(db.String(50), nullable=False)  # single, double, suite
     status = db.Column(db.String(20), nullable=False, default='available')  # available, occupied, maintenance
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # Set on insert and by every SQLAlchemy update; read by the ETag watermark
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
 
     @staticmethod
-    def create_room(data):
-        """Create a new room"""
+    def response_columns():
+        """Response field name -> column, in response order"""
+        return {'id': Room.id, 'room_number': Room.room_number, 'room_type': Room.room_type, 'status': Room.status,
+                'created_at': Room.created_at}
+
+    @staticmethod
+    def create_room(data, if_exists='error'):
+        """
+        Create a new room in one INSERT ... ON CONFLICT DO NOTHING round trip.
+        With if_exists='return' a duplicate answers 200 with the existing room.
+        """
         try:
-            existing_room = Room.query.filter_by(room_number=data.get('room_number')).first()
-            if existing_room:
+            from apis.common_functions import CommonFunctions
+
+            row, created = CommonFunctions.insert_unless_exists(
+                Room, 'room_number', data, (Room.id, Room.room_number, Room.room_type, Room.status, Room.created_at), if_exists
+            )
+            if not created and row is None:
                 return {'message': 'Room number already exists', 'status_code': 2}, 409
-            
-            room = Room(**data)
-            db.session.add(room)
-            db.session.commit()
-            
+            if created:
+                db.session.commit()
+
             return {
-                'message': 'Room created successfully',
+                'message': 'Room created successfully' if created else 'Room number already exists',
                 'status_code': 1,
                 'data': {
-                    'id': room.id,
-                    'room_number': room.room_number,
-                    'room_type': room.room_type,
-                    'status': room.status,
-                    'created_at': room.created_at.isoformat()
+                    'id': row.id,
+                    'room_number': row.room_number,
+                    'room_type': row.room_type,
+                    'status': row.status,
+                    'created_at': row.created_at.isoformat()
                 }
-            }, 201
+            }, 201 if created else 200
         except Exception as ex:
             db.session.rollback()
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
     @staticmethod
-    def get_all_rooms(status_filter=None):
-        """Get all rooms with optional status filter"""
+    def get_all_rooms(status_filter=None, cursor=None, limit=None, ids=None, fields=None):
+        """Get rooms with optional status filter, one page at a time, or just the rows with the given ids"""
         try:
-            if status_filter:
-                rooms = Room.query.filter_by(status=status_filter).all()
+            from apis.common_functions import CommonFunctions
+
+            # ids replace paging, so the cursor is only checked without them
+            id_list = CommonFunctions.parse_ids(ids) if ids is not None else None
+            if ids is not None and id_list is None:
+                return {'message': f'Invalid ids: expected 1 to {Config.BATCH_IDS_MAX} comma-separated integers',
+                        'status_code': 2}, 400
+            after = CommonFunctions.decode_cursor(cursor) if cursor and id_list is None else None
+            if cursor and id_list is None and not after:
+                return {'message': 'Invalid pagination cursor', 'status_code': 2}, 400
+            projection = CommonFunctions.project_fields(Room.response_columns(), fields,
+                                                        keep=(Room.created_at, Room.id))
+            if projection is None:
+                return CommonFunctions.invalid_fields(Room.response_columns())
+            names, columns = projection
+
+            # Only the response columns, as plain rows outside the identity map
+            query = db.session.query(*columns)
+            if status_filter and id_list is None:
+                query = query.filter(Room.status == status_filter)
+            if id_list is not None:
+                rooms, missing = CommonFunctions.fetch_by_ids(query, Room.id, id_list)
             else:
-                rooms = Room.query.all()
+                rooms, next_cursor = CommonFunctions.paginate(query, Room, after, limit)
             
-            room_list = [{
-                'id': r.id,
-                'room_number': r.room_number,
-                'room_type': r.room_type,
-                'status': r.status,
-                'created_at': r.created_at.isoformat()
-            } for r in rooms]
+            room_list = [CommonFunctions.row_to_dict(r, names) for r in rooms]
             
             return {
                 'message': 'Rooms retrieved successfully',
                 'status_code': 1,
+                'data': {
+                    'items': room_list,
+                    'missing': missing
+                } if id_list is not None else {
+                    'items': room_list,
+                    'next_cursor': next_cursor
+                }
+            }, 200
+        except Exception as ex:
+            return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
+
+    @staticmethod
+    def get_available_rooms(check_in, check_out, room_type=None, fields=None):
+        """Get every available room with no active reservation overlapping the dates"""
+        try:
+            from apis.common_functions import CommonFunctions
+            from models.reservations import Reservation
+
+            projection = CommonFunctions.project_fields(Room.response_columns(), fields)
+            if projection is None:
+                return CommonFunctions.invalid_fields(Room.response_columns())
+            names, columns = projection
+
+            if check_in >= check_out:
+                return {'message': 'Check-out must be after check-in', 'status_code': 2}, 400
+
+            # Same overlap rule as check_room_availability, as one anti-join
+            overlapping = db.select(Reservation.id).where(
+                Reservation.room_id == Room.id,
+                Reservation.status.in_(['confirmed', 'checked_in']),
+                Reservation.check_out > check_in,
+                Reservation.check_in < check_out
+            ).exists()
+
+            query = db.session.query(*columns).filter(Room.status == 'available', ~overlapping)
+            if room_type:
+                query = query.filter(Room.room_type == room_type)
+            rooms = query.order_by(Room.id).all()
+
+            room_list = [CommonFunctions.row_to_dict(r, names) for r in rooms]
+
+            return {
+                'message': 'Available rooms retrieved successfully',
+                'status_code': 1,
                 'data': room_list
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
+    @staticmethod
+    def lock_rooms(room_ids):
+        """
+        Serialize bookings of the given rooms until the transaction ends. Call it
+        before the availability check and the insert, ahead of any other write.
+        Postgres locks the room rows (in id order, so batches cannot deadlock) and
+        bookings of other rooms go ahead in parallel. SQLite allows one writer, so
+        the transaction starts with BEGIN IMMEDIATE, retried BOOKING_LOCK_RETRIES
+        times when the database is still locked after the busy timeout.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            db.session.query(Room.id).filter(Room.id.in_(sorted(set(room_ids)))).order_by(Room.id).with_for_update().all()
+            return
+        for attempt in range(Config.BOOKING_LOCK_RETRIES + 1):
+            try:
+                db.session.execute(text('BEGIN IMMEDIATE'))
+                return
+            except OperationalError as ex:
+                if 'locked' not in str(ex) or attempt == Config.BOOKING_LOCK_RETRIES:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    @staticmethod
+    def lock_room_for_booking(guest_id, room_id):
+        """
+        Lock the room as lock_rooms does and read, in the same statement on Postgres
+        (SELECT ... FOR UPDATE OF rooms), the room's number and status and the guest's
+        name (None if no such guest). Returns None if no such room.
+        """
+        from models.guests import Guest
+
+        guest_name = db.session.query(Guest.name).filter(Guest.id == guest_id).scalar_subquery()
+        query = db.session.query(Room.room_number, Room.status, guest_name.label('guest_name')).filter(Room.id == room_id)
+        if db.engine.dialect.name == 'sqlite':
+            Room.lock_rooms([room_id])
+        else:
+            query = query.with_for_update(of=Room)
+        return query.first()
+
     @staticmethod
     def check_room_availability(room_id, check_in, check_out):
         """Check if room is available for given dates"""
         try:
             from models.reservations import Reservation
+            from apis.availability_index import availability_index
+
+            # Fast reject from the in-process index; a miss still goes to the database
+            if availability_index.overlaps(room_id, check_in, check_out):
+                return False
             
             room = Room.query.get(room_id)
             if not room or room.status != 'available':
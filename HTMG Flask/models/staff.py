@@ -3,6 +3,11 @@ from api_server import db
 
 class Staff(db.Model):
     __tablename__ = 'staff'
+    __table_args__ = (
+        # Keyset pagination order
+        db.Index('ix_staff_created_at_id', 'created_at', 'id'),
+        db.Index('ix_staff_department_created_at_id', 'department', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
@@ -12,55 +17,75 @@ class Staff(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now)
 
     @staticmethod
-    def create_staff(data):
-        """Create a new staff member"""
+    def response_columns():
+        """Response field name -> column, in response order"""
+        return {'id': Staff.id, 'name': Staff.name, 'email': Staff.email, 'department': Staff.department,
+                'position': Staff.position, 'created_at': Staff.created_at}
+
+    @staticmethod
+    def create_staff(data, if_exists='error'):
+        """
+        Create a new staff member in one INSERT ... ON CONFLICT DO NOTHING round trip.
+        With if_exists='return' a duplicate answers 200 with the existing staff member.
+        """
         try:
-            existing_staff = Staff.query.filter_by(email=data.get('email')).first()
-            if existing_staff:
+            from apis.common_functions import CommonFunctions
+
+            row, created = CommonFunctions.insert_unless_exists(
+                Staff, 'email', data,
+                (Staff.id, Staff.name, Staff.email, Staff.department, Staff.position, Staff.created_at), if_exists
+            )
+            if not created and row is None:
                 return {'message': 'Staff member with this email already exists', 'status_code': 2}, 409
-            
-            staff = Staff(**data)
-            db.session.add(staff)
-            db.session.commit()
-            
+            if created:
+                db.session.commit()
+
             return {
-                'message': 'Staff member created successfully',
+                'message': 'Staff member created successfully' if created else 'Staff member with this email already exists',
                 'status_code': 1,
                 'data': {
-                    'id': staff.id,
-                    'name': staff.name,
-                    'email': staff.email,
-                    'department': staff.department,
-                    'position': staff.position,
-                    'created_at': staff.created_at.isoformat()
+                    'id': row.id,
+                    'name': row.name,
+                    'email': row.email,
+                    'department': row.department,
+                    'position': row.position,
+                    'created_at': row.created_at.isoformat()
                 }
-            }, 201
+            }, 201 if created else 200
         except Exception as ex:
             db.session.rollback()
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500
 
     @staticmethod
-    def get_all_staff(department_filter=None):
-        """Get all staff with optional department filter"""
+    def get_all_staff(department_filter=None, cursor=None, limit=None, fields=None):
+        """Get staff with optional department filter, one page at a time"""
         try:
+            from apis.common_functions import CommonFunctions
+
+            after = CommonFunctions.decode_cursor(cursor) if cursor else None
+            if cursor and not after:
+                return {'message': 'Invalid pagination cursor', 'status_code': 2}, 400
+            projection = CommonFunctions.project_fields(Staff.response_columns(), fields,
+                                                        keep=(Staff.created_at, Staff.id))
+            if projection is None:
+                return CommonFunctions.invalid_fields(Staff.response_columns())
+            names, columns = projection
+
+            # Only the response columns, as plain rows outside the identity map
+            query = db.session.query(*columns)
             if department_filter:
-                staff_members = Staff.query.filter_by(department=department_filter).all()
-            else:
-                staff_members = Staff.query.all()
+                query = query.filter(Staff.department == department_filter)
+            staff_members, next_cursor = CommonFunctions.paginate(query, Staff, after, limit)
             
-            staff_list = [{
-                'id': s.id,
-                'name': s.name,
-                'email': s.email,
-                'department': s.department,
-                'position': s.position,
-                'created_at': s.created_at.isoformat()
-            } for s in staff_members]
+            staff_list = [CommonFunctions.row_to_dict(s, names) for s in staff_members]
             
             return {
                 'message': 'Staff retrieved successfully',
                 'status_code': 1,
-                'data': staff_list
+                'data': {
+                    'items': staff_list,
+                    'next_cursor': next_cursor
+                }
             }, 200
         except Exception as ex:
             return {'message': f'Error: {str(ex)}', 'status_code': 2}, 500